@@ -0,0 +1,62 @@
+"""User accounts: validation, registration and login."""
+import hashlib
+import re
+
+from passwords import HashingBusy, hash_password, verify_password
+from user_store import get_user_store
+
+# Seeded into an empty user store (legacy SHA-256, upgraded on first login)
+DEFAULT_USERS = {
+    "admin": hashlib.sha256("admin123".encode()).hexdigest(),
+    "demo": hashlib.sha256("demo123".encode()).hexdigest()
+}
+
+def load_users():
+    """User store shared by all sessions (SQLite, migrated from users_db.json)"""
+    return get_user_store(DEFAULT_USERS)
+
+def validate_username(username):
+    """Validate username: only letters, no numbers or special characters"""
+    if not username:
+        return False, "Username cannot be empty"
+    if not re.match(r'^[a-zA-Z]+$', username):
+        return False, "Username must contain only letters (no numbers or special characters)"
+    if len(username) < 3:
+        return False, "Username must be at least 3 characters long"
+    return True, "Valid"
+
+def validate_password(password):
+    """Validate password: at least 6 characters, can contain special characters"""
+    if not password:
+        return False, "Password cannot be empty"
+    if len(password) < 6:
+        return False, "Password must be at least 6 characters long"
+    if not re.search(r'[A-Za-z]', password):
+        return False, "Password must contain at least one letter"
+    if not re.search(r'[0-9]', password):
+        return False, "Password must contain at least one number"
+    return True, "Valid"
+
+def register_user(username, password):
+    """Register a new user"""
+    users = load_users()
+    if users.get_hash(username) is not None:
+        return False, "Username already exists"
+    
+    # Hash password and save; the store rejects taken usernames atomically
+    try:
+        hashed_password = hash_password(password)
+    except HashingBusy as e:
+        return False, str(e)
+    if not users.add_user(username, hashed_password):
+        return False, "Username already exists"
+    return True, "Registration successful!"
+
+def verify_login(username, password):
+    """Verify login credentials, upgrading legacy SHA-256 hashes on success"""
+    users = load_users()
+    stored_hash = users.get_hash(username)
+    matches, needs_rehash = verify_password(password, stored_hash)
+    if matches and needs_rehash:
+        users.set_hash(username, hash_password(password))
+    return matches
@@ -0,0 +1,87 @@
+"""Render time of candlestick/OHLC charts against bar count.
+
+Compares the per-row iterrows() plotting the chart functions used to do with
+the collection-based helpers in charts.py, on synthetic daily data sized like
+each period on the Price Charts page. Each render includes a full PNG draw.
+
+Usage:
+    python benchmarks/bench_charts.py [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from charts import draw_candlesticks, draw_ohlc_bars  # noqa: E402
+
+# Approximate trading days per period option on the Price Charts page
+PERIOD_BARS = {'1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504, '5y': 1260}
+
+
+def synthetic_ohlc(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    open_ = close + rng.normal(0, 1, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 2, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 2, n)
+    index = pd.bdate_range(end='2024-12-31', periods=n)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close}, index=index)
+
+
+def legacy_candlesticks(ax, data):
+    for idx, (date, row) in enumerate(data.iterrows()):
+        color = '#00ff88' if row['Close'] >= row['Open'] else '#ff4444'
+        ax.plot([idx, idx], [row['Low'], row['High']], color=color, linewidth=1, alpha=0.8)
+        height = abs(row['Close'] - row['Open'])
+        bottom = min(row['Open'], row['Close'])
+        ax.bar(idx, height, bottom=bottom, color=color, width=0.8, alpha=0.9, edgecolor=color)
+
+
+def legacy_ohlc_bars(ax, data):
+    for idx, (date, row) in enumerate(data.iterrows()):
+        color = '#00ff88' if row['Close'] >= row['Open'] else '#ff4444'
+        ax.plot([idx, idx], [row['Low'], row['High']], color=color, linewidth=1.5, alpha=0.9)
+        ax.plot([idx - 0.3, idx], [row['Open'], row['Open']], color=color, linewidth=2, alpha=0.9)
+        ax.plot([idx, idx + 0.3], [row['Close'], row['Close']], color=color, linewidth=2, alpha=0.9)
+
+
+def time_render(draw, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig, ax = plt.subplots(figsize=(14, 7))
+        draw(ax, data)
+        fig.savefig(io.BytesIO(), format='png')
+        plt.close(fig)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="Renders per case (best is reported)")
+    args = parser.parse_args()
+
+    cases = [
+        ('candlestick', legacy_candlesticks, draw_candlesticks),
+        ('ohlc', legacy_ohlc_bars, draw_ohlc_bars),
+    ]
+    print(f"{'chart':<12}{'period':>7}{'bars':>7}{'iterrows ms':>14}{'collections ms':>17}{'speedup':>9}")
+    for name, legacy, vectorized in cases:
+        for period, bars in PERIOD_BARS.items():
+            data = synthetic_ohlc(bars)
+            old = time_render(legacy, data, args.repeat)
+            new = time_render(vectorized, data, args.repeat)
+            print(f"{name:<12}{period:>7}{bars:>7}{old:>14.1f}{new:>17.1f}{old / new:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
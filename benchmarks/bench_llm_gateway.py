@@ -0,0 +1,74 @@
+"""Offline load test of llm_gateway against the stub backend.
+
+Simulates `--users` concurrent chat sessions, each sending `--requests`
+streamed completions. A share of the prompts are identical (popular
+questions) so coalescing kicks in, and the stub fails with 429 at
+`--error-rate` so retries and backoff are exercised. Reports latency
+percentiles and the gateway counters.
+
+Usage:
+    python benchmarks/bench_llm_gateway.py [--users 50] [--requests 5] [--rps 20]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from llm_gateway import LLMGateway, LLMGatewayError, StubBackend, TokenBucket  # noqa: E402
+
+POPULAR_QUESTIONS = ["Should I buy AAPL?", "chart TSLA", "Is RELIANCE.NS a buy?"]
+
+
+def session(gateway, user, requests, shared_share, rng_seed):
+    rng = np.random.default_rng(rng_seed)
+    latencies, errors = [], 0
+    for i in range(requests):
+        if rng.random() < shared_share:
+            prompt = POPULAR_QUESTIONS[rng.integers(len(POPULAR_QUESTIONS))]
+        else:
+            prompt = f"user {user} question {i}"
+        start = time.perf_counter()
+        try:
+            stream = gateway.chat(model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}], stream=True)
+            "".join(chunk.choices[0].delta.content for chunk in stream)
+            latencies.append(time.perf_counter() - start)
+        except LLMGatewayError:
+            errors += 1
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--rps', type=float, default=20.0, help='Token bucket rate')
+    parser.add_argument('--burst', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.3, help='Stub response time in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Share of stub calls failing with 429')
+    parser.add_argument('--shared', type=float, default=0.4, help='Share of requests using a popular prompt')
+    args = parser.parse_args()
+
+    backend = StubBackend(latency=args.latency, error_rate=args.error_rate, seed=0)
+    gateway = LLMGateway(backend, limiter=TokenBucket(args.rps, args.burst))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = list(pool.map(lambda u: session(gateway, u, args.requests, args.shared, u), range(args.users)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([lat for lats, _ in results for lat in lats])
+    errors = sum(err for _, err in results)
+    print(f"{len(latencies)} ok, {errors} failed in {elapsed:.1f}s ({len(latencies) / elapsed:.1f} req/s)")
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"latency p50 {p50:.2f}s  p95 {p95:.2f}s  p99 {p99:.2f}s")
+    print(f"backend calls: {backend.calls}")
+    print("gateway:", gateway.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Cold-start import cost of the app's modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+so every number is a cold import including its dependencies. The "login
+page" row is what a first visit pays before anything is deferred; the
+other rows are paid by the first page that needs them. Both lists are read
+from main.py's own imports, so they stay in step with it. Use --json to
+keep a record across releases.
+
+Usage:
+    python benchmarks/import_profile.py [--repeat 3] [--json import_profile.json]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Heavy third-party modules the deferred app modules pull in
+DEFERRED_LIBRARIES = ['pandas', 'yfinance', 'openai']
+
+
+def main_imports(path=os.path.join(ROOT, 'main.py')):
+    """(modules main.py imports at the top level, modules it binds through lazy_import/lazy_function)"""
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read())
+    eager, deferred = [], []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            eager.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            eager.append(node.module)
+        elif (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+              and getattr(node.value.func, 'id', None) in ('lazy_import', 'lazy_function')):
+            deferred.append(node.value.args[0].value)
+    return list(dict.fromkeys(eager)), list(dict.fromkeys(deferred))
+
+
+# Imported eagerly by main.py (what the login page pays for), and loaded on demand through lazy_imports
+LOGIN_MODULES, DEFERRED_MODULES = main_imports()
+DEFERRED_MODULES += DEFERRED_LIBRARIES
+
+_LINE_RE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def cold_import_ms(modules):
+    """Cumulative import time of `modules` in a fresh interpreter, or None if one is missing"""
+    code = '; '.join(f'import {module}' for module in modules)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        # Top-level entries have one space of indentation
+        if match and len(match.group(3)) == 1:
+            total += int(match.group(2))
+    return total / 1000
+
+
+def profile(repeat):
+    rows = {}
+    for name, modules in [('login page', LOGIN_MODULES)] + [(m, [m]) for m in DEFERRED_MODULES]:
+        runs = [cold_import_ms(modules) for _ in range(repeat)]
+        rows[name] = None if None in runs else round(min(runs), 1)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per module; the fastest is reported')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    rows = profile(args.repeat)
+    print(f"{'module':<20}{'cold import (ms)':>18}")
+    for name, ms in rows.items():
+        print(f"{name:<20}{'not installed' if ms is None else f'{ms:.1f}':>18}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'import_ms': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
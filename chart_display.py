@@ -0,0 +1,29 @@
+"""Showing charts in the backend the user picked (server image or browser)."""
+import streamlit as st
+
+from market_data import get_history
+from plots import chart_image
+
+
+def browser_charts():
+    """True when the user picked client-side (interactive) chart rendering"""
+    return st.session_state.get('chart_backend') == 'Browser (interactive)'
+
+
+def display_chart(chart_type, ticker, period, build, spec, interval='1d'):
+    """Show a chart in the selected backend and return an error message or None.
+
+    Server mode renders `build()` to a cached image; browser mode ships the
+    Vega-Lite spec returned by `spec(history)` and lets the client draw it.
+    """
+    if browser_charts():
+        data = get_history(ticker, period, interval)
+        if data.empty:
+            return "Error: No data found for this ticker."
+        st.vega_lite_chart(spec(data), use_container_width=True, theme=None)
+        return None
+
+    image, error = chart_image(chart_type, ticker, period, build, interval)
+    if not error:
+        st.image(image)
+    return error
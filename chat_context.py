@@ -0,0 +1,135 @@
+"""Token budgeting and compaction for the chatbot's message history.
+
+Before each request the history is compacted so it stays under a token
+budget. Tool outputs from earlier turns are replaced with one-line
+references. If that is not enough, the oldest turns are folded into a short
+extractive summary message. Nothing here calls the model, so compaction adds
+no latency.
+"""
+import json
+from functools import lru_cache
+
+# Upper bound on prompt tokens sent with each chat request (tools schema excluded)
+CONTEXT_TOKEN_BUDGET = 3000
+# Turns (user message + everything after it) always sent verbatim
+KEEP_RECENT_TURNS = 2
+# Keep the running summary itself from growing without bound
+MAX_SUMMARY_CHARS = 1500
+
+SUMMARY_PREFIX = "Summary of earlier conversation:"
+# Approximate per-message framing overhead in the chat format
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """tiktoken's encoder, imported on first use; None if tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding('cl100k_base')
+
+
+def _text(message):
+    text = message.get('content') or ''
+    for call in message.get('tool_calls') or []:
+        text += call['function']['name'] + call['function']['arguments']
+    return text
+
+
+def count_tokens(messages):
+    """Prompt tokens for `messages` (tiktoken if installed, else ~4 chars per token)"""
+    encoding = _encoding()
+    total = 0
+    for message in messages:
+        text = _text(message)
+        total += MESSAGE_OVERHEAD + (len(encoding.encode(text)) if encoding else len(text) // 4 + 1)
+    return total
+
+
+def _compact_tool_result(message):
+    """Replace a tool output with a one-line reference to it"""
+    content = message.get('content') or ''
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        data = None
+
+    if isinstance(data, dict) and 'ticker' in data:
+        keys = [k for k in ('recommendation', 'confidence', 'current_price', 'rsi') if k in data]
+        if not keys:
+            # Compact numeric results: keep every scalar field
+            keys = [k for k, v in data.items() if k != 'ticker' and not isinstance(v, (list, dict))]
+        fields = ', '.join(f"{k}={data[k]}" for k in keys)
+        reference = f"[earlier {message.get('name')} result for {data['ticker']}: {fields}]"
+    elif len(content) > 80:
+        reference = f"[earlier {message.get('name')} result: {content[:80]}...]"
+    else:
+        return message
+
+    return dict(message, content=reference)
+
+
+def _split_turns(messages):
+    """Group messages into turns, each starting at a user message"""
+    turns = []
+    for message in messages:
+        if message.get('role') == 'user' or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _summarize_turn(turn):
+    lines = []
+    for message in turn:
+        if message.get('role') == 'user':
+            lines.append(f"User: {message.get('content', '')[:120]}")
+        elif message.get('role') == 'assistant' and message.get('content') and not message.get('tool_calls'):
+            lines.append(f"Assistant: {message['content'][:200]}")
+    return lines
+
+
+def compact_messages(messages, budget=CONTEXT_TOKEN_BUDGET, keep_recent_turns=KEEP_RECENT_TURNS):
+    """Fit `messages` into `budget` tokens.
+
+    Returns (messages, tokens_before, tokens_after). The input list is not
+    modified. Tool calls and their results are kept or dropped together.
+    """
+    tokens_before = count_tokens(messages)
+
+    summary_lines = []
+    body = list(messages)
+    if body and body[0].get('role') == 'system' and (body[0].get('content') or '').startswith(SUMMARY_PREFIX):
+        summary_lines = body[0]['content'][len(SUMMARY_PREFIX):].strip().splitlines()
+        body = body[1:]
+
+    turns = _split_turns(body)
+    split = max(len(turns) - keep_recent_turns, 0)
+    older = [[_compact_tool_result(m) if m.get('role') == 'tool' else m for m in turn] for turn in turns[:split]]
+    recent = turns[split:]
+
+    def assemble():
+        result = []
+        while len(summary_lines) > 1 and sum(len(line) + 1 for line in summary_lines) > MAX_SUMMARY_CHARS:
+            summary_lines.pop(0)
+        if summary_lines:
+            summary = "\n".join(summary_lines)
+            result.append({"role": "system", "content": f"{SUMMARY_PREFIX}\n{summary}"})
+        for turn in older + recent:
+            result.extend(turn)
+        return result
+
+    compacted = assemble()
+    while older and count_tokens(compacted) > budget:
+        summary_lines.extend(_summarize_turn(older.pop(0)))
+        compacted = assemble()
+
+    # Still over budget: reference tool outputs in every turn but the current one
+    if count_tokens(compacted) > budget and len(recent) > 1:
+        recent = [[_compact_tool_result(m) if m.get('role') == 'tool' else m for m in turn]
+                  for turn in recent[:-1]] + recent[-1:]
+        compacted = assemble()
+
+    return compacted, tokens_before, count_tokens(compacted)
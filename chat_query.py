@@ -0,0 +1,99 @@
+"""Parameters stated in a chat message beyond its ticker.
+
+"Show a 5y candlestick chart of AAPL" and "chart AAPL" name the same ticker
+and intent but ask for different things. parse_params() pulls out what the
+chatbot tools can take (indicator, window, period, chart type) and keeps any
+other number it cannot place, so two messages only compare equal when
+everything they specify does.
+"""
+import re
+
+# Questions that want reasoning or several lookups, not one tool's output
+OPEN_ENDED = ('compare', ' vs', 'versus', 'why', 'explain', 'difference')
+
+# Longest phrases first, so "exponential moving average" wins over "moving average"
+INDICATORS = {
+    'exponential moving average': 'EMA',
+    'simple moving average': 'SMA',
+    'relative strength': 'RSI',
+    'moving average': 'MA',
+    'bollinger': 'BOLLINGER',
+    'macd': 'MACD',
+    'sma': 'SMA',
+    'ema': 'EMA',
+    'rsi': 'RSI',
+}
+CHART_TYPES = {
+    'candlestick': 'Candlestick',
+    'candle': 'Candlestick',
+    'ohlc': 'OHLC',
+    'bar': 'Bar Chart',
+    'line': 'Line Chart',
+}
+_PERIOD_UNITS = {'d': 'd', 'day': 'd', 'days': 'd', 'w': 'wk', 'wk': 'wk', 'week': 'wk', 'weeks': 'wk',
+                 'm': 'mo', 'mo': 'mo', 'month': 'mo', 'months': 'mo',
+                 'y': 'y', 'yr': 'y', 'yrs': 'y', 'year': 'y', 'years': 'y'}
+
+_AVERAGE = r'(?:sma|ema|(?:simple |exponential )?moving average)'
+# "50-day SMA", "50 day moving average", "SMA 50", "EMA(20)"
+_WINDOW_RES = (re.compile(r'\b(\d{1,3})[\s-]*(?:days?|d)?[\s-]*' + _AVERAGE + r'\b'),
+               re.compile(r'\b(?:sma|ema)[\s-]*\(?(\d{1,3})\b'))
+# "5y", "6 months", "1-year"
+_PERIOD_RE = re.compile(r'\b(\d{1,2})[\s-]*(' + '|'.join(sorted(_PERIOD_UNITS, key=len, reverse=True)) + r')\b')
+_ONE_PERIOD_RE = re.compile(r'\b(?:a|one|last|past)\s+(day|week|month|year)\b')
+_OTHER_PERIOD_RE = re.compile(r'\b(ytd|max|all[\s-]time)\b')
+_NUMBER_RE = re.compile(r'(?<![\w.])\d+(?:\.\d+)?(?!\w)')
+
+
+def _match_word(text, table):
+    for phrase, value in table.items():
+        if re.search(r'\b' + re.escape(phrase) + r'\b', text):
+            return value
+    return None
+
+
+def parse_params(text):
+    """{name: value} for the parameters stated in `text`.
+
+    Names are 'indicator', 'window', 'period' (a yfinance period string),
+    'chart_type' (a PRICE_CHARTS key) and 'numbers' (a tuple of any other
+    numbers in the message, so questions that differ only in those do not
+    look alike).
+    """
+    lowered = text.lower()
+    params = {}
+
+    for window_re in _WINDOW_RES:
+        match = window_re.search(lowered)
+        if match:
+            params['window'] = int(match.group(1))
+            lowered = lowered[:match.start(1)] + ' ' + lowered[match.end(1):]
+            break
+
+    match = _PERIOD_RE.search(lowered)
+    one = _ONE_PERIOD_RE.search(lowered)
+    other = _OTHER_PERIOD_RE.search(lowered)
+    if match:
+        params['period'] = f"{int(match.group(1))}{_PERIOD_UNITS[match.group(2)]}"
+        lowered = lowered[:match.start()] + ' ' + lowered[match.end():]
+    elif one:
+        params['period'] = '1' + _PERIOD_UNITS[one.group(1)]
+    elif other:
+        params['period'] = 'ytd' if other.group(1) == 'ytd' else 'max'
+
+    indicator = _match_word(lowered, INDICATORS)
+    if indicator:
+        params['indicator'] = indicator
+    chart_type = _match_word(lowered, CHART_TYPES)
+    if chart_type:
+        params['chart_type'] = chart_type
+
+    numbers = tuple(_NUMBER_RE.findall(lowered))
+    if numbers:
+        params['numbers'] = numbers
+    return params
+
+
+def is_open_ended(text):
+    lowered = text.lower()
+    return any(word in lowered for word in OPEN_ENDED)
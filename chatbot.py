@@ -0,0 +1,294 @@
+"""Chatbot tools: their schemas, execution and streaming of replies."""
+import json
+import numbers
+
+import pandas as pd
+import streamlit as st
+
+from chart_display import display_chart
+from chat_context import compact_messages
+from client_charts import CHART_SPECS, price_line_spec
+from concurrency import run_as_completed
+from market_data import data_version, get_history
+from plots import PRICE_CHARTS, chart_image, plot_stock_price
+from stock_analysis import get_stock_recommendation, indicators_for
+
+NO_DATA = "Error: No data found for this ticker."
+CHART_PERIODS = ['1mo', '3mo', '6mo', '1y', '2y', '5y']
+# Tools that read indicators_for() output
+INDICATOR_TOOLS = {"calculate_SMA_chatbot", "calculate_EMA_chatbot", "calculate_RSI_chatbot",
+                   "calculate_MACD_chatbot", "get_stock_recommendation_chatbot"}
+
+
+def compact_result(**fields):
+    """Tool result as minimal JSON with numbers rounded to 2 decimals"""
+    def clean(value):
+        if isinstance(value, bool) or not isinstance(value, numbers.Real):
+            return value
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        return None if pd.isna(value) else round(float(value), 2)
+    return json.dumps({k: clean(v) for k, v in fields.items()}, separators=(',', ':'))
+
+
+def prepare_tool_data(calls):
+    """Fetch each ticker once and compute every indicator the turn's tool calls need.
+
+    `calls` is a list of (function_name, args). Returns {ticker: indicators},
+    with None for tickers that have no data. The longest period a ticker needs
+    is downloaded first, so every other read of it is a cache slice.
+    """
+    needs = {}
+    for function_name, args in calls:
+        need = needs.setdefault(args['ticker'], {'period': '1y', 'sma': {50, 200}, 'ema': set()})
+        if function_name == 'calculate_SMA_chatbot':
+            need['sma'].add(int(args.get('window', 50)))
+        elif function_name == 'calculate_EMA_chatbot':
+            need['ema'].add(int(args.get('window', 50)))
+        elif function_name == 'plot_price_chart_chatbot' and args.get('period') in CHART_PERIODS:
+            if CHART_PERIODS.index(args['period']) > CHART_PERIODS.index(need['period']):
+                need['period'] = args['period']
+
+    def load(ticker, need):
+        get_history(ticker, need['period'])
+        data = get_history(ticker, '1y')
+        if data.empty:
+            return None
+        return indicators_for(ticker, data, sma_windows=sorted(need['sma']), ema_windows=sorted(need['ema']))
+
+    tickers = list(needs)
+    prepared = {}
+    for position, indicators in run_as_completed(load, [(ticker, needs[ticker]) for ticker in tickers]):
+        prepared[tickers[position]] = indicators
+    return prepared
+
+
+def execute_tool(function_name, args, use_browser=False, indicators=None):
+    """Run one chatbot tool; safe to call from a worker thread.
+
+    Returns (result, show): `result` is the text sent back to the model and
+    `show()` draws the tool's output on the page (main thread only).
+    `indicators` is the ticker's entry from prepare_tool_data(), if any.
+    """
+    ticker = args.get('ticker', '')
+    window = int(args.get('window', 50))
+    if function_name in INDICATOR_TOOLS and indicators is None:
+        data = get_history(ticker, '1y')
+        if data.empty:
+            return NO_DATA, lambda: st.error(NO_DATA)
+        indicators = indicators_for(ticker, data, sma_windows=sorted({50, 200, window}), ema_windows=(window,))
+
+    if function_name == "get_stock_price_chatbot":
+        close = get_history(ticker, '1y').Close
+        if close.empty:
+            return NO_DATA, lambda: st.error(NO_DATA)
+        result = compact_result(ticker=ticker, price=close.iloc[-1],
+                                change_1d_pct=(close.iloc[-1] / close.iloc[-2] - 1) * 100 if len(close) > 1 else None)
+        return result, lambda: None
+
+    if function_name in ("calculate_SMA_chatbot", "calculate_EMA_chatbot"):
+        kind = 'SMA' if function_name == "calculate_SMA_chatbot" else 'EMA'
+        value = indicators[f'{kind}_{window}'].iloc[-1]
+        price = get_history(ticker, '1y').Close.iloc[-1]
+        result = compact_result(ticker=ticker, window=window, **{kind.lower(): value}, price=price,
+                                price_vs_pct=(price / value - 1) * 100)
+        return result, lambda: None
+
+    if function_name == "calculate_RSI_chatbot":
+        rsi = indicators['RSI'].iloc[-1]
+        zone = 'overbought' if rsi > 70 else 'oversold' if rsi < 30 else 'neutral'
+        return compact_result(ticker=ticker, rsi=rsi, zone=zone), lambda: None
+
+    if function_name == "calculate_MACD_chatbot":
+        macd, signal = indicators['MACD'].iloc[-1], indicators['MACD_signal'].iloc[-1]
+        return compact_result(ticker=ticker, macd=macd, signal=signal, hist=indicators['MACD_hist'].iloc[-1],
+                              trend='bullish' if macd > signal else 'bearish'), lambda: None
+
+    if function_name == "plot_stock_price_chatbot":
+        build = lambda: plot_stock_price(ticker)
+        if use_browser:
+            error = NO_DATA if get_history(ticker, '1y').empty else None
+        else:
+            # Render now so show() is a figure-cache hit
+            _, error = chart_image('price', ticker, '1y', build)
+        if error:
+            return error, lambda: st.error(error)
+        return "Chart displayed", lambda: display_chart('price', ticker, '1y', build,
+                                                        lambda data: price_line_spec(ticker, data))
+
+    if function_name == "plot_price_chart_chatbot":
+        chart_type = args.get('chart_type', 'Candlestick')
+        period = args.get('period', '3mo')
+        if chart_type not in PRICE_CHARTS or period not in CHART_PERIODS:
+            error = f"Error: Unsupported chart {chart_type} / {period}."
+            return error, lambda: st.error(error)
+        kind, plot_fn = PRICE_CHARTS[chart_type]
+        build = lambda: plot_fn(ticker, period)
+        data = get_history(ticker, period)
+        if data.empty:
+            return NO_DATA, lambda: st.error(NO_DATA)
+        if not use_browser:
+            chart_image(kind, ticker, period, build)
+        result = compact_result(ticker=ticker, chart=chart_type, period=period, last=data.Close.iloc[-1],
+                                high=data.High.max(), low=data.Low.min(),
+                                return_pct=(data.Close.iloc[-1] / data.Close.iloc[0] - 1) * 100)
+        return result, lambda: display_chart(kind, ticker, period, build,
+                                             lambda history: CHART_SPECS[chart_type](ticker, history))
+
+    if function_name == "get_stock_recommendation_chatbot":
+        rec_data, error = get_stock_recommendation(ticker, indicators)
+        if error:
+            return error, lambda: st.error(error)
+        result = json.dumps({k: v for k, v in rec_data.items() if k != 'chart'}, separators=(',', ':'))
+        return result, lambda: st.image(rec_data['chart'])
+
+    return f"Function {function_name} not found", lambda: None
+
+
+def dispatch_tool_calls(calls, use_browser=False):
+    """Run a turn's tool calls in parallel on one shared fetch per ticker.
+
+    `calls` is a list of (function_name, args); yields (position, (result, show))
+    as each call finishes.
+    """
+    calls = [(name, dict(args, ticker=str(args.get('ticker', '')).upper())) for name, args in calls]
+    prepared = prepare_tool_data(calls)
+
+    pending = []
+    for position, (name, args) in enumerate(calls):
+        if prepared[args['ticker']] is None:
+            # No data: answer right away instead of fetching again per call
+            yield position, (NO_DATA, lambda: st.error(NO_DATA))
+        else:
+            pending.append((position, (name, args, use_browser, prepared[args['ticker']])))
+
+    for index, outcome in run_as_completed(execute_tool, [task for _, task in pending]):
+        yield pending[index][0], outcome
+
+
+def market_data_version(ticker):
+    """Version of the ticker's daily bars, or None if there are none"""
+    data = get_history(ticker, '1y')
+    return None if data.empty else data_version(data)
+
+
+def compact_history():
+    """Fit st.session_state['messages'] into the token budget; returns tokens saved"""
+    messages, tokens_before, tokens_after = compact_messages(st.session_state['messages'])
+    st.session_state['messages'] = messages
+    return tokens_before - tokens_after
+
+
+def stream_reply(stream, placeholder):
+    """Write streamed completion text into `placeholder` as tokens arrive.
+
+    Returns (content, tool_calls), with tool-call fragments reassembled into
+    the message format the API expects back.
+    """
+    content = ""
+    tool_calls = {}
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content += delta.content
+            placeholder.markdown(content + "▌")
+        for fragment in delta.tool_calls or []:
+            call = tool_calls.setdefault(fragment.index, {
+                "id": None, "type": "function", "function": {"name": "", "arguments": ""}
+            })
+            if fragment.id:
+                call["id"] = fragment.id
+            if fragment.function and fragment.function.name:
+                call["function"]["name"] += fragment.function.name
+            if fragment.function and fragment.function.arguments:
+                call["function"]["arguments"] += fragment.function.arguments
+
+    if content:
+        placeholder.markdown(content)
+    else:
+        placeholder.empty()
+    return content, [tool_calls[i] for i in sorted(tool_calls)]
+
+
+# -------- TOOL DEFINITIONS -------- #
+
+functions = [
+    {
+        'name': 'plot_stock_price_chatbot',
+        'description': 'Plot last year stock price chart.',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}},
+            'required': ['ticker'],
+        }
+    },
+    {
+        'name': 'get_stock_recommendation_chatbot',
+        'description': 'Get buy/sell/hold recommendation with visual chart.',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}},
+            'required': ['ticker'],
+        }
+    },
+    {
+        'name': 'get_stock_price_chatbot',
+        'description': 'Latest closing price and 1-day change in percent.',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}},
+            'required': ['ticker'],
+        }
+    },
+    {
+        'name': 'calculate_SMA_chatbot',
+        'description': 'Latest simple moving average and how far the price is above/below it (percent).',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}, 'window': {'type': 'integer', 'default': 50}},
+            'required': ['ticker', 'window'],
+        }
+    },
+    {
+        'name': 'calculate_EMA_chatbot',
+        'description': 'Latest exponential moving average and how far the price is above/below it (percent).',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}, 'window': {'type': 'integer', 'default': 50}},
+            'required': ['ticker', 'window'],
+        }
+    },
+    {
+        'name': 'calculate_RSI_chatbot',
+        'description': 'Latest 14-day RSI and whether it is overbought, oversold or neutral.',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}},
+            'required': ['ticker'],
+        }
+    },
+    {
+        'name': 'calculate_MACD_chatbot',
+        'description': 'Latest MACD, signal and histogram values and the resulting trend.',
+        'parameters': {
+            'type': 'object',
+            'properties': {'ticker': {'type': 'string'}},
+            'required': ['ticker'],
+        }
+    },
+    {
+        'name': 'plot_price_chart_chatbot',
+        'description': 'Show a candlestick, line, bar or OHLC chart over a period; returns last/high/low/return.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'ticker': {'type': 'string'},
+                'chart_type': {'type': 'string', 'enum': list(PRICE_CHARTS)},
+                'period': {'type': 'string', 'enum': CHART_PERIODS},
+            },
+            'required': ['ticker', 'chart_type', 'period'],
+        }
+    }
+]
@@ -0,0 +1,240 @@
+"""Browser-rendered (Vega-Lite) versions of the chart functions.
+
+Instead of rendering a matplotlib image on the server, these builders ship a
+compact array of OHLCV values plus a Vega-Lite spec, and st.vega_lite_chart
+draws it in the browser with pan/zoom handled client-side. Long series are
+downsampled first: line series with LTTB (Largest-Triangle-Three-Buckets),
+OHLC bars by merging neighbouring bars into buckets.
+"""
+import numpy as np
+import pandas as pd
+
+# Upper bounds on points shipped to the browser per chart
+MAX_LINE_POINTS = 600
+MAX_OHLC_BARS = 300
+
+UP_COLOR = '#00ff88'
+DOWN_COLOR = '#ff4444'
+
+DARK_CONFIG = {
+    'background': '#0a0a0a',
+    'view': {'stroke': None},
+    'axis': {'labelColor': '#666666', 'titleColor': '#666666', 'gridColor': '#2a2a2a',
+             'gridOpacity': 0.5, 'domainColor': '#1a1a1a', 'tickColor': '#1a1a1a'},
+    'title': {'color': '#ffffff', 'fontSize': 16, 'fontWeight': 300},
+    'legend': {'labelColor': '#cccccc', 'titleColor': '#999999'},
+}
+
+
+# -------- DOWNSAMPLING -------- #
+
+def lttb_indices(y, threshold=MAX_LINE_POINTS):
+    """Indices of the points LTTB keeps from an evenly spaced series `y`"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_ohlc(data, max_bars=MAX_OHLC_BARS):
+    """Merge neighbouring bars so at most `max_bars` remain (open first, high max, ...)"""
+    if len(data) <= max_bars:
+        return data
+    bucket = np.arange(len(data)) * max_bars // len(data)
+    merged = data.groupby(bucket).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    # Label each bucket with the date of its first bar
+    merged.index = data.index[np.searchsorted(bucket, merged.index.to_numpy())]
+    return merged
+
+
+def _dates(index):
+    index = index.tz_localize(None) if index.tz is not None else index
+    fmt = '%Y-%m-%d' if (index == index.normalize()).all() else '%Y-%m-%dT%H:%M'
+    return index.strftime(fmt)
+
+
+def _records(index, **columns):
+    """Row records with rounded values; NaN becomes null"""
+    frame = pd.DataFrame({name: np.round(np.asarray(values, dtype=float), 4) for name, values in columns.items()})
+    frame.insert(0, 'date', list(_dates(index)))
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict('records')
+
+
+def _x():
+    return {'field': 'date', 'type': 'temporal', 'title': None}
+
+
+def _spec(title, values, **body):
+    spec = {
+        '$schema': 'https://vega.github.io/schema/vega-lite/v5.json',
+        'title': title,
+        'data': {'values': values},
+        'config': DARK_CONFIG,
+    }
+    spec.update(body)
+    return spec
+
+
+def _line_layers(series_names, colors, dashed=()):
+    """Folded multi-line layer with a legend"""
+    return {
+        'transform': [{'fold': list(series_names), 'as': ['series', 'value']}],
+        'mark': {'type': 'line', 'strokeWidth': 1.5},
+        'encoding': {
+            'x': _x(),
+            'y': {'field': 'value', 'type': 'quantitative', 'scale': {'zero': False}, 'title': 'Price'},
+            'color': {'field': 'series', 'type': 'nominal', 'title': None,
+                      'scale': {'domain': list(series_names), 'range': list(colors)}},
+            'strokeDash': {'condition': {'test': {'field': 'series', 'oneOf': list(dashed)}, 'value': [4, 3]},
+                           'value': [1, 0]},
+        },
+    }
+
+
+# -------- CHART SPECS -------- #
+
+def price_line_spec(ticker, data, title=None):
+    idx = lttb_indices(data.Close.values)
+    values = _records(data.index[idx], Close=data.Close.values[idx])
+    return _spec(title or f"{ticker} - Last Year Performance", values,
+                 mark={'type': 'line', 'color': '#ffffff', 'strokeWidth': 1.5},
+                 encoding={'x': _x(), 'y': {'field': 'Close', 'type': 'quantitative',
+                                            'scale': {'zero': False}, 'title': 'Price ($)'}},
+                 width='container', height=400)
+
+
+def candlestick_spec(ticker, data):
+    data = downsample_ohlc(data)
+    values = _records(data.index, open=data.Open, high=data.High, low=data.Low, close=data.Close)
+    color = {'condition': {'test': 'datum.close >= datum.open', 'value': UP_COLOR}, 'value': DOWN_COLOR}
+    return _spec(f"{ticker} - Candlestick Chart", values,
+                 encoding={'x': _x(), 'color': color},
+                 layer=[
+                     {'mark': 'rule',
+                      'encoding': {'y': {'field': 'low', 'type': 'quantitative', 'scale': {'zero': False},
+                                         'title': 'Price'},
+                                   'y2': {'field': 'high'}}},
+                     {'mark': {'type': 'bar', 'opacity': 0.9},
+                      'encoding': {'y': {'field': 'open', 'type': 'quantitative'}, 'y2': {'field': 'close'}}},
+                 ],
+                 width='container', height=450)
+
+
+def ohlc_spec(ticker, data):
+    data = downsample_ohlc(data)
+    values = _records(data.index, open=data.Open, high=data.High, low=data.Low, close=data.Close)
+    color = {'condition': {'test': 'datum.close >= datum.open', 'value': UP_COLOR}, 'value': DOWN_COLOR}
+    return _spec(f"{ticker} - OHLC Chart", values,
+                 encoding={'x': _x(), 'color': color},
+                 layer=[
+                     {'mark': {'type': 'rule', 'strokeWidth': 1.5},
+                      'encoding': {'y': {'field': 'low', 'type': 'quantitative', 'scale': {'zero': False},
+                                         'title': 'Price'},
+                                   'y2': {'field': 'high'}}},
+                     {'mark': {'type': 'tick', 'orient': 'horizontal', 'xOffset': -3, 'size': 6, 'thickness': 2},
+                      'encoding': {'y': {'field': 'open', 'type': 'quantitative'}}},
+                     {'mark': {'type': 'tick', 'orient': 'horizontal', 'xOffset': 3, 'size': 6, 'thickness': 2},
+                      'encoding': {'y': {'field': 'close', 'type': 'quantitative'}}},
+                 ],
+                 width='container', height=450)
+
+
+def line_chart_spec(ticker, data):
+    ma20 = data.Close.rolling(window=20).mean()
+    ma50 = data.Close.rolling(window=50).mean()
+    idx = lttb_indices(data.Close.values)
+    values = _records(data.index[idx], **{'Close Price': data.Close.values[idx],
+                                          'MA(20)': ma20.values[idx], 'MA(50)': ma50.values[idx]})
+    return _spec(f"{ticker} - Line Chart with Moving Averages", values,
+                 **_line_layers(['Close Price', 'MA(20)', 'MA(50)'], ['#00ff88', '#ffaa00', '#ff6b6b'],
+                                dashed=['MA(20)', 'MA(50)']),
+                 width='container', height=450)
+
+
+def bar_chart_spec(ticker, data):
+    data = downsample_ohlc(data)
+    values = _records(data.index, open=data.Open, close=data.Close, volume=data.Volume)
+    color = {'condition': {'test': 'datum.close >= datum.open', 'value': UP_COLOR}, 'value': DOWN_COLOR}
+    return _spec(f"{ticker} - Bar Chart (Price & Volume)", values,
+                 vconcat=[
+                     {'mark': {'type': 'bar', 'opacity': 0.7},
+                      'encoding': {'x': _x(), 'color': color,
+                                   'y': {'field': 'close', 'type': 'quantitative', 'title': 'Price'}},
+                      'width': 'container', 'height': 330},
+                     {'mark': {'type': 'bar', 'opacity': 0.5},
+                      'encoding': {'x': _x(), 'color': color,
+                                   'y': {'field': 'volume', 'type': 'quantitative', 'title': 'Volume'}},
+                      'width': 'container', 'height': 110},
+                 ])
+
+
+def indicator_spec(ticker, indicator_name, price, data, window=None):
+    """Vega-Lite equivalent of plot_indicator; `data` is what plot_indicator takes"""
+    if indicator_name in ('SMA', 'EMA'):
+        label = f'{indicator_name}({window})'
+        idx = lttb_indices(price.values)
+        values = _records(price.index[idx], Price=price.values[idx], **{label: data.reindex(price.index).values[idx]})
+        return _spec(f"{ticker} - {label}", values,
+                     **_line_layers(['Price', label], ['#ffffff', '#00ff88']),
+                     width='container', height=400)
+
+    if indicator_name == 'RSI':
+        idx = lttb_indices(price.values)
+        values = _records(price.index[idx], price=price.values[idx], rsi=data.reindex(price.index).values[idx])
+        lower = {'mark': {'type': 'line', 'color': '#00ff88', 'strokeWidth': 2},
+                 'encoding': {'x': _x(), 'y': {'field': 'rsi', 'type': 'quantitative', 'title': 'RSI',
+                                               'scale': {'domain': [0, 100]}}}}
+        bands = [{'mark': {'type': 'rule', 'color': '#ff4444', 'strokeDash': [4, 3], 'opacity': 0.5},
+                  'encoding': {'y': {'datum': level}}} for level in (30, 70)]
+        lower_panel = {'layer': [lower] + bands, 'width': 'container', 'height': 150}
+    elif indicator_name == 'MACD':
+        macd_line, signal_line, histogram, dates = data
+        idx = lttb_indices(price.values)
+        values = _records(price.index[idx], price=price.values[idx],
+                          macd=macd_line.reindex(price.index).values[idx],
+                          signal=signal_line.reindex(price.index).values[idx],
+                          hist=histogram.reindex(price.index).values[idx])
+        hist_color = {'condition': {'test': 'datum.hist > 0', 'value': UP_COLOR}, 'value': DOWN_COLOR}
+        lower_panel = {'layer': [
+            {'mark': {'type': 'bar', 'opacity': 0.3},
+             'encoding': {'x': _x(), 'y': {'field': 'hist', 'type': 'quantitative', 'title': 'MACD'},
+                          'color': hist_color}},
+            {'mark': {'type': 'line', 'color': '#00ff88', 'strokeWidth': 2},
+             'encoding': {'x': _x(), 'y': {'field': 'macd', 'type': 'quantitative'}}},
+            {'mark': {'type': 'line', 'color': '#ff6b6b', 'strokeWidth': 2},
+             'encoding': {'x': _x(), 'y': {'field': 'signal', 'type': 'quantitative'}}},
+        ], 'width': 'container', 'height': 150}
+    else:
+        raise ValueError(f"Unknown indicator: {indicator_name}")
+
+    price_panel = {'mark': {'type': 'line', 'color': '#ffffff', 'strokeWidth': 1.5},
+                   'encoding': {'x': _x(), 'y': {'field': 'price', 'type': 'quantitative',
+                                                 'scale': {'zero': False}, 'title': 'Price ($)'}},
+                   'width': 'container', 'height': 300}
+    return _spec(f"{ticker} - {indicator_name}", values, vconcat=[price_panel, lower_panel])
+
+
+CHART_SPECS = {
+    'Candlestick': candlestick_spec,
+    'Line Chart': line_chart_spec,
+    'Bar Chart': bar_chart_spec,
+    'OHLC': ohlc_spec,
+}
@@ -0,0 +1,29 @@
+"""Bounded thread pool for independent downloads and chatbot tool calls.
+
+Work submitted here must not call Streamlit functions: worker threads have no
+script-run context. Do the fetching/rendering in the pool and draw the results
+on the main thread.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Upper bound on concurrent downloads per process, shared by all sessions
+MAX_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fetch')
+
+
+def submit(fn, *args, **kwargs):
+    """Schedule fn(*args, **kwargs) on the shared pool and return its Future"""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def run_as_completed(fn, arg_tuples):
+    """Call fn(*args) for each tuple in parallel, yielding (position, result) as each finishes.
+
+    Positions refer to `arg_tuples`, so callers can restore the original order
+    (e.g. tool results, which the OpenAI API expects in tool_call order).
+    Exceptions raised by `fn` propagate from the iteration.
+    """
+    futures = {_executor.submit(fn, *args): position for position, args in enumerate(arg_tuples)}
+    for future in as_completed(futures):
+        yield futures[future], future.result()
@@ -0,0 +1,79 @@
+"""Bounded cache of rendered chart images.
+
+Figures are rendered once to PNG/SVG bytes and reused across Streamlit reruns
+and sessions. Keys should include a version of the underlying data (see
+market_data.data_version) so a chart is only rebuilt once new bars arrive.
+"""
+import io
+import threading
+from collections import OrderedDict
+
+from figures import release
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Same resolution st.pyplot renders at
+RENDER_DPI = 200
+
+
+def render_figure(fig, fmt='png'):
+    """Render a figure to image bytes and release it, even if rendering fails"""
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format=fmt, dpi=RENDER_DPI, bbox_inches='tight', facecolor=fig.get_facecolor())
+    finally:
+        release(fig)
+    return buf.getvalue()
+
+
+class FigureCache:
+    """LRU of rendered images, bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, build, fmt='png'):
+        """Return (image_bytes, error); `build()` must return (fig, error)"""
+        key = (fmt,) + tuple(key)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image, None
+            self.misses += 1
+
+        fig, error = build()
+        if error:
+            return None, error
+        image = render_figure(fig, fmt)
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = image
+                self._size += len(image)
+            while self._images and (len(self._images) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+        return image, None
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._images), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+_cache = FigureCache()
+
+
+def get_or_render(key, build, fmt='png'):
+    return _cache.get_or_render(key, build, fmt)
+
+
+def cache_stats():
+    return _cache.stats()
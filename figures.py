@@ -0,0 +1,54 @@
+"""Figure factory that keeps charts out of pyplot's global state.
+
+Figures are built with the object-oriented matplotlib.figure.Figure API, so
+they are never registered with pyplot and are freed as soon as nothing
+references them. The dark theme is applied once, when this module is
+imported, rather than on every plot call.
+"""
+import os
+import weakref
+
+import matplotlib.style
+from matplotlib.figure import Figure
+
+BACKGROUND = '#0a0a0a'
+
+matplotlib.style.use('dark_background')
+
+_live_figures = weakref.WeakSet()
+
+
+def new_figure(figsize, facecolor=BACKGROUND):
+    """Blank themed figure, tracked for figure_stats()"""
+    fig = Figure(figsize=figsize)
+    fig.patch.set_facecolor(facecolor)
+    _live_figures.add(fig)
+    return fig
+
+
+def subplots(*args, figsize, **kwargs):
+    """Object-oriented replacement for plt.subplots"""
+    fig = new_figure(figsize)
+    return fig, fig.subplots(*args, **kwargs)
+
+
+def release(fig):
+    """Drop a figure's artists right away instead of waiting for the GC"""
+    fig.clear()
+    _live_figures.discard(fig)
+
+
+def _process_rss():
+    """Resident set size in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def figure_stats():
+    """Live figure count, their estimated RGBA buffer size and process RSS"""
+    figures = list(_live_figures)
+    buffer_bytes = sum(int(fig.bbox.width) * int(fig.bbox.height) * 4 for fig in figures)
+    return {"live_figures": len(figures), "figure_bytes": buffer_bytes, "process_rss": _process_rss()}
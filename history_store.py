@@ -0,0 +1,258 @@
+"""Persistent on-disk OHLCV history with incremental gap-fill downloads.
+
+Each ticker/interval pair gets its own folder of append-only Parquet segments:
+
+    <HISTORY_STORE_DIR>/<TICKER>/<interval>/
+        meta.json                 earliest date the stored bars are complete from
+        <millis>-<id>.parquet     one segment per download, newest last
+
+Reading concatenates the segments and lets later bars override earlier ones,
+so a refreshed (previously in-progress) bar simply lands in a newer segment.
+
+Yahoo's bars are split- and dividend-adjusted, and an adjustment rewrites
+every earlier close. Each refresh therefore also refetches the last closed
+bar held; if its close moved, the whole range is downloaded again and
+replaces the segments instead of being appended to the stale ones.
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+import pandas as pd
+import yfinance as yf
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+HISTORY_STORE_DIR = os.environ.get('HISTORY_STORE_DIR', 'history_store')
+# Segments are merged into one once a folder holds more than this many
+MAX_SEGMENTS = 16
+# A closed bar whose close moved by more than this (relative) was re-adjusted for a split or dividend
+ADJUSTMENT_TOLERANCE = 1e-6
+
+_PERIOD_RE = re.compile(r'^(\d+)(d|wk|mo|y)$')
+
+
+def period_start(period, now=None):
+    """First calendar day covered by a yfinance period string (None for 'max')"""
+    today = pd.Timestamp(now if now is not None else pd.Timestamp.now()).normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return today.replace(month=1, day=1)
+
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        'd': pd.DateOffset(days=n),
+        'wk': pd.DateOffset(weeks=n),
+        'mo': pd.DateOffset(months=n),
+        'y': pd.DateOffset(years=n),
+    }
+    return today - offsets[unit]
+
+
+def slice_period(data, period):
+    """Rows of `data` inside `period`, sliced positionally so no data is copied"""
+    if data.empty or period == 'max':
+        return data
+
+    match = _PERIOD_RE.match(period)
+    if match and match.group(2) == 'd':
+        # yfinance counts 'Nd' in trading sessions, not calendar days
+        sessions = data.index.normalize().unique()
+        start = sessions[-min(int(match.group(1)), len(sessions))]
+    else:
+        start = period_start(period)
+        if data.index.tz is not None:
+            start = start.tz_localize(data.index.tz)
+
+    return data.iloc[data.index.searchsorted(start):]
+
+
+def _download(ticker, interval, period=None, start=None, end=None):
+    kwargs = {'interval': interval}
+    if start is not None:
+        kwargs['start'] = start
+        if end is not None:
+            kwargs['end'] = end
+    else:
+        kwargs['period'] = period
+    return yf.Ticker(ticker).history(**kwargs)
+
+
+def _has_new_bars(stored, newer):
+    """True if `newer` adds bars past the stored tail or revises the last one"""
+    if newer.empty:
+        return False
+    last = stored.index[-1]
+    if newer.index[-1] > last:
+        return True
+    if last not in newer.index:
+        return False
+    return any(newer.at[last, col] != stored.at[last, col] for col in ('Close', 'High', 'Low', 'Volume'))
+
+
+def _readjusted(stored, newer):
+    """True if `newer` changed the close of the last closed stored bar (the one before the newest)"""
+    if len(stored) < 2 or newer.empty:
+        return False
+    closed = stored.index[-2]
+    if closed not in newer.index:
+        return False
+    old, new = stored.at[closed, 'Close'], newer.at[closed, 'Close']
+    return abs(new - old) > ADJUSTMENT_TOLERANCE * abs(old)
+
+
+def _bar_start(timestamp, interval):
+    """Naive download start that includes the bar at `timestamp`"""
+    timestamp = timestamp.tz_localize(None)
+    return timestamp if interval.endswith(('m', 'h')) else timestamp.normalize()
+
+
+def _dedupe(frame):
+    return frame[~frame.index.duplicated(keep='last')].sort_index()
+
+
+class HistoryStore:
+    """Per-ticker history store that only downloads bars it does not hold yet"""
+
+    def __init__(self, root=HISTORY_STORE_DIR, downloader=None):
+        self.root = root
+        self._download = downloader or _download
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # ---- public API ----
+
+    def load(self, ticker, period='1y', interval='1d'):
+        """Return `period` of history, fetching only the missing older/newer bars"""
+        ticker = ticker.upper()
+        folder = os.path.join(self.root, ticker, interval)
+
+        with self._lock_for(folder):
+            stored = self.read(ticker, interval)
+            start = period_start(period)
+
+            if stored.empty:
+                fresh = self._download(ticker, interval, period=period)
+                if fresh.empty:
+                    return fresh
+                self._append(folder, fresh)
+                self._write_meta(folder, start)
+                return fresh
+
+            if self._needs_backfill(folder, start, stored):
+                older = self._fetch_gap(ticker, interval, start=start, end=stored.index[0],
+                                        period='max' if start is None else None)
+                if older is not None and not older.empty:
+                    self._append(folder, older)
+                    stored = _dedupe(pd.concat([older, stored]))
+                self._write_meta(folder, start)
+
+            # The last stored bar may have been captured mid-session, so refetch it too, along with
+            # the closed bar before it to notice re-adjusted history
+            newer = self._fetch_gap(ticker, interval, start=_bar_start(stored.index[-min(2, len(stored))], interval))
+            if newer is not None and _readjusted(stored, newer):
+                covered_from = self._read_meta(folder).get('covered_from')
+                full = self._fetch_gap(ticker, interval, period='max' if covered_from == 'max' else None,
+                                       start=None if covered_from == 'max' else _bar_start(stored.index[0], interval))
+                if full is not None and not full.empty:
+                    self._replace(folder, full, self._segments(folder))
+                    return slice_period(_dedupe(full), period)
+            if newer is not None and _has_new_bars(stored, newer):
+                self._append(folder, newer)
+                stored = _dedupe(pd.concat([stored, newer]))
+
+            return slice_period(stored, period)
+
+    def read(self, ticker, interval='1d'):
+        """All stored bars for a ticker, without touching the network"""
+        folder = os.path.join(self.root, ticker.upper(), interval)
+        frames = []
+        for path in self._segments(folder):
+            try:
+                frames.append(pd.read_parquet(path))
+            except FileNotFoundError:
+                # Merged away by a concurrent compaction in another process
+                continue
+        if not frames:
+            return pd.DataFrame()
+        return _dedupe(pd.concat(frames))
+
+    # ---- internals ----
+
+    def _lock_for(self, folder):
+        with self._locks_guard:
+            return self._locks.setdefault(folder, threading.Lock())
+
+    def _fetch_gap(self, ticker, interval, start=None, end=None, period=None):
+        try:
+            return self._download(ticker, interval, period=period, start=start, end=end)
+        except Exception:
+            # Serve what we already hold if the incremental fetch fails
+            return None
+
+    def _needs_backfill(self, folder, start, stored):
+        covered_from = self._read_meta(folder).get('covered_from')
+        if covered_from == 'max':
+            return False
+        if start is None:
+            return True
+        if covered_from is None:
+            covered_from = stored.index[0].tz_localize(None).normalize()
+        return start < pd.Timestamp(covered_from)
+
+    @staticmethod
+    def _segments(folder):
+        if not os.path.isdir(folder):
+            return []
+        return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.parquet'))
+
+    def _append(self, folder, frame):
+        os.makedirs(folder, exist_ok=True)
+        name = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(folder, f".{name}.tmp")
+        frame.to_parquet(tmp_path)
+        os.replace(tmp_path, os.path.join(folder, name))
+
+        segments = self._segments(folder)
+        if len(segments) > MAX_SEGMENTS:
+            self._replace(folder, _dedupe(pd.concat(pd.read_parquet(path) for path in segments)), segments)
+
+    def _replace(self, folder, merged, segments):
+        """Write `merged` as one segment and remove `segments`"""
+        name = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(folder, f".{name}.tmp")
+        merged.to_parquet(tmp_path)
+        os.replace(tmp_path, os.path.join(folder, name))
+        for path in segments:
+            os.remove(path)
+
+    @staticmethod
+    def _read_meta(folder):
+        path = os.path.join(folder, 'meta.json')
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _write_meta(self, folder, start):
+        meta = self._read_meta(folder)
+        if start is None:
+            meta['covered_from'] = 'max'
+        else:
+            current = meta.get('covered_from')
+            if current != 'max' and (current is None or start < pd.Timestamp(current)):
+                meta['covered_from'] = start.strftime('%Y-%m-%d')
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
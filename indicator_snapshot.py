@@ -0,0 +1,190 @@
+"""Daily snapshot of precomputed indicators for a ticker universe.
+
+A batch job (run once a day, e.g. from cron after the close) reads each
+ticker's bars from the local history store, computes the SMA/EMA windows,
+RSI, MACD and volume ratio the pages use, and writes the full 1y series to
+one compressed .npz file. Pages call snapshot_indicators() first and compute live only
+for tickers or windows the snapshot does not hold, once it is older
+than SNAPSHOT_MAX_AGE, or once the live history has a newer or revised bar.
+
+The job makes no network calls unless --refresh is given, in which case
+each ticker's history is brought up to date through the store first.
+
+Usage:
+    python indicator_snapshot.py AAPL MSFT RELIANCE.NS
+    python indicator_snapshot.py --file universe.txt --refresh
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from history_store import PARQUET_AVAILABLE, HistoryStore, slice_period
+from indicators import compute_indicators
+from symbols import POPULAR_COMPANIES
+
+SNAPSHOT_PATH = os.environ.get('INDICATOR_SNAPSHOT_PATH', 'indicator_snapshot.npz')
+# The snapshot is ignored once it is older than this many seconds
+SNAPSHOT_MAX_AGE = 26 * 3600
+SNAPSHOT_PERIOD = '1y'
+# SMA/EMA windows precomputed per ticker; 50 and 200 are needed by the recommendation score
+SNAPSHOT_WINDOWS = (10, 20, 50, 100, 200)
+
+_META_KEY = '__meta__'
+
+
+def _key(ticker, name):
+    return f"{ticker}|{name}"
+
+
+def build_snapshot(tickers, path=SNAPSHOT_PATH, store=None, windows=SNAPSHOT_WINDOWS,
+                   period=SNAPSHOT_PERIOD, refresh=False):
+    """Compute indicators for every ticker with stored history and write the snapshot.
+
+    Returns the tickers included; tickers without stored bars are skipped.
+    """
+    store = store or HistoryStore()
+    arrays = {}
+    included = []
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        data = store.load(ticker, period) if refresh else slice_period(store.read(ticker), period)
+        if data.empty:
+            continue
+        indicators = compute_indicators(data.Close, data.Volume, sma_windows=windows, ema_windows=windows)
+        index = data.index
+        utc = index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index
+        arrays[_key(ticker, 'index')] = utc.to_numpy(dtype='datetime64[ns]')
+        arrays[_key(ticker, 'Close')] = data.Close.to_numpy(dtype=float)
+        for name, series in indicators.items():
+            arrays[_key(ticker, name)] = series.to_numpy(dtype=float)
+        included.append((ticker, str(index.tz) if index.tz is not None else None))
+
+    meta = {'built_at': time.time(), 'period': period, 'windows': list(windows),
+            'tickers': dict(included)}
+    arrays[_META_KEY] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+
+    # np.savez appends .npz to names without it, so write to a temporary name that has it
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+    return [ticker for ticker, _ in included]
+
+
+class IndicatorSnapshot:
+    """Read side of the snapshot file; reloads when the file changes"""
+
+    def __init__(self, path=SNAPSHOT_PATH, max_age=SNAPSHOT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._file = None
+        self._mtime = None
+        self._meta = {}
+        self._series = {}  # (ticker, name) -> Series
+        self.hits = 0
+        self.misses = 0
+
+    def _refresh(self):
+        """Open the current file, or drop a deleted one (lock held)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        if self._file is not None:
+            self._file.close()
+        self._file, self._meta, self._series, self._mtime = None, {}, {}, mtime
+        if mtime is not None:
+            self._file = np.load(self.path)
+            self._meta = json.loads(self._file[_META_KEY].tobytes())
+
+    def _fresh(self):
+        return bool(self._meta) and time.time() - self._meta['built_at'] <= self.max_age
+
+    def _series_for(self, ticker, name):
+        """Decompress one stored series on first use (lock held)"""
+        series = self._series.get((ticker, name))
+        if series is None:
+            index = pd.DatetimeIndex(self._file[_key(ticker, 'index')])
+            tz = self._meta['tickers'][ticker]
+            if tz is not None:
+                index = index.tz_localize('UTC').tz_convert(tz)
+            series = self._series[(ticker, name)] = pd.Series(self._file[_key(ticker, name)], index=index)
+        return series
+
+    def lookup(self, ticker, names, current=None):
+        """{name: series} for all `names` (e.g. 'Close', 'SMA_50', 'RSI'), or None on a miss.
+
+        `current` is the live history the values will be shown next to; the
+        snapshot then only hits if it ends on the same bar with the same close.
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            self._refresh()
+            if (not self._fresh() or ticker not in self._meta['tickers']
+                    or any(_key(ticker, name) not in self._file for name in names)
+                    or current is not None and not self._ends_with(ticker, current)):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return {name: self._series_for(ticker, name) for name in names}
+
+    def _ends_with(self, ticker, current):
+        """Whether the stored bars end where `current` does (lock held)"""
+        close = self._series_for(ticker, 'Close')
+        return (not current.empty and close.index[-1] == current.index[-1]
+                and close.iloc[-1] == current.Close.iloc[-1])
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            return {"tickers": len(self._meta.get('tickers', ())), "built_at": self._meta.get('built_at'),
+                    "fresh": self._fresh(), "hits": self.hits, "misses": self.misses}
+
+
+_snapshot = IndicatorSnapshot()
+
+
+def snapshot_indicators(ticker, names, current=None):
+    """Precomputed series for `names`, or None if the snapshot cannot serve all of them
+    (or, given the live history `current`, a newer or revised bar has arrived since)"""
+    return _snapshot.lookup(ticker, names, current)
+
+
+def snapshot_stats():
+    return _snapshot.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute indicator snapshots from the local history store")
+    parser.add_argument('tickers', nargs='*', help="defaults to every symbol in POPULAR_COMPANIES")
+    parser.add_argument('--file', help="file with one ticker per line")
+    parser.add_argument('--windows', default=','.join(map(str, SNAPSHOT_WINDOWS)),
+                        help="comma-separated SMA/EMA windows")
+    parser.add_argument('--refresh', action='store_true', help="download missing bars before computing")
+    parser.add_argument('--output', default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if not PARQUET_AVAILABLE:
+        parser.error("the history store needs pyarrow")
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not tickers:
+        tickers = sorted(set(POPULAR_COMPANIES.values()))
+    windows = tuple(int(w) for w in args.windows.split(',') if w)
+
+    start = time.perf_counter()
+    included = build_snapshot(tickers, args.output, windows=windows, refresh=args.refresh)
+    print(f"{len(included)} of {len(tickers)} tickers written to {args.output} "
+          f"({os.path.getsize(args.output) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
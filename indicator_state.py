@@ -0,0 +1,373 @@
+"""Recursive indicators that advance bar by bar instead of recomputing.
+
+EMA, Wilder RSI and MACD depend only on their previous value and the new
+close, so the state objects below keep just that and extend a series by N
+new bars in O(N). They follow the same recursions as compute_indicators
+(seeded at the first bar, pandas ewm(adjust=False)), so a tracker started on
+a window gives the same series as a full recompute of that window; after
+that it keeps the longer warm-up instead of reseeding at the window start.
+
+The newest bar of an open session keeps changing until it closes, so each
+state holds the committed bars plus one pending bar: a revised pending bar
+is re-evaluated from the committed state (peek) and only folded in (push)
+once a newer bar arrives.
+
+incremental_indicators() keeps a tracker and its output series for the
+MAX_TRACKED most recently used (ticker, interval) pairs and, when the
+history store is in use, saves both as indicators.npz in the ticker's store
+folder whenever a new bar arrives (not on every revision of the pending one), so a restart
+resumes from the last bar instead of recomputing.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from history_store import HISTORY_STORE_DIR, PARQUET_AVAILABLE
+from indicators import MACD_SPANS, RSI_PERIOD
+
+STATE_FILE = 'indicators.npz'
+# A stored close may differ by this much from a re-download (e.g. rounding) before the state is rebuilt
+CLOSE_TOLERANCE = 1e-9
+
+
+class EMAState:
+    """Exponential moving average, as pandas ewm(span=span, adjust=False)"""
+
+    def __init__(self, span, value=None):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = value
+
+    def peek(self, x):
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def push(self, x):
+        self.value = self.peek(x)
+        return self.value
+
+    def to_dict(self):
+        return {'span': self.span, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['span'], state['value'])
+
+
+class RSIState:
+    """Wilder RSI: gains and losses smoothed with alpha = 1 / period"""
+
+    def __init__(self, period=RSI_PERIOD, prev_close=None, avg_gain=None, avg_loss=None):
+        self.period = period
+        self.prev_close = prev_close
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+
+    def _next(self, x):
+        """(avg_gain, avg_loss) after close `x`; None on the first bar, which has no change"""
+        if self.prev_close is None:
+            return None
+        delta = x - self.prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if self.avg_gain is None:
+            return gain, loss
+        alpha = 1.0 / self.period
+        return self.avg_gain + alpha * (gain - self.avg_gain), self.avg_loss + alpha * (loss - self.avg_loss)
+
+    @staticmethod
+    def _rsi(averages):
+        if averages is None:
+            return math.nan
+        avg_gain, avg_loss = averages
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def peek(self, x):
+        return self._rsi(self._next(x))
+
+    def push(self, x):
+        averages = self._next(x)
+        if averages is not None:
+            self.avg_gain, self.avg_loss = averages
+        self.prev_close = x
+        return self._rsi(averages)
+
+    def to_dict(self):
+        return {'period': self.period, 'prev_close': self.prev_close, 'avg_gain': self.avg_gain,
+                'avg_loss': self.avg_loss}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['period'], state['prev_close'], state['avg_gain'], state['avg_loss'])
+
+
+class MACDState:
+    """MACD line, signal line and histogram from three EMAs"""
+
+    def __init__(self, fast=MACD_SPANS[0], slow=MACD_SPANS[1], signal=MACD_SPANS[2]):
+        self.fast, self.slow, self.signal = EMAState(fast), EMAState(slow), EMAState(signal)
+
+    def peek(self, x):
+        macd = self.fast.peek(x) - self.slow.peek(x)
+        signal = self.signal.peek(macd)
+        return macd, signal, macd - signal
+
+    def push(self, x):
+        macd = self.fast.push(x) - self.slow.push(x)
+        signal = self.signal.push(macd)
+        return macd, signal, macd - signal
+
+    def to_dict(self):
+        return {'fast': self.fast.to_dict(), 'slow': self.slow.to_dict(), 'signal': self.signal.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        macd = cls()
+        macd.fast = EMAState.from_dict(state['fast'])
+        macd.slow = EMAState.from_dict(state['slow'])
+        macd.signal = EMAState.from_dict(state['signal'])
+        return macd
+
+
+class IndicatorTracker:
+    """EMA_<n>, RSI and MACD state for one ticker/interval, with one pending (revisable) bar"""
+
+    def __init__(self, ema_windows=(), rsi_period=RSI_PERIOD, macd_spans=MACD_SPANS):
+        self.emas = {span: EMAState(span) for span in sorted(set(ema_windows))}
+        self.rsi = RSIState(rsi_period)
+        self.macd = MACDState(*macd_spans)
+        self.committed_close = None  # close of the last committed bar
+        self.pending = None          # (timestamp, close) of the newest bar
+
+    def names(self):
+        return [f'EMA_{span}' for span in self.emas] + ['RSI', 'MACD', 'MACD_signal', 'MACD_hist']
+
+    def _values(self, x, commit):
+        step = 'push' if commit else 'peek'
+        values = [getattr(ema, step)(x) for ema in self.emas.values()]
+        values.append(getattr(self.rsi, step)(x))
+        values.extend(getattr(self.macd, step)(x))
+        return values
+
+    def consistent_with(self, close):
+        """False if `close` disagrees with the last committed bar (e.g. re-adjusted history)
+        or starts after the pending bar, so the bars in between were never seen"""
+        if self.pending is None:
+            return True
+        if close.index[0] > self.pending[0]:
+            return False
+        position = close.index.searchsorted(self.pending[0])
+        if position == 0 or self.committed_close is None:
+            return True
+        stored = close.iloc[position - 1]
+        return math.isnan(stored) or abs(stored - self.committed_close) <= CLOSE_TOLERANCE * max(1.0, abs(self.committed_close))
+
+    def advance(self, close):
+        """Apply the bars of `close` not seen yet, revising the pending bar if it reappears.
+
+        Returns (timestamps, rows): one row of values (in names() order) per
+        applied bar. Bars older than the pending one are skipped.
+        """
+        timestamps, rows = [], []
+        last_close = self.pending[1] if self.pending is not None else None
+        start = 0 if self.pending is None else close.index.searchsorted(self.pending[0])
+        for timestamp, x in zip(close.index[start:], close.to_numpy(dtype=float)[start:]):
+            if math.isnan(x):
+                # Carry the last close over gaps, as compute_indicators does
+                if last_close is None:
+                    continue
+                x = last_close
+            if self.pending is not None and timestamp > self.pending[0]:
+                self._values(self.pending[1], commit=True)
+                self.committed_close = self.pending[1]
+            self.pending = (timestamp, x)
+            last_close = x
+            timestamps.append(timestamp)
+            rows.append(self._values(x, commit=False))
+        return timestamps, rows
+
+    def to_dict(self):
+        return {
+            'emas': [ema.to_dict() for ema in self.emas.values()],
+            'rsi': self.rsi.to_dict(),
+            'macd': self.macd.to_dict(),
+            'committed_close': self.committed_close,
+            'pending': None if self.pending is None else [self.pending[0].isoformat(), self.pending[1]],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        tracker = cls()
+        tracker.emas = {ema['span']: EMAState.from_dict(ema) for ema in state['emas']}
+        tracker.rsi = RSIState.from_dict(state['rsi'])
+        tracker.macd = MACDState.from_dict(state['macd'])
+        tracker.committed_close = state['committed_close']
+        if state['pending'] is not None:
+            tracker.pending = (pd.Timestamp(state['pending'][0]), state['pending'][1])
+        return tracker
+
+
+class TrackedSeries:
+    """A tracker plus the output series it has produced, trimmed to the last requested window.
+
+    Outputs live in preallocated arrays (one row per bar, one column per
+    name) so extending by N bars writes N rows instead of rebuilding lists.
+    """
+
+    def __init__(self, tracker, capacity=256):
+        self.tracker = tracker
+        self.names = tracker.names()
+        self.times = np.empty(capacity, dtype=np.int64)  # bar timestamps as UTC nanoseconds
+        self.values = np.empty((capacity, len(self.names)))
+        self.start = 0  # first row still in the requested window
+        self.size = 0   # rows written
+
+    def _times(self):
+        return self.times[self.start:self.size]
+
+    def _reserve(self, rows):
+        """Make room for `rows` more rows, dropping rows before `start` first"""
+        if self.size + rows <= len(self.times):
+            return
+        live = self.size - self.start
+        capacity = max(len(self.times), 2 * (live + rows))
+        times, values = np.empty(capacity, dtype=np.int64), np.empty((capacity, len(self.names)))
+        times[:live], values[:live] = self.times[self.start:self.size], self.values[self.start:self.size]
+        self.times, self.values, self.start, self.size = times, values, 0, live
+
+    def extend(self, close):
+        """Advance over `close`; False if the stored outputs cannot cover it and must be rebuilt"""
+        held = self._times()
+        if len(held) and (close.index[0].value < held[0] or not self.tracker.consistent_with(close)):
+            return False
+        timestamps, rows = self.tracker.advance(close)
+        if timestamps:
+            # The first applied bar may be a revision of the last stored one
+            keep = self.start + int(np.searchsorted(held, timestamps[0].value))
+            self.size = keep
+            self._reserve(len(rows))
+            self.times[self.size:self.size + len(rows)] = [t.value for t in timestamps]
+            self.values[self.size:self.size + len(rows)] = rows
+            self.size += len(rows)
+        return True
+
+    def series(self, index):
+        """Output series aligned with `index` (the window just extended over), or None if misaligned"""
+        held = self._times()
+        offset = int(np.searchsorted(held, index[0].value))
+        if len(held) - offset != len(index):
+            return None
+        # Only this window is asked for again, so older rows can be overwritten
+        self.start += offset
+        window = self.values[self.start:self.size]
+        return {name: pd.Series(window[:, column].copy(), index=index) for column, name in enumerate(self.names)}
+
+    def save(self, path):
+        """Write the tracker state and outputs as an .npz file"""
+        state = json.dumps({'tracker': self.tracker.to_dict(), 'names': self.names}).encode()
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, times=self._times(), values=self.values[self.start:self.size],
+                     state=np.frombuffer(state, dtype=np.uint8))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as stored:
+            state = json.loads(stored['state'].tobytes())
+            tracked = cls(IndicatorTracker.from_dict(state['tracker']), capacity=max(256, 2 * len(stored['times'])))
+            if tracked.names != state['names']:
+                raise ValueError("stored outputs do not match the tracker")
+            tracked.size = len(stored['times'])
+            tracked.times[:tracked.size] = stored['times']
+            tracked.values[:tracked.size] = stored['values']
+        return tracked
+
+
+# -------- PROCESS-WIDE TRACKERS -------- #
+
+# Trackers kept in memory (least recently used dropped first); dropped ones reload from their state file
+MAX_TRACKED = 256
+
+_tracked = OrderedDict()  # (ticker, interval) -> TrackedSeries
+_lock = threading.Lock()  # guards _tracked and _key_locks only
+_key_locks = {}
+
+
+def _lock_for(key):
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _get(key):
+    with _lock:
+        tracked = _tracked.get(key)
+        if tracked is not None:
+            _tracked.move_to_end(key)
+        return tracked
+
+
+def _put(key, tracked):
+    with _lock:
+        _tracked[key] = tracked
+        _tracked.move_to_end(key)
+        while len(_tracked) > MAX_TRACKED:
+            evicted, _ = _tracked.popitem(last=False)
+            _key_locks.pop(evicted, None)
+
+
+def _state_path(ticker, interval):
+    return os.path.join(HISTORY_STORE_DIR, ticker, interval, STATE_FILE)
+
+
+def _load(ticker, interval):
+    if not PARQUET_AVAILABLE:
+        return None
+    try:
+        return TrackedSeries.load(_state_path(ticker, interval))
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def incremental_indicators(ticker, close, interval='1d', ema_windows=()):
+    """EMA_<n> (for `ema_windows`), RSI, MACD, MACD_signal and MACD_hist series aligned with `close`.
+
+    Only bars newer than the last call for this ticker/interval are
+    evaluated. The tracker is rebuilt from `close` when it lacks a window,
+    `close` starts before the outputs held or after the last bar seen, or
+    history was revised. Each ticker/interval has its own lock, so tickers
+    do not wait on each other's computation or state file.
+    """
+    key = (ticker.upper(), interval)
+    with _lock_for(key):
+        tracked = _get(key) or _load(*key) or TrackedSeries(IndicatorTracker(ema_windows))
+        before = tracked.tracker.pending[0] if tracked.tracker.pending else None
+
+        result = None
+        if set(ema_windows) <= set(tracked.tracker.emas) and tracked.extend(close):
+            result = tracked.series(close.index)
+        if result is None:
+            windows = set(ema_windows) | set(tracked.tracker.emas)
+            tracked = TrackedSeries(IndicatorTracker(windows))
+            tracked.extend(close)
+            result = tracked.series(close.index)
+        _put(key, tracked)
+        # Saved when a new bar arrives; revisions of the pending bar are replayed after a restart
+        if PARQUET_AVAILABLE and tracked.tracker.pending and tracked.tracker.pending[0] != before:
+            tracked.save(_state_path(*key))
+    return result
+
+
+def forget(ticker=None):
+    """Drop in-memory trackers for one ticker, or all of them"""
+    with _lock:
+        for key in [k for k in _tracked if ticker is None or k[0] == ticker.upper()]:
+            del _tracked[key]
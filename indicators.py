@@ -0,0 +1,148 @@
+"""Vectorized technical-indicator engine.
+
+`compute_indicators` takes one Close (and optionally Volume) series and returns
+every requested indicator together, computing the shared intermediates (the
+price diff and each EMA span) once with NumPy. A DataFrame with one column per
+ticker is accepted as well and is processed as a single (date x ticker) matrix.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+RSI_PERIOD = 14
+MACD_SPANS = (12, 26, 9)
+VOLUME_WINDOW = 5
+
+
+def _prepare(values):
+    """Float matrix with gaps forward-filled and the mask of rows before the first bar"""
+    values = np.array(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    leading = np.cumsum(~np.isnan(values), axis=0) == 0
+
+    # Carry the last price over gaps (e.g. another exchange's holiday in a ticker matrix)
+    idx = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    values = np.take_along_axis(values, idx, axis=0)
+
+    # Seed the rows before the first bar with that bar so recursions start there
+    first = np.argmax(~leading, axis=0)
+    seed = values[first, np.arange(values.shape[1])]
+    values = np.where(leading, seed, values)
+    return values, leading
+
+
+def _ema(values, alpha):
+    """Recursive EMA (pandas ewm(adjust=False)) evaluated block-wise in closed form.
+
+    Within a block y_t = d**(t+1) * y_prev + alpha * d**t * cumsum(x_k / d**k),
+    with d = 1 - alpha. Blocks are sized so d**-k stays well inside float range.
+    """
+    decay = 1.0 - alpha
+    if decay <= 0.0 or len(values) == 0:
+        return values.copy()
+
+    block = max(1, int(12 * math.log(10) / -math.log(decay)))
+    out = np.empty_like(values)
+    prev = values[0]
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(len(chunk))[:, None]
+        out[start:start + len(chunk)] = (
+            decay * powers * prev + alpha * powers * np.cumsum(chunk / powers, axis=0)
+        )
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def _rolling_mean(values, window):
+    """Trailing mean over `window` rows, NaN until the window is full"""
+    csum = np.cumsum(values, axis=0)
+    out = np.full_like(values, np.nan)
+    if window <= len(values):
+        out[window - 1:] = csum[window - 1:]
+        out[window:] -= csum[:-window]
+        out[window - 1:] /= window
+    return out
+
+
+def compute_indicators(close, volume=None, sma_windows=(), ema_windows=(),
+                       rsi_period=RSI_PERIOD, macd_spans=MACD_SPANS, volume_window=VOLUME_WINDOW):
+    """Compute all requested indicators from one price series in a single pass.
+
+    Returns a dict of series (or DataFrames for a ticker matrix) aligned with
+    `close`: SMA_<n>, EMA_<n>, RSI, MACD, MACD_signal, MACD_hist and, when
+    `volume` is given, VOLUME_RATIO (recent average volume / average to date).
+    Pass rsi_period=None or macd_spans=None to skip those indicators. An
+    empty `close` gives empty series.
+    """
+    is_frame = isinstance(close, pd.DataFrame)
+    index = close.index
+    columns = close.columns if is_frame else None
+
+    def wrap(arr):
+        if is_frame:
+            return pd.DataFrame(arr, index=index, columns=columns)
+        return pd.Series(arr[:, 0], index=index)
+
+    if not len(index):
+        # Nothing to compute, but callers still index the result by name
+        names = ([f'SMA_{window}' for window in sma_windows] + [f'EMA_{span}' for span in ema_windows]
+                 + (['RSI'] if rsi_period else []) + (['MACD', 'MACD_signal', 'MACD_hist'] if macd_spans else [])
+                 + (['VOLUME_RATIO'] if volume is not None else []))
+        return {name: wrap(np.empty((0, len(columns) if is_frame else 1))) for name in names}
+
+    prices, leading = _prepare(close)
+    emas = {}
+
+    def ema(span):
+        if span not in emas:
+            emas[span] = _ema(prices, 2.0 / (span + 1))
+        return emas[span]
+
+    bars_seen = np.cumsum(~leading, axis=0)
+    result = {}
+    for window in sma_windows:
+        sma = _rolling_mean(prices, window)
+        result[f'SMA_{window}'] = wrap(np.where(bars_seen >= window, sma, np.nan))
+
+    for span in ema_windows:
+        result[f'EMA_{span}'] = wrap(np.where(leading, np.nan, ema(span)))
+
+    if rsi_period:
+        # The diff is undefined on the first bar, so the averages start on the second
+        delta = np.diff(prices, axis=0, prepend=prices[:1])
+        gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+        delta_leading = leading | np.roll(leading, 1, axis=0)
+        delta_leading[0] = True
+        first = np.argmax(~delta_leading, axis=0)
+        cols = np.arange(prices.shape[1])
+        gains = np.where(delta_leading, gains[first, cols], gains)
+        losses = np.where(delta_leading, losses[first, cols], losses)
+
+        alpha = 1.0 / rsi_period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = _ema(gains, alpha) / _ema(losses, alpha)
+            rsi = 100 - (100 / (1 + rs))
+        result['RSI'] = wrap(np.where(delta_leading, np.nan, rsi))
+
+    if macd_spans:
+        fast, slow, signal_span = macd_spans
+        macd = ema(fast) - ema(slow)
+        signal = _ema(macd, 2.0 / (signal_span + 1))
+        result['MACD'] = wrap(np.where(leading, np.nan, macd))
+        result['MACD_signal'] = wrap(np.where(leading, np.nan, signal))
+        result['MACD_hist'] = wrap(np.where(leading, np.nan, macd - signal))
+
+    if volume is not None:
+        volumes, vol_leading = _prepare(volume)
+        volumes = np.where(vol_leading, 0.0, volumes)
+        counts = np.cumsum(~vol_leading, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            average_to_date = np.cumsum(volumes, axis=0) / counts
+            ratio = _rolling_mean(volumes, volume_window) / average_to_date
+        result['VOLUME_RATIO'] = wrap(np.where(counts >= volume_window, ratio, np.nan))
+
+    return result
@@ -0,0 +1,192 @@
+"""Intraday bars (1m/5m/15m/1h) in fixed-size ring buffers.
+
+Intraday history is far denser than daily bars and, while a session is
+open, changes every minute. Instead of caching a whole DataFrame per
+(ticker, period, interval) like market_data does for daily bars, each
+ticker/interval gets one ring buffer of BAR_CAPACITY bars:
+
+- the first request downloads the interval's window (WINDOWS)
+- later requests, at most every REFRESH_SECONDS, download only the bars
+  from the last one held onwards; the last bar is overwritten (it may have
+  been captured mid-bar) and newer bars overwrite the oldest slots
+- if the last bar held is older than the window (yfinance rejects such a
+  start for 1m bars) or the incremental download fails or comes back
+  empty, the whole window is downloaded again and replaces the buffer
+
+At most MAX_BUFFERS buffers are kept (least recently used dropped first),
+so memory stays bounded however long a session stays open.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from history_store import period_start, slice_period
+
+INTRADAY_INTERVALS = ('1m', '5m', '15m', '1h')
+# History kept per interval; each fits yfinance's intraday limits (1m: 7 days, 5m/15m: 60 days)
+WINDOWS = {'1m': '5d', '5m': '1mo', '15m': '1mo', '1h': '6mo'}
+# Bars per buffer: the window's regular-session bars with room to spare
+BAR_CAPACITY = {'1m': 2048, '5m': 2048, '15m': 1024, '1h': 1024}
+# Minimum seconds between incremental downloads for one buffer
+REFRESH_SECONDS = {'1m': 30, '5m': 60, '15m': 120, '1h': 300}
+MAX_BUFFERS = 128
+
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def is_intraday(interval):
+    return interval in INTRADAY_INTERVALS
+
+
+class BarRing:
+    """Fixed-capacity OHLCV buffer; appending past capacity overwrites the oldest bars"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.int64)  # UTC nanoseconds
+        self.bars = np.zeros((capacity, len(COLUMNS)))
+        self.start = 0  # slot of the oldest bar
+        self.size = 0
+        self.tz = None
+
+    def __len__(self):
+        return self.size
+
+    def last_time(self):
+        """Timestamp of the newest bar, or None when empty"""
+        if not self.size:
+            return None
+        return pd.Timestamp(self.times[(self.start + self.size - 1) % self.capacity], unit='ns', tz='UTC')
+
+    def clear(self):
+        self.start = self.size = 0
+
+    def upsert(self, data):
+        """Add bars from `data` that are not older than the newest held; the newest may be replaced"""
+        if data.empty:
+            return
+        if self.tz is None and data.index.tz is not None:
+            self.tz = str(data.index.tz)
+        index = data.index.tz_convert('UTC') if data.index.tz is not None else data.index
+        times = index.as_unit('ns').asi8
+        bars = data[list(COLUMNS)].to_numpy(dtype=float)
+
+        if self.size:
+            newest = self.times[(self.start + self.size - 1) % self.capacity]
+            keep = times >= newest
+            times, bars = times[keep], bars[keep]
+            if len(times) and times[0] == newest:
+                # The newest bar was captured before it closed; replace it
+                self.size -= 1
+        if len(times) > self.capacity:
+            times, bars = times[-self.capacity:], bars[-self.capacity:]
+
+        slots = (self.start + self.size + np.arange(len(times))) % self.capacity
+        self.times[slots] = times
+        self.bars[slots] = bars
+        overflow = max(0, self.size + len(times) - self.capacity)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.capacity, self.size + len(times))
+
+    def frame(self):
+        """All held bars, oldest first, as a history DataFrame"""
+        slots = (self.start + np.arange(self.size)) % self.capacity
+        index = pd.DatetimeIndex(self.times[slots].astype('datetime64[ns]'))
+        index = index.tz_localize('UTC').tz_convert(self.tz) if self.tz else index
+        return pd.DataFrame(self.bars[slots], index=index, columns=list(COLUMNS))
+
+    def nbytes(self):
+        return self.times.nbytes + self.bars.nbytes
+
+
+def _download(ticker, interval, period=None, start=None):
+    if start is not None:
+        return yf.Ticker(ticker).history(start=start, interval=interval)
+    return yf.Ticker(ticker).history(period=period, interval=interval)
+
+
+class IntradayBars:
+    """Process-wide ring buffers per (ticker, interval), refreshed incrementally"""
+
+    def __init__(self, downloader=None, max_buffers=MAX_BUFFERS):
+        self._download = downloader or _download
+        self.max_buffers = max_buffers
+        self._buffers = OrderedDict()  # (ticker, interval) -> [BarRing, refreshed_at]
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.downloads = 0
+
+    def _lock_for(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._buffers.get(key)
+            if entry is None:
+                entry = self._buffers[key] = [BarRing(BAR_CAPACITY[key[1]]), 0.0]
+                while len(self._buffers) > self.max_buffers:
+                    evicted, _ = self._buffers.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            self._buffers.move_to_end(key)
+            return entry
+
+    def get(self, ticker, interval, period=None):
+        """History frame of `interval` bars, sliced to `period` (at most the interval's window)"""
+        key = (ticker.upper(), interval)
+        entry = self._entry(key)
+        with self._lock_for(key):
+            ring, refreshed_at = entry
+            now = time.monotonic()
+            if not len(ring) or now - refreshed_at >= REFRESH_SECONDS[interval]:
+                data = self._refresh(key, ring)
+                # Only a download that returned bars counts; otherwise the next request retries
+                if not data.empty:
+                    entry[1] = now
+                    self.downloads += 1
+            data = ring.frame()
+        return data if period is None else slice_period(data, period)
+
+    def _refresh(self, key, ring):
+        """Download bars newer than those in `ring` into it; returns the downloaded frame"""
+        ticker, interval = key
+        last = ring.last_time()
+        data = None
+        if last is not None and last.tz_convert(None) >= period_start(WINDOWS[interval]):
+            try:
+                data = self._download(ticker, interval, start=last)
+            except Exception:
+                data = None
+        if data is None or data.empty:
+            try:
+                data = self._download(ticker, interval, period=WINDOWS[interval])
+            except Exception:
+                if last is None:
+                    raise
+                # Serve the bars already held
+                return pd.DataFrame()
+            if not data.empty:
+                ring.clear()
+        ring.upsert(data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            rings = [ring for ring, _ in self._buffers.values()]
+        return {"buffers": len(rings), "bars": sum(len(ring) for ring in rings),
+                "bytes": sum(ring.nbytes() for ring in rings), "downloads": self.downloads}
+
+
+_bars = IntradayBars()
+
+
+def get_intraday(ticker, interval, period=None):
+    return _bars.get(ticker, interval, period)
+
+
+def intraday_stats():
+    return _bars.stats()
@@ -0,0 +1,90 @@
+"""Deferred imports for modules only some pages need.
+
+The login page needs nothing beyond streamlit and the auth modules, so
+pandas, matplotlib, yfinance and the modules built on them are bound to
+stand-ins that import the real module on first use. Each deferred import is
+timed and recorded with the page the importing thread was running (see
+set_page), so the cost shows up in import_profile() and the Diagnostics
+panel under the page that triggered it.
+"""
+import importlib
+import sys
+import threading
+import time
+import types
+
+_lock = threading.RLock()
+_proxies = {}
+# Module name -> (seconds its deferred import took, page that triggered it)
+_import_times = {}
+# Page the current thread is running, set by the script on every rerun
+_context = threading.local()
+
+
+def set_page(page):
+    """Name the page this thread is running, for attributing deferred imports"""
+    _context.page = page
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    already_loaded = self.__name__ in sys.modules
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    if not already_loaded:
+                        _import_times[self.__name__] = (time.perf_counter() - start,
+                                                         getattr(_context, 'page', None))
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """Process-wide stand-in for `import name`"""
+    with _lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = LazyModule(name)
+        return proxy
+
+
+def lazy_function(module, name):
+    """Stand-in for `from module import name` (a function) that imports on first call"""
+    proxy = lazy_import(module)
+
+    def call(*args, **kwargs):
+        return getattr(proxy, name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    return call
+
+
+def is_loaded(name):
+    return name in sys.modules
+
+
+def import_profile():
+    """Deferred imports performed so far, slowest first: [(module, milliseconds, page)].
+
+    `page` is None for imports triggered outside a page (e.g. on a worker thread).
+    """
+    with _lock:
+        times = dict(_import_times)
+    return sorted(((name, round(seconds * 1000, 1), page) for name, (seconds, page) in times.items()),
+                  key=lambda item: item[1], reverse=True)
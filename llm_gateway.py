@@ -0,0 +1,372 @@
+"""Managed access to the chat completions API.
+
+LLMGateway wraps a backend (the OpenAI client, or StubBackend for offline
+load tests) with:
+
+- keep-alive connection pooling (a sized httpx client shared by all sessions)
+- a token-bucket rate limiter shared by every caller in the process
+- retries with jittered exponential backoff on 429s, 5xx and connection errors
+- a deadline per request, covering queueing, retries and the call itself
+- coalescing: identical requests in flight at the same time share one call,
+  and streamed responses are fanned out chunk by chunk to every caller
+
+Failures that survive the retries surface as LLMGatewayError with a message
+meant for end users.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+# Connection pool shared by all sessions
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 30.0
+CONNECT_TIMEOUT = 5.0
+
+# Sustained requests per second and burst size across the process
+REQUESTS_PER_SECOND = 3.0
+BURST = 10
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+# Seconds a single request may take, including waiting for a token and retries
+REQUEST_DEADLINE = 45.0
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {'APIConnectionError', 'APITimeoutError', 'ConnectError', 'ReadTimeout', 'ConnectTimeout'}
+
+
+class LLMGatewayError(Exception):
+    """A request that failed for good; str() is safe to show to users"""
+
+
+class RateLimited(LLMGatewayError):
+    pass
+
+
+class DeadlineExceeded(LLMGatewayError):
+    pass
+
+
+# -------- RATE LIMITING -------- #
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity`"""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline):
+        """Take one token, waiting at most until `deadline`; returns seconds waited"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                raise RateLimited("The assistant is busy right now. Please try again in a few seconds.")
+            time.sleep(wait)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than a server's Retry-After"""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _status_code(exc):
+    return getattr(exc, 'status_code', None) or getattr(getattr(exc, 'response', None), 'status_code', None)
+
+
+def _retry_after(exc):
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc):
+    return _status_code(exc) in RETRYABLE_STATUS or type(exc).__name__ in RETRYABLE_ERRORS
+
+
+# -------- COALESCING -------- #
+
+class _SharedStream:
+    """Iterable over one underlying stream that any number of callers can read.
+
+    Chunks are buffered, so a caller that joins late still sees the whole
+    response. Whichever reader is furthest ahead pulls the next chunk.
+
+    `on_done` stops new callers from joining. It runs when the source is
+    exhausted or fails, when every reader has stopped early (e.g. the script
+    was rerun mid-stream) and on close(); a stream nobody starts reading is
+    dropped by the gateway once its request deadline passes.
+    """
+
+    def __init__(self, source, on_done):
+        self._source = iter(source)
+        self._chunks = []
+        self._done = False
+        self._error = None
+        self._readers = 0
+        self._on_done = on_done
+        self._lock = threading.Lock()
+
+    def _finish(self):
+        self._done = True
+        self._on_done()
+
+    def close(self):
+        """Stop sharing this stream; readers already holding it can finish"""
+        self._on_done()
+
+    def __iter__(self):
+        with self._lock:
+            self._readers += 1
+        i = 0
+        try:
+            while True:
+                with self._lock:
+                    if i == len(self._chunks) and not self._done:
+                        try:
+                            self._chunks.append(next(self._source))
+                        except StopIteration:
+                            self._finish()
+                        except Exception as e:
+                            self._error = e
+                            self._finish()
+                    if i < len(self._chunks):
+                        chunk = self._chunks[i]
+                    elif self._error is not None:
+                        raise self._error
+                    else:
+                        return
+                i += 1
+                yield chunk
+        finally:
+            with self._lock:
+                self._readers -= 1
+                abandoned = not self._readers and not self._done
+            if abandoned:
+                self._on_done()
+
+
+class _InFlight:
+    def __init__(self, expires_at):
+        # Past this, the entry is ignored even if its leader never released it
+        self.expires_at = expires_at
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def request_key(kwargs):
+    """Stable hash of a request's parameters"""
+    return hashlib.sha1(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# -------- GATEWAY -------- #
+
+class LLMGateway:
+    """Rate-limited, retrying, coalescing front for `backend.chat.completions`"""
+
+    def __init__(self, backend, limiter=None, max_retries=MAX_RETRIES, deadline=REQUEST_DEADLINE):
+        self.backend = backend
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "calls": 0, "coalesced": 0, "retries": 0, "failures": 0, "throttled_s": 0.0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _call(self, kwargs, deadline):
+        """One backend call with rate limiting and retries, bounded by `deadline`"""
+        attempt = 0
+        while True:
+            self._count("throttled_s", self.limiter.acquire(deadline))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("The assistant took too long to respond. Please try again.")
+            self._count("calls")
+            try:
+                return self.backend.chat.completions.create(timeout=remaining, **kwargs)
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self._count("failures")
+                    if _status_code(e) == 429:
+                        raise RateLimited("The assistant is busy right now. Please try again in a few seconds.") from e
+                    if is_retryable(e):
+                        raise LLMGatewayError("The assistant is unavailable right now. Please try again.") from e
+                    raise
+                delay = backoff_delay(attempt, _retry_after(e))
+                if time.monotonic() + delay >= deadline:
+                    self._count("failures")
+                    raise DeadlineExceeded("The assistant took too long to respond. Please try again.") from e
+                self._count("retries")
+                time.sleep(delay)
+                attempt += 1
+
+    def chat(self, max_seconds=None, **kwargs):
+        """Same arguments and return value as client.chat.completions.create"""
+        self._count("requests")
+        deadline = time.monotonic() + (max_seconds or self.deadline)
+        key = request_key(kwargs)
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            if flight is not None and flight.expires_at <= time.monotonic():
+                # Never released (e.g. a stream nobody read); make a fresh call
+                flight = None
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight(expires_at=deadline)
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            if not flight.event.wait(max(deadline - time.monotonic(), 0)):
+                raise DeadlineExceeded("The assistant took too long to respond. Please try again.")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        def release():
+            with self._lock:
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+
+        try:
+            result = self._call(kwargs, deadline)
+            if kwargs.get('stream'):
+                # Followers join the stream while it is still being read
+                result = _SharedStream(result, on_done=release)
+            else:
+                release()
+            flight.result = result
+        except Exception as e:
+            release()
+            flight.error = e
+            raise
+        finally:
+            flight.event.set()
+        return result
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._in_flight))
+
+
+# -------- BACKENDS -------- #
+
+def openai_backend(api_key):
+    """OpenAI client on a sized keep-alive pool; retries are left to the gateway"""
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=KEEPALIVE_EXPIRY),
+        timeout=httpx.Timeout(REQUEST_DEADLINE, connect=CONNECT_TIMEOUT),
+    )
+    return OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+class StubError(Exception):
+    """Error carrying an HTTP status, like the OpenAI client's APIStatusError"""
+
+    def __init__(self, status_code):
+        super().__init__(f"stub error {status_code}")
+        self.status_code = status_code
+
+
+class StubBackend:
+    """Offline stand-in for the OpenAI client, for load tests.
+
+    Replies with canned text after `latency` seconds, streaming it word by
+    word when asked to, and fails with a 429 at `error_rate`.
+    """
+
+    def __init__(self, latency=0.3, error_rate=0.0, reply="This is a stubbed answer from the offline backend.",
+                 seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.reply = reply
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, timeout=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+        time.sleep(min(self.latency, timeout) if timeout else self.latency)
+        if failed:
+            raise StubError(429)
+        if not stream:
+            message = SimpleNamespace(role='assistant', content=self.reply, tool_calls=None)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')])
+        return self._chunks()
+
+    def _chunks(self):
+        for word in self.reply.split(' '):
+            delta = SimpleNamespace(content=word + ' ', tool_calls=None)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+
+
+def create_gateway(api_key=None):
+    """Gateway over OpenAI, or over StubBackend when LLM_BACKEND=stub"""
+    if os.environ.get('LLM_BACKEND') == 'stub':
+        return LLMGateway(StubBackend())
+    return LLMGateway(openai_backend(api_key))
+
+
+API_KEY_FILE = 'API_KEY'
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def read_api_key(path=API_KEY_FILE):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def get_gateway():
+    """Process-wide gateway, built on first use (the API key is read then)"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            api_key = None if os.environ.get('LLM_BACKEND') == 'stub' else read_api_key()
+            _gateway = create_gateway(api_key)
+        return _gateway
+
+
+def gateway_stats():
+    """Stats of the shared gateway, or None if nothing has used it yet"""
+    return _gateway.stats() if _gateway is not None else None
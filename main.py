@@ -1,115 +1,62 @@
-import json
-from openai import OpenAI
-import pandas as pd
-import matplotlib.pyplot as plt
-import streamlit as st
-import yfinance as yf
-import hashlib
-import re
-import os
-
-# Read API key
-with open('API_KEY', 'r') as f:
-    api_key = f.read().strip()
-
-client = OpenAI(api_key=api_key)
+import time
 
-# -------- USER AUTHENTICATION -------- #
-# User database file
-USER_DB_FILE = 'users_db.json'
+_rerun_start = time.perf_counter()
+_rerun_cpu_start = time.thread_time()
 
-def load_users():
-    """Load users from JSON file"""
-    if os.path.exists(USER_DB_FILE):
-        with open(USER_DB_FILE, 'r') as f:
-            return json.load(f)
-    else:
-        # Default users
-        default_users = {
-            "admin": hashlib.sha256("admin123".encode()).hexdigest(),
-            "demo": hashlib.sha256("demo123".encode()).hexdigest()
-        }
-        save_users(default_users)
-        return default_users
-
-def save_users(users):
-    """Save users to JSON file"""
-    with open(USER_DB_FILE, 'w') as f:
-        json.dump(users, f)
-
-def validate_username(username):
-    """Validate username: only letters, no numbers or special characters"""
-    if not username:
-        return False, "Username cannot be empty"
-    if not re.match(r'^[a-zA-Z]+$', username):
-        return False, "Username must contain only letters (no numbers or special characters)"
-    if len(username) < 3:
-        return False, "Username must be at least 3 characters long"
-    return True, "Valid"
+import json
+import streamlit as st
 
-def validate_password(password):
-    """Validate password: at least 6 characters, can contain special characters"""
-    if not password:
-        return False, "Password cannot be empty"
-    if len(password) < 6:
-        return False, "Password must be at least 6 characters long"
-    if not re.search(r'[A-Za-z]', password):
-        return False, "Password must contain at least one letter"
-    if not re.search(r'[0-9]', password):
-        return False, "Password must contain at least one number"
-    return True, "Valid"
+from auth import register_user, validate_password, validate_username, verify_login
+from concurrency import submit
+from lazy_imports import import_profile, is_loaded, lazy_function, lazy_import, set_page
+from llm_gateway import LLMGatewayError, gateway_stats, get_gateway
+from passwords import HashingBusy, hash_time_stats
+from profiling import page_timings, record_rerun
+from styles import APP_CSS, AUTH_CSS
+from symbol_search import looks_like_symbol, search_companies
+import response_cache
+import ticker_info
+import tool_router
+
+# Data, charting and chatbot code (pandas, matplotlib, yfinance) loads on the first page that uses it
+chatbot = lazy_import('chatbot')
+plots = lazy_import('plots')
+client_charts = lazy_import('client_charts')
+browser_charts = lazy_function('chart_display', 'browser_charts')
+display_chart = lazy_function('chart_display', 'display_chart')
+chart_image = lazy_function('plots', 'chart_image')
+plot_indicator = lazy_function('plots', 'plot_indicator')
+plot_stock_price = lazy_function('plots', 'plot_stock_price')
+get_stock_price = lazy_function('stock_analysis', 'get_stock_price')
+calculate_SMA = lazy_function('stock_analysis', 'calculate_SMA')
+calculate_EMA = lazy_function('stock_analysis', 'calculate_EMA')
+calculate_RSI = lazy_function('stock_analysis', 'calculate_RSI')
+calculate_MACD = lazy_function('stock_analysis', 'calculate_MACD')
+get_stock_recommendation = lazy_function('stock_analysis', 'get_stock_recommendation')
+indicator_spec = lazy_function('client_charts', 'indicator_spec')
+price_line_spec = lazy_function('client_charts', 'price_line_spec')
+figure_stats = lazy_function('figures', 'figure_stats')
+get_history = lazy_function('market_data', 'get_history')
+analysis_period = lazy_function('market_data', 'analysis_period')
+snapshot_stats = lazy_function('indicator_snapshot', 'snapshot_stats')
+intraday_stats = lazy_function('intraday', 'intraday_stats')
+
+# Bar intervals offered on the indicator and chart pages
+INTERVALS = {'1d': 'Daily', '1h': '1 hour', '15m': '15 minutes', '5m': '5 minutes', '1m': '1 minute'}
+# Chart periods per interval; intraday history is limited to a few days or months
+CHART_PERIODS = {
+    '1d': ['1mo', '3mo', '6mo', '1y', '2y', '5y', 'max'],
+    '1h': ['5d', '1mo', '3mo', '6mo'],
+    '15m': ['1d', '5d', '1mo'],
+    '5m': ['1d', '5d', '1mo'],
+    '1m': ['1d', '5d'],
+}
 
-def register_user(username, password):
-    """Register a new user"""
-    users = load_users()
-    
-    if username in users:
-        return False, "Username already exists"
-    
-    # Hash password and save
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    users[username] = hashed_password
-    save_users(users)
-    return True, "Registration successful!"
 
-def verify_login(username, password):
-    """Verify login credentials"""
-    users = load_users()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    return username in users and users[username] == hashed_password
+# -------- PAGE FUNCTIONS -------- #
 
 def login_register_page():
-    st.markdown("""
-    <style>
-        .auth-container {
-            max-width: 450px;
-            margin: 0 auto;
-            padding: 3rem 2rem;
-            background: #1a1a1a;
-            border-radius: 4px;
-            border: 1px solid #2a2a2a;
-            margin-top: 3rem;
-        }
-        .auth-title {
-            text-align: center;
-            margin-bottom: 2rem;
-            font-size: 2rem !important;
-        }
-        .tab-container {
-            display: flex;
-            margin-bottom: 2rem;
-            border-bottom: 1px solid #2a2a2a;
-        }
-        .success-message {
-            background: #0a3a0a !important;
-            border: 1px solid #2a6a2a !important;
-            color: #66ff66 !important;
-            padding: 0.75rem;
-            border-radius: 2px;
-            margin: 1rem 0;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(AUTH_CSS, unsafe_allow_html=True)
     
     st.markdown('<div class="auth-container">', unsafe_allow_html=True)
     st.markdown('<h1 class="auth-title">📈 Stock Analysis</h1>', unsafe_allow_html=True)
@@ -125,7 +72,12 @@ def login_register_page():
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
             if st.button("Login", use_container_width=True):
-                if verify_login(username, password):
+                try:
+                    logged_in = verify_login(username, password)
+                except HashingBusy as e:
+                    st.error(str(e))
+                    return
+                if logged_in:
                     st.session_state['logged_in'] = True
                     st.session_state['username'] = username
                     st.session_state['current_page'] = 'Home'
@@ -185,547 +137,6 @@ def login_register_page():
     
     st.markdown("</div>", unsafe_allow_html=True)
 
-# -------- CUSTOM CSS FOR DARK MINIMALIST DESIGN -------- #
-st.markdown("""
-<style>
-    /* Dark minimalist background */
-    .stApp {
-        background: #0a0a0a;
-        background-attachment: fixed;
-    }
-    
-    /* Title styling - bold minimal */
-    h1 {
-        color: #ffffff !important;
-        font-weight: 300 !important;
-        padding: 3rem 0 1rem 0;
-        font-size: 3rem !important;
-        letter-spacing: -1px;
-        border-bottom: 1px solid #1a1a1a;
-        margin-bottom: 2rem;
-    }
-    
-    h2, h3 {
-        color: #ffffff !important;
-        font-weight: 300 !important;
-    }
-    
-    /* Input field styling - dark minimal */
-    .stTextInput > div > div > input, .stNumberInput > div > div > input {
-        background: #1a1a1a !important;
-        border: 1px solid #2a2a2a !important;
-        color: #ffffff !important;
-        border-radius: 2px !important;
-        padding: 14px 18px !important;
-        font-size: 0.95rem !important;
-        transition: border-color 0.2s ease !important;
-        box-shadow: none !important;
-    }
-    
-    .stTextInput > div > div > input::placeholder {
-        color: #666666 !important;
-    }
-    
-    .stTextInput > div > div > input:focus, .stNumberInput > div > div > input:focus {
-        border: 1px solid #404040 !important;
-        box-shadow: none !important;
-        outline: none !important;
-        background: #151515 !important;
-    }
-    
-    /* Label styling - minimal uppercase */
-    .stTextInput > label, .stNumberInput > label, .stSelectbox > label {
-        color: #999999 !important;
-        font-weight: 400 !important;
-        font-size: 0.75rem !important;
-        margin-bottom: 0.5rem;
-        text-transform: uppercase;
-        letter-spacing: 1.5px;
-    }
-    
-    /* Text styling */
-    p {
-        color: #cccccc !important;
-        line-height: 1.8;
-        font-size: 0.95rem;
-    }
-    
-    /* Error message styling */
-    .stAlert {
-        background: #1a0a0a !important;
-        border: 1px solid #4a2020 !important;
-        border-radius: 2px !important;
-        color: #ff6b6b !important;
-        padding: 1rem;
-    }
-    
-    /* Image container - dark card */
-    .stImage {
-        border-radius: 2px;
-        overflow: hidden;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.5);
-        border: 1px solid #1a1a1a;
-        background: #0f0f0f;
-        padding: 1.5rem;
-        margin: 2rem 0;
-    }
-    
-    /* Code blocks */
-    code {
-        background: #1a1a1a !important;
-        color: #ffffff !important;
-        padding: 3px 8px;
-        border-radius: 2px;
-        border: 1px solid #2a2a2a;
-        font-size: 0.9em;
-    }
-    
-    /* Accent color for emphasis */
-    strong {
-        color: #b8860b !important;
-    }
-    
-    /* Container spacing */
-    .block-container {
-        padding-top: 2rem;
-        padding-bottom: 3rem;
-        max-width: 900px;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background: #1a1a1a !important;
-        color: #ffffff !important;
-        border: 1px solid #2a2a2a !important;
-        border-radius: 2px !important;
-        padding: 0.5rem 2rem !important;
-        transition: all 0.2s ease !important;
-    }
-    
-    .stButton > button:hover {
-        background: #2a2a2a !important;
-        border-color: #404040 !important;
-    }
-    
-    /* Radio button styling */
-    .stRadio > div {
-        background: #0a0a0a;
-        padding: 0.5rem;
-        border-radius: 2px;
-    }
-    
-    /* Selectbox styling */
-    .stSelectbox > div > div {
-        background: #1a1a1a !important;
-        border: 1px solid #2a2a2a !important;
-        border-radius: 2px !important;
-    }
-    
-    /* Metric card styling */
-    [data-testid="stMetricValue"] {
-        color: #00ff88 !important;
-        font-size: 2rem !important;
-    }
-    
-    [data-testid="stMetricLabel"] {
-        color: #999999 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# -------- STOCK FUNCTIONS -------- #
-
-def get_stock_price(ticker):
-    data = yf.Ticker(ticker).history(period='1y')
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    return data.iloc[-1].Close, None
-
-
-def calculate_SMA(ticker, window):
-    data = yf.Ticker(ticker).history(period='1y').Close
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    sma_values = data.rolling(window=window).mean()
-    return sma_values, None
-
-
-def calculate_EMA(ticker, window):
-    data = yf.Ticker(ticker).history(period='1y').Close
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    ema_values = data.ewm(span=window, adjust=False).mean()
-    return ema_values, None
-
-
-def calculate_RSI(ticker):
-    data = yf.Ticker(ticker).history(period='1y').Close
-    if data.empty:
-        return None, None, "Error: No data found for this ticker."
-
-    delta = data.diff()
-    up = delta.clip(lower=0)
-    down = -1 * delta.clip(upper=0)
-
-    ema_up = up.ewm(com=14-1, adjust=False).mean()
-    ema_down = down.ewm(com=14-1, adjust=False).mean()
-
-    rs = ema_up / ema_down
-    rsi_values = 100 - (100 / (1 + rs))
-    return rsi_values.iloc[-1], rsi_values, None
-
-
-def calculate_MACD(ticker):
-    data = yf.Ticker(ticker).history(period='1y').Close
-    if data.empty:
-        return None, None, None, None, "Error: No data found for this ticker."
-
-    short_EMA = data.ewm(span=12, adjust=False).mean()
-    long_EMA = data.ewm(span=26, adjust=False).mean()
-
-    MACD = short_EMA - long_EMA
-    signal = MACD.ewm(span=9, adjust=False).mean()
-    histogram = MACD - signal
-
-    return MACD.iloc[-1], signal.iloc[-1], histogram.iloc[-1], (MACD, signal, histogram, data.index), None
-
-
-def plot_indicator(ticker, indicator_name, data, window=None):
-    """Plot technical indicator with price"""
-    plt.style.use('dark_background')
-    
-    if indicator_name in ['SMA', 'EMA']:
-        fig, ax = plt.subplots(figsize=(12, 6))
-        fig.patch.set_facecolor('#0a0a0a')
-        ax.set_facecolor('#0a0a0a')
-        
-        # Get price data
-        price_data = yf.Ticker(ticker).history(period='1y').Close
-        
-        # Plot price
-        ax.plot(price_data.index, price_data.values, color='#ffffff', linewidth=1.5, alpha=0.6, label='Price')
-        # Plot indicator
-        ax.plot(data.index, data.values, color='#00ff88', linewidth=2, label=f'{indicator_name}({window})')
-        
-        ax.set_title(f"{ticker} - {indicator_name}({window})", color='#ffffff', fontsize=16, fontweight='300', pad=20)
-        ax.set_ylabel("Price ($)", color='#666666', fontsize=10)
-        ax.legend(loc='upper left', framealpha=0.2)
-        
-    elif indicator_name == 'RSI':
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), height_ratios=[2, 1])
-        fig.patch.set_facecolor('#0a0a0a')
-        
-        # Price plot
-        price_data = yf.Ticker(ticker).history(period='1y').Close
-        ax1.set_facecolor('#0a0a0a')
-        ax1.plot(price_data.index, price_data.values, color='#ffffff', linewidth=1.5, alpha=0.9)
-        ax1.set_title(f"{ticker} - Price", color='#ffffff', fontsize=14, fontweight='300', pad=15)
-        ax1.set_ylabel("Price ($)", color='#666666', fontsize=10)
-        ax1.grid(True, alpha=0.1, color='#2a2a2a')
-        ax1.tick_params(colors='#666666', labelsize=8)
-        
-        # RSI plot
-        ax2.set_facecolor('#0a0a0a')
-        ax2.plot(data.index, data.values, color='#00ff88', linewidth=2)
-        ax2.axhline(y=70, color='#ff4444', linestyle='--', alpha=0.5, label='Overbought')
-        ax2.axhline(y=30, color='#ff4444', linestyle='--', alpha=0.5, label='Oversold')
-        ax2.fill_between(data.index, 30, 70, alpha=0.1, color='#ffaa00')
-        ax2.set_title("RSI", color='#ffffff', fontsize=14, fontweight='300', pad=15)
-        ax2.set_ylabel("RSI", color='#666666', fontsize=10)
-        ax2.set_ylim(0, 100)
-        ax2.legend(loc='upper left', framealpha=0.2)
-        ax2.grid(True, alpha=0.1, color='#2a2a2a')
-        ax2.tick_params(colors='#666666', labelsize=8)
-        
-    elif indicator_name == 'MACD':
-        macd_line, signal_line, histogram, dates = data
-        
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), height_ratios=[2, 1])
-        fig.patch.set_facecolor('#0a0a0a')
-        
-        # Price plot
-        price_data = yf.Ticker(ticker).history(period='1y').Close
-        ax1.set_facecolor('#0a0a0a')
-        ax1.plot(price_data.index, price_data.values, color='#ffffff', linewidth=1.5, alpha=0.9)
-        ax1.set_title(f"{ticker} - Price", color='#ffffff', fontsize=14, fontweight='300', pad=15)
-        ax1.set_ylabel("Price ($)", color='#666666', fontsize=10)
-        ax1.grid(True, alpha=0.1, color='#2a2a2a')
-        ax1.tick_params(colors='#666666', labelsize=8)
-        
-        # MACD plot
-        ax2.set_facecolor('#0a0a0a')
-        ax2.plot(dates, macd_line.values, color='#00ff88', linewidth=2, label='MACD')
-        ax2.plot(dates, signal_line.values, color='#ff6b6b', linewidth=2, label='Signal')
-        colors = ['#00ff88' if h > 0 else '#ff4444' for h in histogram.values]
-        ax2.bar(dates, histogram.values, color=colors, alpha=0.3, label='Histogram')
-        ax2.axhline(y=0, color='#666666', linestyle='-', alpha=0.3)
-        ax2.set_title("MACD", color='#ffffff', fontsize=14, fontweight='300', pad=15)
-        ax2.set_ylabel("MACD", color='#666666', fontsize=10)
-        ax2.legend(loc='upper left', framealpha=0.2)
-        ax2.grid(True, alpha=0.1, color='#2a2a2a')
-        ax2.tick_params(colors='#666666', labelsize=8)
-    
-    # Common styling
-    for ax in fig.get_axes():
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('#1a1a1a')
-        ax.spines['bottom'].set_color('#1a1a1a')
-    
-    plt.tight_layout()
-    return fig
-
-
-def plot_stock_price(ticker):
-    data = yf.Ticker(ticker).history(period='1y')
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(12, 6))
-    fig.patch.set_facecolor('#0a0a0a')
-    ax.set_facecolor('#0a0a0a')
-    
-    ax.plot(data.index, data.Close, color='#ffffff', linewidth=1.5, alpha=0.9)
-    
-    ax.set_title(f"{ticker} - Last Year Performance", color='#ffffff', fontsize=16, fontweight='300', pad=20)
-    ax.set_ylabel("Price ($)", color='#666666', fontsize=10)
-    ax.tick_params(colors='#666666', labelsize=8)
-    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
-    
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color('#1a1a1a')
-    ax.spines['bottom'].set_color('#1a1a1a')
-    
-    plt.tight_layout()
-    return fig, None
-
-
-def get_stock_recommendation(ticker):
-    """Analyzes stock and returns recommendation data"""
-    try:
-        data = yf.Ticker(ticker).history(period='1y')
-        if data.empty:
-            return None, "Error: No data found for this ticker."
-        
-        # Calculate indicators
-        current_price = data.Close.iloc[-1]
-        sma_50 = data.Close.rolling(window=50).mean().iloc[-1]
-        sma_200 = data.Close.rolling(window=200).mean().iloc[-1]
-        
-        # RSI
-        delta = data.Close.diff()
-        up = delta.clip(lower=0)
-        down = -1 * delta.clip(upper=0)
-        ema_up = up.ewm(com=13, adjust=False).mean()
-        ema_down = down.ewm(com=13, adjust=False).mean()
-        rs = ema_up / ema_down
-        rsi = 100 - (100 / (1 + rs.iloc[-1]))
-        
-        # MACD
-        ema_12 = data.Close.ewm(span=12, adjust=False).mean()
-        ema_26 = data.Close.ewm(span=26, adjust=False).mean()
-        macd = ema_12.iloc[-1] - ema_26.iloc[-1]
-        signal = (ema_12 - ema_26).ewm(span=9, adjust=False).mean().iloc[-1]
-        
-        # Scoring
-        buy_signals = 0
-        sell_signals = 0
-        reasons = []
-        
-        if current_price > sma_50 > sma_200:
-            buy_signals += 2
-            reasons.append("Strong uptrend: Price above 50-day and 200-day SMA")
-        elif current_price < sma_50 < sma_200:
-            sell_signals += 2
-            reasons.append("Strong downtrend: Price below 50-day and 200-day SMA")
-        elif current_price > sma_50:
-            buy_signals += 1
-            reasons.append("Price above 50-day SMA")
-        else:
-            sell_signals += 1
-            reasons.append("Price below 50-day SMA")
-        
-        if rsi < 30:
-            buy_signals += 2
-            reasons.append(f"RSI indicates oversold ({rsi:.2f})")
-        elif rsi > 70:
-            sell_signals += 2
-            reasons.append(f"RSI indicates overbought ({rsi:.2f})")
-        elif rsi < 45:
-            buy_signals += 1
-            reasons.append(f"RSI moderately low ({rsi:.2f})")
-        elif rsi > 55:
-            sell_signals += 1
-            reasons.append(f"RSI moderately high ({rsi:.2f})")
-        
-        if macd > signal:
-            buy_signals += 1
-            reasons.append("MACD above signal line (bullish)")
-        else:
-            sell_signals += 1
-            reasons.append("MACD below signal line (bearish)")
-        
-        recent_volume = data.Volume.iloc[-5:].mean()
-        avg_volume = data.Volume.mean()
-        if recent_volume > avg_volume * 1.2:
-            reasons.append("Above average volume detected")
-        
-        if buy_signals > sell_signals + 1:
-            recommendation = "BUY"
-            confidence = "High" if buy_signals >= 4 else "Moderate"
-        elif sell_signals > buy_signals + 1:
-            recommendation = "SELL"
-            confidence = "High" if sell_signals >= 4 else "Moderate"
-        else:
-            recommendation = "HOLD"
-            confidence = "Neutral"
-        
-        fig = plot_recommendation_visual(ticker, recommendation, confidence, buy_signals, sell_signals, rsi, current_price)
-        
-        result = {
-            "ticker": ticker,
-            "recommendation": recommendation,
-            "confidence": confidence,
-            "current_price": round(current_price, 2),
-            "rsi": round(rsi, 2),
-            "buy_signals": buy_signals,
-            "sell_signals": sell_signals,
-            "reasons": reasons,
-            "fig": fig
-        }
-        
-        return result, None
-        
-    except Exception as e:
-        return None, f"Error analyzing stock: {str(e)}"
-
-
-def plot_recommendation_visual(ticker, recommendation, confidence, buy_signals, sell_signals, rsi, current_price):
-    """Creates recommendation visualization"""
-    plt.style.use('dark_background')
-    fig = plt.figure(figsize=(12, 8))
-    fig.patch.set_facecolor('#0a0a0a')
-    
-    gs = fig.add_gridspec(3, 2, hspace=0.4, wspace=0.3)
-    
-    # Main recommendation
-    ax_main = fig.add_subplot(gs[0, :])
-    ax_main.set_facecolor('#0a0a0a')
-    ax_main.axis('off')
-    
-    if recommendation == "BUY":
-        color = '#00ff88'
-        emoji = '📈'
-    elif recommendation == "SELL":
-        color = '#ff4444'
-        emoji = '📉'
-    else:
-        color = '#ffaa00'
-        emoji = '⏸️'
-    
-    ax_main.text(0.5, 0.7, f"{emoji} {recommendation}", 
-                ha='center', va='center', fontsize=48, fontweight='bold', color=color)
-    ax_main.text(0.5, 0.3, f"Confidence: {confidence}", 
-                ha='center', va='center', fontsize=20, color='#ffffff', alpha=0.8)
-    ax_main.text(0.5, 0.1, f"{ticker} - ${current_price:.2f}", 
-                ha='center', va='center', fontsize=16, color='#999999')
-    
-    # Signal bars
-    ax_signals = fig.add_subplot(gs[1, 0])
-    ax_signals.set_facecolor('#0a0a0a')
-    
-    signals = ['Buy\nSignals', 'Sell\nSignals']
-    values = [buy_signals, sell_signals]
-    colors_bar = ['#00ff88', '#ff4444']
-    
-    bars = ax_signals.bar(signals, values, color=colors_bar, alpha=0.7, edgecolor='#1a1a1a', linewidth=2)
-    ax_signals.set_ylabel('Signal Count', color='#666666', fontsize=10)
-    ax_signals.set_title('Signal Strength', color='#ffffff', fontsize=12, fontweight='300', pad=15)
-    ax_signals.tick_params(colors='#666666', labelsize=9)
-    ax_signals.spines['top'].set_visible(False)
-    ax_signals.spines['right'].set_visible(False)
-    ax_signals.spines['left'].set_color('#1a1a1a')
-    ax_signals.spines['bottom'].set_color('#1a1a1a')
-    ax_signals.grid(True, alpha=0.1, color='#2a2a2a', axis='y')
-    ax_signals.set_ylim(0, max(values) + 2)
-    
-    for bar in bars:
-        height = bar.get_height()
-        ax_signals.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{int(height)}',
-                       ha='center', va='bottom', color='#ffffff', fontsize=12, fontweight='bold')
-    
-    # RSI Gauge
-    ax_rsi = fig.add_subplot(gs[1, 1])
-    ax_rsi.set_facecolor('#0a0a0a')
-    
-    rsi_zones = ['Oversold\n(<30)', 'Neutral\n(30-70)', 'Overbought\n(>70)']
-    zone_colors = ['#00ff88', '#ffaa00', '#ff4444']
-    zone_values = [30, 40, 30]
-    
-    bars_rsi = ax_rsi.barh(rsi_zones, zone_values, color=zone_colors, alpha=0.3, 
-                           edgecolor='#1a1a1a', linewidth=1)
-    
-    if rsi < 30:
-        zone_idx = 0
-        position = (rsi / 30) * 30
-    elif rsi <= 70:
-        zone_idx = 1
-        position = 30 + ((rsi - 30) / 40) * 40
-    else:
-        zone_idx = 2
-        position = 70 + ((min(rsi, 100) - 70) / 30) * 30
-    
-    ax_rsi.plot([position], [zone_idx], 'o', markersize=15, color='#ffffff', 
-                markeredgecolor=zone_colors[zone_idx], markeredgewidth=3, zorder=5)
-    
-    ax_rsi.set_xlabel('RSI Value', color='#666666', fontsize=10)
-    ax_rsi.set_title(f'RSI: {rsi:.1f}', color='#ffffff', fontsize=12, fontweight='300', pad=15)
-    ax_rsi.tick_params(colors='#666666', labelsize=9)
-    ax_rsi.spines['top'].set_visible(False)
-    ax_rsi.spines['right'].set_visible(False)
-    ax_rsi.spines['left'].set_color('#1a1a1a')
-    ax_rsi.spines['bottom'].set_color('#1a1a1a')
-    ax_rsi.set_xlim(0, 100)
-    ax_rsi.grid(True, alpha=0.1, color='#2a2a2a', axis='x')
-    
-    # Recommendation meter
-    ax_meter = fig.add_subplot(gs[2, :])
-    ax_meter.set_facecolor('#0a0a0a')
-    ax_meter.set_xlim(0, 10)
-    ax_meter.set_ylim(0, 1)
-    ax_meter.axis('off')
-    
-    meter_width = 8
-    meter_x = 1
-    
-    ax_meter.barh(0.5, 3, left=meter_x, height=0.3, color='#ff4444', alpha=0.3)
-    ax_meter.barh(0.5, 3, left=meter_x+3, height=0.3, color='#ffaa00', alpha=0.3)
-    ax_meter.barh(0.5, 2, left=meter_x+6, height=0.3, color='#00ff88', alpha=0.3)
-    
-    total_signals = buy_signals + sell_signals
-    if total_signals > 0:
-        buy_ratio = buy_signals / total_signals
-        needle_pos = meter_x + (buy_ratio * meter_width)
-    else:
-        needle_pos = meter_x + meter_width / 2
-    
-    ax_meter.plot([needle_pos, needle_pos], [0.2, 0.8], 'w-', linewidth=3, zorder=5)
-    ax_meter.plot([needle_pos], [0.5], 'o', markersize=12, color='#ffffff', zorder=6)
-    
-    ax_meter.text(meter_x + 1.5, 0.1, 'SELL', ha='center', color='#ff4444', fontsize=12, fontweight='bold')
-    ax_meter.text(meter_x + 4.5, 0.1, 'HOLD', ha='center', color='#ffaa00', fontsize=12, fontweight='bold')
-    ax_meter.text(meter_x + 7, 0.1, 'BUY', ha='center', color='#00ff88', fontsize=12, fontweight='bold')
-    ax_meter.text(5, 0.95, 'Recommendation Meter', ha='center', color='#ffffff', fontsize=14, fontweight='300')
-    
-    plt.tight_layout()
-    return fig
-
-
-# -------- PAGE FUNCTIONS -------- #
-
 def show_home_page():
     """Home page with chatbot"""
     st.title('📈 Stock Analysis Chatbot Assistant')
@@ -735,62 +146,86 @@ def show_home_page():
     if user_input:
         try:
             st.session_state['messages'].append({"role": "user", "content": user_input})
-
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=st.session_state['messages'],
-                tools=[{"type": "function", "function": f} for f in functions],
-                tool_choice="auto"
-            )
-
-            response_message = response.choices[0].message
-            tool_calls = response_message.tool_calls
+            use_browser = browser_charts()
+
+            # Same question about the same bars: replay the earlier answer without the model
+            cache_key = response_cache.cache_key(user_input, chatbot.market_data_version)
+            cached = response_cache.get(cache_key) if cache_key else None
+            if cached and cached['use_browser'] == use_browser:
+                for show in cached['shows']:
+                    show()
+                st.markdown(cached['answer'])
+                st.session_state['messages'].append({"role": "assistant", "content": cached['answer']})
+                st.caption("⚡ Answered from cache (market data unchanged)")
+                return
+
+            tokens_saved = chatbot.compact_history()
+            shows = []
+
+            # Direct commands ("chart TSLA") pick their tool locally instead of asking the model
+            routed = tool_router.route(user_input, chatbot.functions)
+            if routed:
+                content, tool_calls = None, [tool_router.tool_call(*routed)]
+            else:
+                stream = get_gateway().chat(
+                    model="gpt-3.5-turbo",
+                    messages=st.session_state['messages'],
+                    tools=[{"type": "function", "function": f} for f in chatbot.functions],
+                    tool_choice="auto",
+                    stream=True
+                )
+                content, tool_calls = chatbot.stream_reply(stream, st.empty())
 
             if tool_calls:
-                st.session_state['messages'].append(response_message)
-
-                for call in tool_calls:
-                    function_name = call.function.name
-                    args = json.loads(call.function.arguments)
-
-                    if function_name == "plot_stock_price_chatbot":
-                        fig, error = plot_stock_price(args['ticker'])
-                        if error:
-                            st.error(error)
-                        else:
-                            st.pyplot(fig)
-                        result = "Chart displayed" if not error else error
-                    elif function_name == "get_stock_recommendation_chatbot":
-                        rec_data, error = get_stock_recommendation(args['ticker'])
-                        if error:
-                            st.error(error)
-                            result = error
-                        else:
-                            st.pyplot(rec_data['fig'])
-                            result = json.dumps({k: v for k, v in rec_data.items() if k != 'fig'})
-                    else:
-                        result = f"Function {function_name} not found"
-                    
+                st.session_state['messages'].append({
+                    "role": "assistant",
+                    "content": content or None,
+                    "tool_calls": tool_calls
+                })
+
+                # Tools share one fetch per ticker and run in parallel; each output
+                # is drawn as soon as its tool finishes
+                calls = [(call["function"]["name"], json.loads(call["function"]["arguments"])) for call in tool_calls]
+                results = [None] * len(tool_calls)
+                shows = [None] * len(tool_calls)
+                for position, (result, show) in chatbot.dispatch_tool_calls(calls, use_browser):
+                    show()
+                    results[position] = result
+                    shows[position] = show
+
+                # Tool messages must follow the order of tool_calls
+                for call, result in zip(tool_calls, results):
                     st.session_state['messages'].append({
                         "role": "tool",
-                        "tool_call_id": call.id,
-                        "name": function_name,
+                        "tool_call_id": call["id"],
+                        "name": call["function"]["name"],
                         "content": str(result)
                     })
 
-                final = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=st.session_state['messages']
-                )
-                msg = final.choices[0].message.content
-                st.write(msg)
+                if routed and st.session_state.get('skip_model_for_commands'):
+                    msg = tool_router.local_answer(tool_calls, results)
+                    st.markdown(msg)
+                else:
+                    tokens_saved += chatbot.compact_history()
+                    final = get_gateway().chat(
+                        model="gpt-3.5-turbo",
+                        messages=st.session_state['messages'],
+                        stream=True
+                    )
+                    msg, _ = chatbot.stream_reply(final, st.empty())
                 st.session_state['messages'].append({"role": "assistant", "content": msg})
 
             else:
-                msg = response_message.content
-                st.write(msg)
+                msg = content
                 st.session_state['messages'].append({"role": "assistant", "content": msg})
 
+            if cache_key and msg:
+                response_cache.put(cache_key, {"answer": msg, "shows": shows, "use_browser": use_browser})
+
+            st.caption(f"🧮 Context compaction saved {tokens_saved} tokens this turn")
+
+        except LLMGatewayError as e:
+            st.warning(str(e))
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
 
@@ -806,7 +241,14 @@ def show_price_lookup_page():
     if st.button('Get Price', key='price_btn'):
         if ticker:
             with st.spinner('Fetching price...'):
-                price, error = get_stock_price(ticker)
+                # Independent downloads (and the chart render) run in parallel
+                price_future = submit(get_stock_price, ticker)
+                change_future = submit(get_history, ticker, '5d')
+                chart_future = None
+                if not browser_charts():
+                    chart_future = submit(chart_image, 'price', ticker, '1y', lambda: plot_stock_price(ticker))
+                
+                price, error = price_future.result()
                 if error:
                     st.error(error)
                 else:
@@ -816,15 +258,16 @@ def show_price_lookup_page():
                     
                     with col2:
                         # Get 1-day change
-                        data = yf.Ticker(ticker).history(period='5d')
+                        data = change_future.result()
                         if len(data) >= 2:
                             change = ((data.Close.iloc[-1] - data.Close.iloc[-2]) / data.Close.iloc[-2]) * 100
                             st.metric(label="1-Day Change", value=f"{change:+.2f}%")
                     
                     # Plot price
-                    fig, error = plot_stock_price(ticker)
-                    if not error:
-                        st.pyplot(fig)
+                    if chart_future is not None:
+                        chart_future.result()
+                    display_chart('price', ticker, '1y', lambda: plot_stock_price(ticker),
+                                  lambda data: price_line_spec(ticker, data))
         else:
             st.warning('Please enter a ticker symbol')
 
@@ -842,6 +285,8 @@ def show_technical_indicators_page():
         ['SMA (Simple Moving Average)', 'EMA (Exponential Moving Average)', 'RSI (Relative Strength Index)', 'MACD']
     )
     
+    interval = st.selectbox('Bar Interval:', list(INTERVALS), format_func=INTERVALS.get, key='ti_interval')
+    
     window = None
     if 'SMA' in indicator or 'EMA' in indicator:
         window = st.number_input('Window Period:', min_value=5, max_value=200, value=50, step=5, key='ti_window')
@@ -849,28 +294,33 @@ def show_technical_indicators_page():
     if st.button('Calculate Indicator', key='ti_btn'):
         if ticker:
             with st.spinner('Calculating...'):
+                period = analysis_period(interval)
                 if 'SMA' in indicator:
-                    data, error = calculate_SMA(ticker, window)
+                    data, error = calculate_SMA(ticker, window, interval)
                     if error:
                         st.error(error)
                     else:
                         current_value = data.iloc[-1]
                         st.success(f'**{indicator}({window})**: ${current_value:.2f}')
-                        fig = plot_indicator(ticker, 'SMA', data, window)
-                        st.pyplot(fig)
+                        display_chart(('SMA', window), ticker, period,
+                                      lambda: (plot_indicator(ticker, 'SMA', data, window, interval), None),
+                                      lambda history: indicator_spec(ticker, 'SMA', history.Close, data, window),
+                                      interval)
                         
                 elif 'EMA' in indicator:
-                    data, error = calculate_EMA(ticker, window)
+                    data, error = calculate_EMA(ticker, window, interval)
                     if error:
                         st.error(error)
                     else:
                         current_value = data.iloc[-1]
                         st.success(f'**{indicator}({window})**: ${current_value:.2f}')
-                        fig = plot_indicator(ticker, 'EMA', data, window)
-                        st.pyplot(fig)
+                        display_chart(('EMA', window), ticker, period,
+                                      lambda: (plot_indicator(ticker, 'EMA', data, window, interval), None),
+                                      lambda history: indicator_spec(ticker, 'EMA', history.Close, data, window),
+                                      interval)
                         
                 elif 'RSI' in indicator:
-                    current_rsi, rsi_data, error = calculate_RSI(ticker)
+                    current_rsi, rsi_data, error = calculate_RSI(ticker, interval)
                     if error:
                         st.error(error)
                     else:
@@ -885,11 +335,12 @@ def show_technical_indicators_page():
                             else:
                                 st.info("🟡 Neutral")
                         
-                        fig = plot_indicator(ticker, 'RSI', rsi_data)
-                        st.pyplot(fig)
+                        display_chart('RSI', ticker, period,
+                                      lambda: (plot_indicator(ticker, 'RSI', rsi_data, interval=interval), None),
+                                      lambda history: indicator_spec(ticker, 'RSI', history.Close, rsi_data), interval)
                         
                 elif 'MACD' in indicator:
-                    macd_val, signal_val, hist_val, plot_data, error = calculate_MACD(ticker)
+                    macd_val, signal_val, hist_val, plot_data, error = calculate_MACD(ticker, interval)
                     if error:
                         st.error(error)
                     else:
@@ -906,176 +357,13 @@ def show_technical_indicators_page():
                         else:
                             st.error("🔴 MACD below Signal - Bearish")
                         
-                        fig = plot_indicator(ticker, 'MACD', plot_data)
-                        st.pyplot(fig)
+                        display_chart('MACD', ticker, period,
+                                      lambda: (plot_indicator(ticker, 'MACD', plot_data, interval=interval), None),
+                                      lambda history: indicator_spec(ticker, 'MACD', history.Close, plot_data), interval)
         else:
             st.warning('Please enter a ticker symbol')
 
 
-def plot_candlestick_chart(ticker, period='3mo'):
-    """Create candlestick chart"""
-    data = yf.Ticker(ticker).history(period=period)
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(14, 7))
-    fig.patch.set_facecolor('#0a0a0a')
-    ax.set_facecolor('#0a0a0a')
-    
-    # Create candlestick chart
-    for idx, (date, row) in enumerate(data.iterrows()):
-        color = '#00ff88' if row['Close'] >= row['Open'] else '#ff4444'
-        
-        # Draw the wick (high-low line)
-        ax.plot([idx, idx], [row['Low'], row['High']], color=color, linewidth=1, alpha=0.8)
-        
-        # Draw the body (open-close rectangle)
-        height = abs(row['Close'] - row['Open'])
-        bottom = min(row['Open'], row['Close'])
-        ax.bar(idx, height, bottom=bottom, color=color, width=0.8, alpha=0.9, edgecolor=color)
-    
-    # Formatting
-    ax.set_title(f"{ticker} - Candlestick Chart", color='#ffffff', fontsize=16, fontweight='300', pad=20)
-    ax.set_ylabel("Price", color='#666666', fontsize=10)
-    ax.tick_params(colors='#666666', labelsize=8)
-    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
-    
-    # Set x-axis labels
-    step = max(len(data) // 10, 1)
-    ax.set_xticks(range(0, len(data), step))
-    ax.set_xticklabels([data.index[i].strftime('%m/%d') for i in range(0, len(data), step)], rotation=45)
-    
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color('#1a1a1a')
-    ax.spines['bottom'].set_color('#1a1a1a')
-    
-    plt.tight_layout()
-    return fig, None
-
-
-def plot_line_chart(ticker, period='1y'):
-    """Create line chart"""
-    data = yf.Ticker(ticker).history(period=period)
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(14, 7))
-    fig.patch.set_facecolor('#0a0a0a')
-    ax.set_facecolor('#0a0a0a')
-    
-    # Plot closing price line
-    ax.plot(data.index, data.Close, color='#00ff88', linewidth=2, alpha=0.9, label='Close Price')
-    
-    # Add moving averages
-    ma20 = data.Close.rolling(window=20).mean()
-    ma50 = data.Close.rolling(window=50).mean()
-    ax.plot(data.index, ma20, color='#ffaa00', linewidth=1.5, alpha=0.7, label='MA(20)', linestyle='--')
-    ax.plot(data.index, ma50, color='#ff6b6b', linewidth=1.5, alpha=0.7, label='MA(50)', linestyle='--')
-    
-    ax.set_title(f"{ticker} - Line Chart with Moving Averages", color='#ffffff', fontsize=16, fontweight='300', pad=20)
-    ax.set_ylabel("Price", color='#666666', fontsize=10)
-    ax.legend(loc='upper left', framealpha=0.2, fontsize=9)
-    ax.tick_params(colors='#666666', labelsize=8)
-    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
-    
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color('#1a1a1a')
-    ax.spines['bottom'].set_color('#1a1a1a')
-    
-    plt.tight_layout()
-    return fig, None
-
-
-def plot_bar_chart(ticker, period='3mo'):
-    """Create volume bar chart with price overlay"""
-    data = yf.Ticker(ticker).history(period=period)
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    
-    plt.style.use('dark_background')
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8), height_ratios=[3, 1], sharex=True)
-    fig.patch.set_facecolor('#0a0a0a')
-    
-    # Price bars (top)
-    ax1.set_facecolor('#0a0a0a')
-    colors = ['#00ff88' if close >= open_ else '#ff4444' 
-              for close, open_ in zip(data.Close, data.Open)]
-    
-    ax1.bar(range(len(data)), data.Close, color=colors, alpha=0.7, width=0.8)
-    ax1.set_title(f"{ticker} - Bar Chart (Price & Volume)", color='#ffffff', fontsize=16, fontweight='300', pad=20)
-    ax1.set_ylabel("Price", color='#666666', fontsize=10)
-    ax1.tick_params(colors='#666666', labelsize=8)
-    ax1.grid(True, alpha=0.1, color='#2a2a2a', axis='y')
-    
-    # Volume bars (bottom)
-    ax2.set_facecolor('#0a0a0a')
-    ax2.bar(range(len(data)), data.Volume, color=colors, alpha=0.5, width=0.8)
-    ax2.set_ylabel("Volume", color='#666666', fontsize=10)
-    ax2.tick_params(colors='#666666', labelsize=8)
-    ax2.grid(True, alpha=0.1, color='#2a2a2a', axis='y')
-    
-    # Set x-axis labels
-    step = max(len(data) // 10, 1)
-    ax2.set_xticks(range(0, len(data), step))
-    ax2.set_xticklabels([data.index[i].strftime('%m/%d') for i in range(0, len(data), step)], rotation=45)
-    
-    for ax in [ax1, ax2]:
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('#1a1a1a')
-        ax.spines['bottom'].set_color('#1a1a1a')
-    
-    plt.tight_layout()
-    return fig, None
-
-
-def plot_ohlc_chart(ticker, period='3mo'):
-    """Create OHLC (Open-High-Low-Close) chart"""
-    data = yf.Ticker(ticker).history(period=period)
-    if data.empty:
-        return None, "Error: No data found for this ticker."
-    
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(14, 7))
-    fig.patch.set_facecolor('#0a0a0a')
-    ax.set_facecolor('#0a0a0a')
-    
-    # Create OHLC chart
-    for idx, (date, row) in enumerate(data.iterrows()):
-        color = '#00ff88' if row['Close'] >= row['Open'] else '#ff4444'
-        
-        # Draw high-low line
-        ax.plot([idx, idx], [row['Low'], row['High']], color=color, linewidth=1.5, alpha=0.9)
-        
-        # Draw open tick (left)
-        ax.plot([idx - 0.3, idx], [row['Open'], row['Open']], color=color, linewidth=2, alpha=0.9)
-        
-        # Draw close tick (right)
-        ax.plot([idx, idx + 0.3], [row['Close'], row['Close']], color=color, linewidth=2, alpha=0.9)
-    
-    ax.set_title(f"{ticker} - OHLC Chart", color='#ffffff', fontsize=16, fontweight='300', pad=20)
-    ax.set_ylabel("Price", color='#666666', fontsize=10)
-    ax.tick_params(colors='#666666', labelsize=8)
-    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
-    
-    # Set x-axis labels
-    step = max(len(data) // 10, 1)
-    ax.set_xticks(range(0, len(data), step))
-    ax.set_xticklabels([data.index[i].strftime('%m/%d') for i in range(0, len(data), step)], rotation=45)
-    
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color('#1a1a1a')
-    ax.spines['bottom'].set_color('#1a1a1a')
-    
-    plt.tight_layout()
-    return fig, None
-
-
 def show_price_chart_page():
     """Price chart page with multiple chart types"""
     st.title('📈 Stock Price Charts')
@@ -1090,17 +378,19 @@ def show_price_chart_page():
                                   ['Candlestick', 'Line Chart', 'Bar Chart', 'OHLC'],
                                   key='chart_type_select')
     
+    interval = st.selectbox('Bar Interval:', list(INTERVALS), format_func=INTERVALS.get, key='chart_interval')
+    periods = CHART_PERIODS[interval]
+    # One slider per interval, since each offers different periods
     period = st.select_slider('Time Period:', 
-                             options=['1mo', '3mo', '6mo', '1y', '2y', '5y'],
-                             value='3mo',
-                             key='period_select')
+                             options=periods,
+                             value=periods[1],
+                             key=f'period_select_{interval}')
     
     if st.button('Generate Chart', key='chart_btn'):
         if ticker:
             with st.spinner('Generating chart...'):
                 # Generate selected chart type
                 if chart_type == 'Candlestick':
-                    fig, error = plot_candlestick_chart(ticker, period)
                     st.markdown("""
                     **📊 Candlestick Chart**: Shows open, high, low, and close prices. 
                     - 🟢 Green = Close > Open (bullish)
@@ -1108,7 +398,6 @@ def show_price_chart_page():
                     - Wicks show high/low range
                     """)
                 elif chart_type == 'Line Chart':
-                    fig, error = plot_line_chart(ticker, period)
                     st.markdown("""
                     **📈 Line Chart**: Shows closing price trend with moving averages.
                     - 🟢 Green = Close Price
@@ -1116,14 +405,12 @@ def show_price_chart_page():
                     - 🔴 Red = 50-day MA
                     """)
                 elif chart_type == 'Bar Chart':
-                    fig, error = plot_bar_chart(ticker, period)
                     st.markdown("""
                     **📊 Bar Chart**: Shows price bars with volume.
                     - Top: Price bars (green=up, red=down)
                     - Bottom: Trading volume
                     """)
                 elif chart_type == 'OHLC':
-                    fig, error = plot_ohlc_chart(ticker, period)
                     st.markdown("""
                     **📉 OHLC Chart**: Shows Open-High-Low-Close with ticks.
                     - Vertical line = High to Low range
@@ -1131,13 +418,15 @@ def show_price_chart_page():
                     - Right tick = Close price
                     """)
                 
+                kind, plot_fn = plots.PRICE_CHARTS[chart_type]
+                error = display_chart(kind, ticker, period, lambda: plot_fn(ticker, period, interval),
+                                      lambda data: client_charts.CHART_SPECS[chart_type](ticker, data), interval)
+                
                 if error:
                     st.error(error)
                 else:
-                    st.pyplot(fig)
-                    
                     # Additional statistics
-                    data = yf.Ticker(ticker).history(period=period)
+                    data = get_history(ticker, period, interval)
                     st.markdown("---")
                     st.markdown("### 📊 Statistics")
                     col1, col2, col3, col4, col5 = st.columns(5)
@@ -1181,7 +470,7 @@ def show_recommendation_page():
                     st.error(error)
                 else:
                     # Display recommendation chart
-                    st.pyplot(result['fig'])
+                    st.image(result['chart'])
                     
                     # Display detailed info
                     st.markdown("---")
@@ -1222,306 +511,120 @@ def show_ticker_lookup_page():
     
     if st.button('Search Ticker', key='ticker_search_btn'):
         if company_name:
-            with st.spinner('Searching...'):
+            results = search_companies(company_name, market)
+            if results:
+                best = results[0]
+                st.success(f"✅ Found: **{best.symbol}**")
                 try:
-                    import yfinance as yf
-                    
-                    # Search for ticker
-                    ticker_obj = yf.Ticker(company_name)
-                    info = ticker_obj.info
-                    
-                    # Try to get ticker from common variations
-                    possible_tickers = [
-                        company_name.upper(),
-                        company_name.upper().replace(' ', ''),
-                        company_name.upper().split()[0]
-                    ]
-                    
-                    found_results = []
-                    
-                    for tick in possible_tickers:
-                        try:
-                            test_ticker = yf.Ticker(tick)
-                            test_info = test_ticker.info
-                            if 'symbol' in test_info and test_info.get('symbol'):
-                                found_results.append({
-                                    'symbol': test_info.get('symbol', tick),
-                                    'name': test_info.get('longName', test_info.get('shortName', 'N/A')),
-                                    'sector': test_info.get('sector', 'N/A'),
-                                    'industry': test_info.get('industry', 'N/A'),
-                                    'exchange': test_info.get('exchange', 'N/A')
-                                })
-                        except:
-                            continue
-                    
-                    # Manual mapping for popular companies (US + India)
-                    popular_companies = {
-                        # US Stocks
-                        'apple': 'AAPL',
-                        'microsoft': 'MSFT',
-                        'google': 'GOOGL',
-                        'alphabet': 'GOOGL',
-                        'amazon': 'AMZN',
-                        'tesla': 'TSLA',
-                        'meta': 'META',
-                        'facebook': 'META',
-                        'netflix': 'NFLX',
-                        'nvidia': 'NVDA',
-                        'intel': 'INTC',
-                        'amd': 'AMD',
-                        'coca cola': 'KO',
-                        'pepsi': 'PEP',
-                        'walmart': 'WMT',
-                        'disney': 'DIS',
-                        'nike': 'NKE',
-                        'mcdonalds': 'MCD',
-                        'starbucks': 'SBUX',
-                        'boeing': 'BA',
-                        'ibm': 'IBM',
-                        'oracle': 'ORCL',
-                        'salesforce': 'CRM',
-                        'visa': 'V',
-                        'mastercard': 'MA',
-                        'paypal': 'PYPL',
-                        'uber': 'UBER',
-                        'spotify': 'SPOT',
-                        'twitter': 'X',
-                        'jpmorgan': 'JPM',
-                        'bank of america': 'BAC',
-                        'wells fargo': 'WFC',
-                        'goldman sachs': 'GS',
-                        'exxon': 'XOM',
-                        'chevron': 'CVX',
-                        'pfizer': 'PFE',
-                        'johnson': 'JNJ',
-                        'procter': 'PG',
-                        'ford': 'F',
-                        'gm': 'GM',
-                        'general motors': 'GM',
-                        'att': 'T',
-                        'verizon': 'VZ',
-                        'comcast': 'CMCSA',
-                        'adobe': 'ADBE',
-                        'cisco': 'CSCO',
-                        'qualcomm': 'QCOM',
-                        # Indian Stocks (NSE)
-                        'reliance': 'RELIANCE.NS',
-                        'tcs': 'TCS.NS',
-                        'tata consultancy': 'TCS.NS',
-                        'infosys': 'INFY.NS',
-                        'hdfc bank': 'HDFCBANK.NS',
-                        'hdfc': 'HDFCBANK.NS',
-                        'icici bank': 'ICICIBANK.NS',
-                        'icici': 'ICICIBANK.NS',
-                        'state bank': 'SBIN.NS',
-                        'sbi': 'SBIN.NS',
-                        'bharti airtel': 'BHARTIARTL.NS',
-                        'airtel': 'BHARTIARTL.NS',
-                        'itc': 'ITC.NS',
-                        'wipro': 'WIPRO.NS',
-                        'axis bank': 'AXISBANK.NS',
-                        'axis': 'AXISBANK.NS',
-                        'kotak': 'KOTAKBANK.NS',
-                        'kotak mahindra': 'KOTAKBANK.NS',
-                        'maruti': 'MARUTI.NS',
-                        'maruti suzuki': 'MARUTI.NS',
-                        'tata motors': 'TATAMOTORS.NS',
-                        'mahindra': 'M&M.NS',
-                        'm&m': 'M&M.NS',
-                        'asian paints': 'ASIANPAINT.NS',
-                        'bajaj finance': 'BAJFINANCE.NS',
-                        'bajaj': 'BAJFINANCE.NS',
-                        'titan': 'TITAN.NS',
-                        'ultratech': 'ULTRACEMCO.NS',
-                        'ultratech cement': 'ULTRACEMCO.NS',
-                        'nestle': 'NESTLEIND.NS',
-                        'nestle india': 'NESTLEIND.NS',
-                        'hul': 'HINDUNILVR.NS',
-                        'hindustan unilever': 'HINDUNILVR.NS',
-                        'adani': 'ADANIPORTS.NS',
-                        'adani ports': 'ADANIPORTS.NS',
-                        'tata steel': 'TATASTEEL.NS',
-                        'sun pharma': 'SUNPHARMA.NS',
-                        'dr reddy': 'DRREDDY.NS',
-                        'tech mahindra': 'TECHM.NS',
-                        'ongc': 'ONGC.NS',
-                        'ntpc': 'NTPC.NS',
-                        'power grid': 'POWERGRID.NS',
-                        'larsen': 'LT.NS',
-                        'l&t': 'LT.NS',
-                        'grasim': 'GRASIM.NS',
-                        'jsw steel': 'JSWSTEEL.NS',
-                        'hindalco': 'HINDALCO.NS',
-                        'britannia': 'BRITANNIA.NS',
-                        'coal india': 'COALINDIA.NS',
-                        'bpcl': 'BPCL.NS',
-                        'bharat petroleum': 'BPCL.NS',
-                        'ioc': 'IOC.NS',
-                        'indian oil': 'IOC.NS',
-                        'eicher': 'EICHERMOT.NS',
-                        'eicher motors': 'EICHERMOT.NS',
-                        'divi': 'DIVISLAB.NS',
-                        'divis lab': 'DIVISLAB.NS',
-                        'cipla': 'CIPLA.NS',
-                        'bajaj auto': 'BAJAJ-AUTO.NS',
-                        'hero motocorp': 'HEROMOTOCO.NS',
-                        'hero': 'HEROMOTOCO.NS',
-                        'shree cement': 'SHREECEM.NS',
-                        'indusind': 'INDUSINDBK.NS',
-                        'indusind bank': 'INDUSINDBK.NS',
-                        'vedanta': 'VEDL.NS',
-                        'tata consumer': 'TATACONSUM.NS',
-                        'godrej consumer': 'GODREJCP.NS',
-                        'sbi life': 'SBILIFE.NS',
-                        'hdfc life': 'HDFCLIFE.NS',
-                        'icici prudential': 'ICICIPRULI.NS',
-                        'pidilite': 'PIDILITIND.NS',
-                        'berger paints': 'BERGEPAINT.NS',
-                        'dabur': 'DABUR.NS',
-                        'marico': 'MARICO.NS',
-                        'colgate': 'COLPAL.NS',
-                        'colgate palmolive': 'COLPAL.NS'
-                    }
-                    
-                    # Filter by market selection
-                    if market == 'US':
-                        popular_companies = {k: v for k, v in popular_companies.items() if '.NS' not in v and '.BO' not in v}
-                    elif market == 'India':
-                        popular_companies = {k: v for k, v in popular_companies.items() if '.NS' in v or '.BO' in v}
-                    
-                    # Check manual mapping
-                    company_lower = company_name.lower()
-                    matched_ticker = None
-                    
-                    for key, ticker_symbol in popular_companies.items():
-                        if key in company_lower:
-                            matched_ticker = ticker_symbol
-                            break
-                    
-                    if matched_ticker:
-                        try:
-                            ticker_obj = yf.Ticker(matched_ticker)
-                            ticker_info = ticker_obj.info
-                            
-                            st.success(f"✅ Found: **{matched_ticker}**")
-                            
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.markdown(f"**Symbol:** `{matched_ticker}`")
-                                st.markdown(f"**Company:** {ticker_info.get('longName', 'N/A')}")
-                                st.markdown(f"**Sector:** {ticker_info.get('sector', 'N/A')}")
-                            with col2:
-                                st.markdown(f"**Industry:** {ticker_info.get('industry', 'N/A')}")
-                                st.markdown(f"**Exchange:** {ticker_info.get('exchange', 'N/A')}")
-                                st.markdown(f"**Currency:** {ticker_info.get('currency', 'N/A')}")
-                            
-                            # Get current price
-                            current_price = ticker_info.get('currentPrice', ticker_info.get('regularMarketPrice'))
-                            if current_price:
-                                st.metric("Current Price", f"${current_price:.2f}")
-                            
-                            st.markdown("---")
-                            st.info(f"💡 Use **`{matched_ticker}`** in other features to analyze this stock!")
-                            
-                        except Exception as e:
-                            st.warning(f"Found ticker symbol but couldn't fetch details: {matched_ticker}")
-                    
-                    elif found_results:
-                        st.success(f"✅ Found {len(found_results)} result(s)")
-                        for result in found_results:
-                            with st.expander(f"📊 {result['symbol']} - {result['name']}"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.markdown(f"**Symbol:** `{result['symbol']}`")
-                                    st.markdown(f"**Sector:** {result['sector']}")
-                                with col2:
-                                    st.markdown(f"**Industry:** {result['industry']}")
-                                    st.markdown(f"**Exchange:** {result['exchange']}")
-                    else:
-                        st.warning("❌ No exact match found. Try these tips:")
-                        st.markdown("""
-                        - **For Indian stocks**: Add `.NS` suffix (e.g., `RELIANCE.NS`, `TCS.NS`)
-                        - **For US stocks**: Use ticker directly (e.g., `AAPL`, `TSLA`)
-                        - Use the full company name (e.g., "Reliance" not "Reliance Industries")
-                        - Try common abbreviations (e.g., "TCS" for Tata Consultancy Services)
-                        - Visit NSE India or Yahoo Finance for accurate ticker symbols
-                        """)
-                        
-                        # Show popular tickers by market
-                        if market == 'India' or market == 'Both':
-                            st.markdown("### 🇮🇳 Popular Indian Stocks (NSE):")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.markdown("**IT & Tech:**")
-                                st.markdown("• TCS.NS - TCS")
-                                st.markdown("• INFY.NS - Infosys")
-                                st.markdown("• WIPRO.NS - Wipro")
-                                st.markdown("• TECHM.NS - Tech Mahindra")
-                            with col2:
-                                st.markdown("**Banking:**")
-                                st.markdown("• HDFCBANK.NS - HDFC Bank")
-                                st.markdown("• ICICIBANK.NS - ICICI Bank")
-                                st.markdown("• SBIN.NS - SBI")
-                                st.markdown("• AXISBANK.NS - Axis Bank")
-                            with col3:
-                                st.markdown("**Others:**")
-                                st.markdown("• RELIANCE.NS - Reliance")
-                                st.markdown("• BHARTIARTL.NS - Airtel")
-                                st.markdown("• ITC.NS - ITC")
-                                st.markdown("• MARUTI.NS - Maruti")
-                        
-                        if market == 'US' or market == 'Both':
-                            st.markdown("### 🇺🇸 Popular US Stocks:")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.markdown("**Tech:**")
-                                st.markdown("• AAPL - Apple")
-                                st.markdown("• MSFT - Microsoft")
-                                st.markdown("• GOOGL - Google")
-                                st.markdown("• TSLA - Tesla")
-                            with col2:
-                                st.markdown("**Finance:**")
-                                st.markdown("• JPM - JPMorgan")
-                                st.markdown("• BAC - Bank of America")
-                                st.markdown("• V - Visa")
-                                st.markdown("• MA - Mastercard")
-                            with col3:
-                                st.markdown("**Consumer:**")
-                                st.markdown("• KO - Coca-Cola")
-                                st.markdown("• WMT - Walmart")
-                                st.markdown("• DIS - Disney")
-                                st.markdown("• NKE - Nike")
-                
+                    with st.spinner('Fetching details...'):
+                        info = ticker_info.get_ticker_info(best.symbol)
+                except Exception:
+                    info = {}
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(f"**Symbol:** `{best.symbol}`")
+                    st.markdown(f"**Company:** {info.get('longName') or best.name}")
+                    st.markdown(f"**Sector:** {info.get('sector') or 'N/A'}")
+                with col2:
+                    st.markdown(f"**Industry:** {info.get('industry') or 'N/A'}")
+                    st.markdown(f"**Exchange:** {info.get('exchange') or best.exchange}")
+                    st.markdown(f"**Currency:** {info.get('currency') or 'N/A'}")
+                if info.get('currentPrice'):
+                    st.metric("Current Price", f"{info['currentPrice']:.2f} {info.get('currency') or ''}")
+
+                if len(results) > 1:
+                    st.markdown("**Other matches:**")
+                    for result in results[1:]:
+                        st.markdown(f"• `{result.symbol}` - {result.name} ({result.exchange})")
+
+                st.markdown("---")
+                st.info(f"💡 Use **`{best.symbol}`** in other features to analyze this stock!")
+
+            elif looks_like_symbol(company_name):
+                # Not a company we know, but it may be a listed symbol: one lookup to confirm it
+                symbol = company_name.strip().upper()
+                try:
+                    with st.spinner('Checking symbol...'):
+                        info = ticker_info.get_ticker_info(symbol)
                 except Exception as e:
+                    info = {}
                     st.error(f"Error searching: {str(e)}")
+                name = info.get('longName') or info.get('shortName')
+                if name:
+                    st.success(f"✅ Found: **{symbol}**")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**Symbol:** `{symbol}`")
+                        st.markdown(f"**Company:** {name}")
+                        st.markdown(f"**Sector:** {info.get('sector') or 'N/A'}")
+                    with col2:
+                        st.markdown(f"**Industry:** {info.get('industry') or 'N/A'}")
+                        st.markdown(f"**Exchange:** {info.get('exchange') or 'N/A'}")
+                        st.markdown(f"**Currency:** {info.get('currency') or 'N/A'}")
+                    st.info(f"💡 Use **`{symbol}`** in other features to analyze this stock!")
+                else:
+                    st.warning(f"❌ `{symbol}` is not a known company or listed symbol.")
                     st.info("Try entering the ticker symbol directly if you know it, or visit Yahoo Finance for accurate ticker symbols.")
+
+            else:
+                st.warning("❌ No exact match found. Try these tips:")
+                st.markdown("""
+                - **For Indian stocks**: Add `.NS` suffix (e.g., `RELIANCE.NS`, `TCS.NS`)
+                - **For US stocks**: Use ticker directly (e.g., `AAPL`, `TSLA`)
+                - Use the full company name (e.g., "Reliance" not "Reliance Industries")
+                - Try common abbreviations (e.g., "TCS" for Tata Consultancy Services)
+                - Visit NSE India or Yahoo Finance for accurate ticker symbols
+                """)
+                
+                # Show popular tickers by market
+                if market == 'India' or market == 'Both':
+                    st.markdown("### 🇮🇳 Popular Indian Stocks (NSE):")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.markdown("**IT & Tech:**")
+                        st.markdown("• TCS.NS - TCS")
+                        st.markdown("• INFY.NS - Infosys")
+                        st.markdown("• WIPRO.NS - Wipro")
+                        st.markdown("• TECHM.NS - Tech Mahindra")
+                    with col2:
+                        st.markdown("**Banking:**")
+                        st.markdown("• HDFCBANK.NS - HDFC Bank")
+                        st.markdown("• ICICIBANK.NS - ICICI Bank")
+                        st.markdown("• SBIN.NS - SBI")
+                        st.markdown("• AXISBANK.NS - Axis Bank")
+                    with col3:
+                        st.markdown("**Others:**")
+                        st.markdown("• RELIANCE.NS - Reliance")
+                        st.markdown("• BHARTIARTL.NS - Airtel")
+                        st.markdown("• ITC.NS - ITC")
+                        st.markdown("• MARUTI.NS - Maruti")
+                
+                if market == 'US' or market == 'Both':
+                    st.markdown("### 🇺🇸 Popular US Stocks:")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.markdown("**Tech:**")
+                        st.markdown("• AAPL - Apple")
+                        st.markdown("• MSFT - Microsoft")
+                        st.markdown("• GOOGL - Google")
+                        st.markdown("• TSLA - Tesla")
+                    with col2:
+                        st.markdown("**Finance:**")
+                        st.markdown("• JPM - JPMorgan")
+                        st.markdown("• BAC - Bank of America")
+                        st.markdown("• V - Visa")
+                        st.markdown("• MA - Mastercard")
+                    with col3:
+                        st.markdown("**Consumer:**")
+                        st.markdown("• KO - Coca-Cola")
+                        st.markdown("• WMT - Walmart")
+                        st.markdown("• DIS - Disney")
+                        st.markdown("• NKE - Nike")
         else:
             st.warning('Please enter a company name')
 
 
-# -------- TOOL DEFINITIONS FOR CHATBOT -------- #
-
-functions = [
-    {
-        'name': 'plot_stock_price_chatbot',
-        'description': 'Plot last year stock price chart.',
-        'parameters': {
-            'type': 'object',
-            'properties': {'ticker': {'type': 'string'}},
-            'required': ['ticker'],
-        }
-    },
-    {
-        'name': 'get_stock_recommendation_chatbot',
-        'description': 'Get buy/sell/hold recommendation with visual chart.',
-        'parameters': {
-            'type': 'object',
-            'properties': {'ticker': {'type': 'string'}},
-            'required': ['ticker'],
-        }
-    }
-]
-
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # -------- SESSION STATE INITIALIZATION -------- #
 if 'logged_in' not in st.session_state:
@@ -1533,6 +636,9 @@ if 'messages' not in st.session_state:
 if 'current_page' not in st.session_state:
     st.session_state['current_page'] = 'Home'
 
+# Deferred imports from here on are listed under this page in Diagnostics
+set_page(st.session_state['current_page'] if st.session_state['logged_in'] else 'Login')
+
 # -------- MAIN APP -------- #
 if not st.session_state['logged_in']:
     login_register_page()
@@ -1572,6 +678,48 @@ else:
         if st.button("🔍 Ticker Lookup", use_container_width=True, key='nav_ticker'):
             st.session_state['current_page'] = 'Ticker Lookup'
             st.rerun()
+        
+        st.markdown("---")
+        st.radio("Chart rendering:", ['Server (image)', 'Browser (interactive)'], key='chart_backend')
+        st.checkbox("Answer direct commands without the model", key='skip_model_for_commands',
+                    help='Commands like "chart TSLA" always skip the model when picking the tool; '
+                         'with this on they also skip it for the written answer.')
+        
+        with st.expander("🩺 Diagnostics"):
+            if is_loaded('figures'):
+                stats = figure_stats()
+                st.caption(f"Live figures: {stats['live_figures']} (~{stats['figure_bytes'] / 1e6:.1f} MB)")
+                if stats['process_rss']:
+                    st.caption(f"Process memory: {stats['process_rss'] / 1e6:.0f} MB")
+            gateway = gateway_stats()
+            if gateway:
+                st.caption(f"LLM calls: {gateway['calls']} for {gateway['requests']} requests "
+                           f"({gateway['coalesced']} coalesced, {gateway['retries']} retries)")
+            hashing = hash_time_stats()
+            if hashing['samples']:
+                st.caption(f"Password hashing: p50 {hashing['p50_ms']} ms, p95 {hashing['p95_ms']} ms, "
+                           f"p99 {hashing['p99_ms']} ms ({hashing['samples']} samples)")
+            # Rerun cost per page, excluding time blocked on I/O
+            for page, timing in page_timings().items():
+                flag = " ⚠️ over budget" if timing['over_budget'] else ""
+                st.caption(f"{page}: {timing['cpu_p50_ms']:.0f} ms CPU / {timing['wall_p50_ms']:.0f} ms wall "
+                           f"(p50 of {timing['runs']}, budget {timing['budget_ms']} ms){flag}")
+            for module, ms, page in import_profile():
+                st.caption(f"Deferred import of {module}: {ms:.0f} ms ({page or 'background'})")
+            answers = response_cache.cache_stats()
+            st.caption(f"Cached answers: {answers['entries']} ({answers['hits']} hits, {answers['misses']} misses)")
+            if is_loaded('intraday'):
+                bars = intraday_stats()
+                st.caption(f"Intraday buffers: {bars['buffers']} ({bars['bars']} bars, "
+                           f"{bars['bytes'] / 1e6:.1f} MB, {bars['downloads']} downloads)")
+            if is_loaded('indicator_snapshot'):
+                snapshot = snapshot_stats()
+                st.caption(f"Indicator snapshot: {snapshot['tickers']} tickers"
+                           f"{'' if snapshot['fresh'] else ' (stale)'} "
+                           f"({snapshot['hits']} hits, {snapshot['misses']} misses)")
+            metadata = ticker_info.cache_stats()
+            st.caption(f"Ticker metadata: {metadata['entries']} cached ({metadata['hits']} hits, "
+                       f"{metadata['fetches']} fetches)")
     
     # Display selected page
     if st.session_state['current_page'] == 'Home':
@@ -1585,4 +733,8 @@ else:
     elif st.session_state['current_page'] == 'Recommendation':
         show_recommendation_page()
     elif st.session_state['current_page'] == 'Ticker Lookup':
-        show_ticker_lookup_page()[]
\ No newline at end of file
+        show_ticker_lookup_page()
+
+# Shown in the Diagnostics panel from the next rerun on
+record_rerun(st.session_state['current_page'] if st.session_state['logged_in'] else 'Login',
+             time.perf_counter() - _rerun_start, time.thread_time() - _rerun_cpu_start)
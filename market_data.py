@@ -0,0 +1,230 @@
+"""Process-wide OHLCV market-data cache.
+
+Streamlit re-executes main.py on every interaction, but imported modules are
+kept in sys.modules, so the cache below lives for the whole server process and
+is shared by every session.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import yfinance as yf
+
+from history_store import PARQUET_AVAILABLE, HistoryStore, period_start, slice_period
+from intraday import WINDOWS, get_intraday, is_intraday
+
+# Cached frames are considered fresh for this many seconds
+DEFAULT_TTL = 300
+# Empty results (bad ticker, upstream hiccup) are retried sooner
+NEGATIVE_TTL = 30
+# Maximum number of (ticker, period, interval) frames kept in memory
+DEFAULT_MAX_ENTRIES = 256
+# Serve shorter periods by slicing the longest frame already held for a ticker
+SLICE_PERIODS = True
+
+
+def _covers(held_period, period):
+    """True if a frame downloaded for `held_period` contains all of `period`"""
+    if held_period == period:
+        return True
+    held_start = period_start(held_period)
+    if held_start is None:
+        return True
+    wanted_start = period_start(period)
+    return wanted_start is not None and held_start <= wanted_start
+
+
+def _download_history(ticker, period, interval):
+    """Download history straight from Yahoo Finance"""
+    return yf.Ticker(ticker).history(period=period, interval=interval)
+
+
+# Cache misses are served from the on-disk store when Parquet support is installed,
+# so only bars newer than the last stored one are downloaded
+_store = HistoryStore() if PARQUET_AVAILABLE else None
+
+
+class _PendingFetch:
+    """A download in progress that other callers can wait on"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._data = None
+        self._error = None
+
+    def resolve(self, data=None, error=None):
+        self._data = data
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._data
+
+
+class MarketDataCache:
+    """TTL + LRU cache of history frames keyed by (ticker, period, interval).
+
+    Concurrent requests for the same key share a single download. With
+    `slice_periods` on, a shorter period is cut out of the longest frame held
+    for the same ticker/interval instead of being downloaded again. Returned
+    frames are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, fetcher=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 slice_periods=SLICE_PERIODS):
+        self._fetcher = fetcher or _download_history
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.slice_periods = slice_periods
+        self._entries = OrderedDict()  # key -> (expires_at, frame)
+        self._longest = {}             # (ticker, interval) -> key of the longest fresh frame
+        self._pending = {}             # key -> _PendingFetch
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        """Fresh frame for `key`, exact or sliced from a longer one (lock held)"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        if not self.slice_periods:
+            return None
+        ticker, period, interval = key
+        held_key = self._longest.get((ticker, interval))
+        entry = self._entries.get(held_key)
+        if entry is None or entry[0] <= now or not _covers(held_key[1], period):
+            return None
+        self._entries.move_to_end(held_key)
+        return slice_period(entry[1], period)
+
+    def _covering_download(self, key):
+        """In-flight download of a longer period that will contain `key` (lock held)"""
+        if not self.slice_periods or key in self._pending:
+            return None
+        ticker, period, interval = key
+        for (t, p, i), pending in self._pending.items():
+            if t == ticker and i == interval and _covers(p, period):
+                return pending
+        return None
+
+    def _insert(self, key, data):
+        """Insert a downloaded frame, dropping frames it makes redundant (lock held)"""
+        ttl = NEGATIVE_TTL if data.empty else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, data)
+        self._entries.move_to_end(key)
+
+        if self.slice_periods and not data.empty:
+            ticker, period, interval = key
+            held_key = self._longest.get((ticker, interval))
+            if held_key is None or held_key not in self._entries or _covers(period, held_key[1]):
+                self._longest[(ticker, interval)] = key
+                for other in [k for k in self._entries
+                              if k[0] == ticker and k[2] == interval and k != key and _covers(period, k[1])]:
+                    del self._entries[other]
+
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            if self._longest.get((evicted[0], evicted[2])) == evicted:
+                del self._longest[(evicted[0], evicted[2])]
+
+    def get(self, ticker, period='1y', interval='1d'):
+        key = (ticker.upper(), period, interval)
+
+        with self._lock:
+            data = self._lookup(key)
+            if data is not None:
+                self.hits += 1
+                return data
+
+            covering = self._covering_download(key)
+            if covering is not None:
+                self.hits += 1
+            else:
+                pending = self._pending.get(key)
+                is_owner = pending is None
+                if is_owner:
+                    pending = _PendingFetch()
+                    self._pending[key] = pending
+                    self.misses += 1
+
+        if covering is not None:
+            # A longer period for this ticker is already downloading; slice that instead
+            data = covering.wait()
+            return slice_period(data, period)
+        if not is_owner:
+            return pending.wait()
+
+        try:
+            data = self._fetcher(*key)
+        except Exception as e:
+            with self._lock:
+                del self._pending[key]
+            pending.resolve(error=e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._insert(key, data)
+
+        pending.resolve(data=data)
+        return data
+
+    def invalidate(self, ticker=None):
+        """Drop cached frames for one ticker, or everything"""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                self._longest.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == ticker.upper()]:
+                    del self._entries[key]
+                for held in [h for h in self._longest if h[0] == ticker.upper()]:
+                    del self._longest[held]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = MarketDataCache(fetcher=_store.load if _store is not None else None)
+
+
+def get_history(ticker, period='1y', interval='1d'):
+    """Cached equivalent of yf.Ticker(ticker).history(period=period, interval=interval).
+
+    Intraday intervals are served from the bounded ring buffers in intraday.py,
+    so `period` is capped at that interval's window.
+    """
+    if is_intraday(interval):
+        return get_intraday(ticker, interval, period)
+    return _cache.get(ticker, period, interval)
+
+
+def analysis_period(interval='1d'):
+    """History indicators are computed over: a year of daily bars, or the intraday window"""
+    return WINDOWS.get(interval, '1y')
+
+
+def invalidate(ticker=None):
+    _cache.invalidate(ticker)
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def data_version(data):
+    """Short content hash of a history frame; changes whenever bars are added or revised"""
+    if data.empty:
+        return 'empty'
+    row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
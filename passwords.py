@@ -0,0 +1,168 @@
+"""Salted password hashing with a bounded worker pool.
+
+New hashes use scrypt (PBKDF2-SHA256 where OpenSSL lacks scrypt), stored as
+self-describing strings so the cost parameters can be raised later:
+
+    scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>
+    pbkdf2_sha256$<iterations>$<salt b64>$<hash b64>
+
+Bare 64-character hex strings are legacy unsalted SHA-256 hashes; they still
+verify, and verify_password reports them as needing a rehash so the caller
+can upgrade them on a successful login. A missing hash (unknown user) is
+checked against a dummy hash, so login time does not reveal which usernames
+exist; a malformed one simply fails to match.
+
+Hashing is deliberately slow, so it runs on a small dedicated pool with a
+cap on queued requests; a burst of logins waits for (or is refused) a slot
+instead of taking threads from the rest of the app.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+# Concurrent hash computations, and hashes allowed to wait for one
+HASH_WORKERS = 2
+MAX_PENDING_HASHES = 32
+# Seconds to wait for a queue slot before refusing the request
+QUEUE_TIMEOUT = 10.0
+# Hash durations kept for percentile reporting
+TIMING_SAMPLES = 1000
+
+SCRYPT_AVAILABLE = hasattr(hashlib, 'scrypt')
+
+
+class HashingBusy(Exception):
+    """Too many logins/registrations are already waiting to be hashed"""
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+
+def _unb64(text):
+    return base64.b64decode(text.encode('ascii'))
+
+
+def _is_legacy(stored):
+    return len(stored) == 64 and all(c in '0123456789abcdef' for c in stored)
+
+
+def _hash(password, salt=None):
+    salt = salt or os.urandom(SALT_BYTES)
+    if SCRYPT_AVAILABLE:
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                                dklen=HASH_BYTES)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS, dklen=HASH_BYTES)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+
+
+def _verify(password, stored):
+    """(matches, needs_rehash); a malformed `stored` never matches"""
+    if _is_legacy(stored):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        matches = hmac.compare_digest(candidate, stored)
+        return matches, matches
+
+    scheme, _, params = stored.partition('$')
+    try:
+        if scheme == 'scrypt':
+            n, r, p, salt, digest = params.split('$')
+            n, r, p = int(n), int(r), int(p)
+            expected = _unb64(digest)
+            candidate = hashlib.scrypt(password.encode(), salt=_unb64(salt), n=n, r=r, p=p, dklen=len(expected))
+            current = SCRYPT_AVAILABLE and (n, r, p) == (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        elif scheme == 'pbkdf2_sha256':
+            iterations, salt, digest = params.split('$')
+            iterations = int(iterations)
+            expected = _unb64(digest)
+            candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), _unb64(salt), iterations,
+                                            dklen=len(expected))
+            current = not SCRYPT_AVAILABLE and iterations == PBKDF2_ITERATIONS
+        else:
+            return False, False
+    except (ValueError, TypeError, OverflowError):
+        # Truncated or corrupted: wrong field count, bad base64 or impossible cost parameters
+        return False, False
+
+    matches = hmac.compare_digest(candidate, expected)
+    return matches, matches and not current
+
+
+_dummy_hash = None
+_dummy_lock = threading.Lock()
+
+
+def _dummy():
+    """Hash of a random password with the current parameters, made on first use"""
+    global _dummy_hash
+    with _dummy_lock:
+        if _dummy_hash is None:
+            _dummy_hash = _hash(_b64(os.urandom(SALT_BYTES)))
+        return _dummy_hash
+
+
+# -------- WORKER POOL -------- #
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='password-hash')
+_slots = threading.BoundedSemaphore(MAX_PENDING_HASHES + HASH_WORKERS)
+_timings = deque(maxlen=TIMING_SAMPLES)
+_timings_lock = threading.Lock()
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        with _timings_lock:
+            _timings.append(time.perf_counter() - start)
+
+
+def _run(fn, *args):
+    if not _slots.acquire(timeout=QUEUE_TIMEOUT):
+        raise HashingBusy("Too many sign-in attempts right now. Please try again in a moment.")
+    try:
+        return _executor.submit(_timed, fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    """Salted hash of `password` for storage (runs on the hashing pool)"""
+    return _run(_hash, password)
+
+
+def verify_password(password, stored):
+    """(matches, needs_rehash) for `password` against a stored hash (runs on the hashing pool)"""
+    if not stored:
+        # Unknown user: pay for a full check anyway so timing does not tell
+        _run(_verify, password, _dummy())
+        return False, False
+    return _run(_verify, password, stored)
+
+
+def hash_time_stats():
+    """Sample count and p50/p95/p99 hashing time in milliseconds"""
+    with _timings_lock:
+        samples = sorted(_timings)
+    if not samples:
+        return {"samples": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+
+    def percentile(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+
+    return {"samples": len(samples), "p50_ms": percentile(0.50), "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99)}
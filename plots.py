@@ -0,0 +1,407 @@
+"""Matplotlib versions of every chart in the app.
+
+Plot functions return (fig, error) and leave rendering to chart_image(),
+which caches the PNG per data version.
+"""
+from charts import draw_candlesticks, draw_ohlc_bars
+from figure_cache import get_or_render
+from figures import new_figure, subplots
+from intraday import is_intraday
+from market_data import analysis_period, data_version, get_history
+
+
+def chart_image(chart_type, ticker, period, build, interval='1d'):
+    """PNG for a chart, rebuilt only when new bars change the underlying data.
+
+    `build()` must return (fig, error) like the plot_* functions.
+    """
+    data = get_history(ticker, period, interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    return get_or_render((chart_type, ticker.upper(), period, interval, data_version(data)), build)
+
+
+def _tick_labels(index, positions, interval):
+    fmt = '%m/%d %H:%M' if is_intraday(interval) else '%m/%d'
+    return [index[i].strftime(fmt) for i in positions]
+
+
+def plot_indicator(ticker, indicator_name, data, window=None, interval='1d'):
+    """Plot technical indicator with price"""
+    
+    if indicator_name in ['SMA', 'EMA']:
+        fig, ax = subplots(figsize=(12, 6))
+        fig.patch.set_facecolor('#0a0a0a')
+        ax.set_facecolor('#0a0a0a')
+        
+        # Get price data
+        price_data = get_history(ticker, analysis_period(interval), interval).Close
+        
+        # Plot price
+        ax.plot(price_data.index, price_data.values, color='#ffffff', linewidth=1.5, alpha=0.6, label='Price')
+        # Plot indicator
+        ax.plot(data.index, data.values, color='#00ff88', linewidth=2, label=f'{indicator_name}({window})')
+        
+        ax.set_title(f"{ticker} - {indicator_name}({window})", color='#ffffff', fontsize=16, fontweight='300', pad=20)
+        ax.set_ylabel("Price ($)", color='#666666', fontsize=10)
+        ax.legend(loc='upper left', framealpha=0.2)
+        
+    elif indicator_name == 'RSI':
+        fig, (ax1, ax2) = subplots(2, 1, figsize=(12, 8), height_ratios=[2, 1])
+        fig.patch.set_facecolor('#0a0a0a')
+        
+        # Price plot
+        price_data = get_history(ticker, analysis_period(interval), interval).Close
+        ax1.set_facecolor('#0a0a0a')
+        ax1.plot(price_data.index, price_data.values, color='#ffffff', linewidth=1.5, alpha=0.9)
+        ax1.set_title(f"{ticker} - Price", color='#ffffff', fontsize=14, fontweight='300', pad=15)
+        ax1.set_ylabel("Price ($)", color='#666666', fontsize=10)
+        ax1.grid(True, alpha=0.1, color='#2a2a2a')
+        ax1.tick_params(colors='#666666', labelsize=8)
+        
+        # RSI plot
+        ax2.set_facecolor('#0a0a0a')
+        ax2.plot(data.index, data.values, color='#00ff88', linewidth=2)
+        ax2.axhline(y=70, color='#ff4444', linestyle='--', alpha=0.5, label='Overbought')
+        ax2.axhline(y=30, color='#ff4444', linestyle='--', alpha=0.5, label='Oversold')
+        ax2.fill_between(data.index, 30, 70, alpha=0.1, color='#ffaa00')
+        ax2.set_title("RSI", color='#ffffff', fontsize=14, fontweight='300', pad=15)
+        ax2.set_ylabel("RSI", color='#666666', fontsize=10)
+        ax2.set_ylim(0, 100)
+        ax2.legend(loc='upper left', framealpha=0.2)
+        ax2.grid(True, alpha=0.1, color='#2a2a2a')
+        ax2.tick_params(colors='#666666', labelsize=8)
+        
+    elif indicator_name == 'MACD':
+        macd_line, signal_line, histogram, dates = data
+        
+        fig, (ax1, ax2) = subplots(2, 1, figsize=(12, 8), height_ratios=[2, 1])
+        fig.patch.set_facecolor('#0a0a0a')
+        
+        # Price plot
+        price_data = get_history(ticker, analysis_period(interval), interval).Close
+        ax1.set_facecolor('#0a0a0a')
+        ax1.plot(price_data.index, price_data.values, color='#ffffff', linewidth=1.5, alpha=0.9)
+        ax1.set_title(f"{ticker} - Price", color='#ffffff', fontsize=14, fontweight='300', pad=15)
+        ax1.set_ylabel("Price ($)", color='#666666', fontsize=10)
+        ax1.grid(True, alpha=0.1, color='#2a2a2a')
+        ax1.tick_params(colors='#666666', labelsize=8)
+        
+        # MACD plot
+        ax2.set_facecolor('#0a0a0a')
+        ax2.plot(dates, macd_line.values, color='#00ff88', linewidth=2, label='MACD')
+        ax2.plot(dates, signal_line.values, color='#ff6b6b', linewidth=2, label='Signal')
+        colors = ['#00ff88' if h > 0 else '#ff4444' for h in histogram.values]
+        ax2.bar(dates, histogram.values, color=colors, alpha=0.3, label='Histogram')
+        ax2.axhline(y=0, color='#666666', linestyle='-', alpha=0.3)
+        ax2.set_title("MACD", color='#ffffff', fontsize=14, fontweight='300', pad=15)
+        ax2.set_ylabel("MACD", color='#666666', fontsize=10)
+        ax2.legend(loc='upper left', framealpha=0.2)
+        ax2.grid(True, alpha=0.1, color='#2a2a2a')
+        ax2.tick_params(colors='#666666', labelsize=8)
+    
+    # Common styling
+    for ax in fig.get_axes():
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color('#1a1a1a')
+        ax.spines['bottom'].set_color('#1a1a1a')
+    
+    fig.tight_layout()
+    return fig
+
+
+def plot_stock_price(ticker):
+    data = get_history(ticker, '1y')
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+
+    fig, ax = subplots(figsize=(12, 6))
+    fig.patch.set_facecolor('#0a0a0a')
+    ax.set_facecolor('#0a0a0a')
+    
+    ax.plot(data.index, data.Close, color='#ffffff', linewidth=1.5, alpha=0.9)
+    
+    ax.set_title(f"{ticker} - Last Year Performance", color='#ffffff', fontsize=16, fontweight='300', pad=20)
+    ax.set_ylabel("Price ($)", color='#666666', fontsize=10)
+    ax.tick_params(colors='#666666', labelsize=8)
+    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
+    
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#1a1a1a')
+    ax.spines['bottom'].set_color('#1a1a1a')
+    
+    fig.tight_layout()
+    return fig, None
+
+
+def plot_recommendation_visual(ticker, recommendation, confidence, buy_signals, sell_signals, rsi, current_price):
+    """Creates recommendation visualization"""
+    fig = new_figure(figsize=(12, 8))
+    fig.patch.set_facecolor('#0a0a0a')
+    
+    gs = fig.add_gridspec(3, 2, hspace=0.4, wspace=0.3)
+    
+    # Main recommendation
+    ax_main = fig.add_subplot(gs[0, :])
+    ax_main.set_facecolor('#0a0a0a')
+    ax_main.axis('off')
+    
+    if recommendation == "BUY":
+        color = '#00ff88'
+        emoji = '📈'
+    elif recommendation == "SELL":
+        color = '#ff4444'
+        emoji = '📉'
+    else:
+        color = '#ffaa00'
+        emoji = '⏸️'
+    
+    ax_main.text(0.5, 0.7, f"{emoji} {recommendation}", 
+                ha='center', va='center', fontsize=48, fontweight='bold', color=color)
+    ax_main.text(0.5, 0.3, f"Confidence: {confidence}", 
+                ha='center', va='center', fontsize=20, color='#ffffff', alpha=0.8)
+    ax_main.text(0.5, 0.1, f"{ticker} - ${current_price:.2f}", 
+                ha='center', va='center', fontsize=16, color='#999999')
+    
+    # Signal bars
+    ax_signals = fig.add_subplot(gs[1, 0])
+    ax_signals.set_facecolor('#0a0a0a')
+    
+    signals = ['Buy\nSignals', 'Sell\nSignals']
+    values = [buy_signals, sell_signals]
+    colors_bar = ['#00ff88', '#ff4444']
+    
+    bars = ax_signals.bar(signals, values, color=colors_bar, alpha=0.7, edgecolor='#1a1a1a', linewidth=2)
+    ax_signals.set_ylabel('Signal Count', color='#666666', fontsize=10)
+    ax_signals.set_title('Signal Strength', color='#ffffff', fontsize=12, fontweight='300', pad=15)
+    ax_signals.tick_params(colors='#666666', labelsize=9)
+    ax_signals.spines['top'].set_visible(False)
+    ax_signals.spines['right'].set_visible(False)
+    ax_signals.spines['left'].set_color('#1a1a1a')
+    ax_signals.spines['bottom'].set_color('#1a1a1a')
+    ax_signals.grid(True, alpha=0.1, color='#2a2a2a', axis='y')
+    ax_signals.set_ylim(0, max(values) + 2)
+    
+    for bar in bars:
+        height = bar.get_height()
+        ax_signals.text(bar.get_x() + bar.get_width()/2., height,
+                       f'{int(height)}',
+                       ha='center', va='bottom', color='#ffffff', fontsize=12, fontweight='bold')
+    
+    # RSI Gauge
+    ax_rsi = fig.add_subplot(gs[1, 1])
+    ax_rsi.set_facecolor('#0a0a0a')
+    
+    rsi_zones = ['Oversold\n(<30)', 'Neutral\n(30-70)', 'Overbought\n(>70)']
+    zone_colors = ['#00ff88', '#ffaa00', '#ff4444']
+    zone_values = [30, 40, 30]
+    
+    bars_rsi = ax_rsi.barh(rsi_zones, zone_values, color=zone_colors, alpha=0.3, 
+                           edgecolor='#1a1a1a', linewidth=1)
+    
+    if rsi < 30:
+        zone_idx = 0
+        position = (rsi / 30) * 30
+    elif rsi <= 70:
+        zone_idx = 1
+        position = 30 + ((rsi - 30) / 40) * 40
+    else:
+        zone_idx = 2
+        position = 70 + ((min(rsi, 100) - 70) / 30) * 30
+    
+    ax_rsi.plot([position], [zone_idx], 'o', markersize=15, color='#ffffff', 
+                markeredgecolor=zone_colors[zone_idx], markeredgewidth=3, zorder=5)
+    
+    ax_rsi.set_xlabel('RSI Value', color='#666666', fontsize=10)
+    ax_rsi.set_title(f'RSI: {rsi:.1f}', color='#ffffff', fontsize=12, fontweight='300', pad=15)
+    ax_rsi.tick_params(colors='#666666', labelsize=9)
+    ax_rsi.spines['top'].set_visible(False)
+    ax_rsi.spines['right'].set_visible(False)
+    ax_rsi.spines['left'].set_color('#1a1a1a')
+    ax_rsi.spines['bottom'].set_color('#1a1a1a')
+    ax_rsi.set_xlim(0, 100)
+    ax_rsi.grid(True, alpha=0.1, color='#2a2a2a', axis='x')
+    
+    # Recommendation meter
+    ax_meter = fig.add_subplot(gs[2, :])
+    ax_meter.set_facecolor('#0a0a0a')
+    ax_meter.set_xlim(0, 10)
+    ax_meter.set_ylim(0, 1)
+    ax_meter.axis('off')
+    
+    meter_width = 8
+    meter_x = 1
+    
+    ax_meter.barh(0.5, 3, left=meter_x, height=0.3, color='#ff4444', alpha=0.3)
+    ax_meter.barh(0.5, 3, left=meter_x+3, height=0.3, color='#ffaa00', alpha=0.3)
+    ax_meter.barh(0.5, 2, left=meter_x+6, height=0.3, color='#00ff88', alpha=0.3)
+    
+    total_signals = buy_signals + sell_signals
+    if total_signals > 0:
+        buy_ratio = buy_signals / total_signals
+        needle_pos = meter_x + (buy_ratio * meter_width)
+    else:
+        needle_pos = meter_x + meter_width / 2
+    
+    ax_meter.plot([needle_pos, needle_pos], [0.2, 0.8], 'w-', linewidth=3, zorder=5)
+    ax_meter.plot([needle_pos], [0.5], 'o', markersize=12, color='#ffffff', zorder=6)
+    
+    ax_meter.text(meter_x + 1.5, 0.1, 'SELL', ha='center', color='#ff4444', fontsize=12, fontweight='bold')
+    ax_meter.text(meter_x + 4.5, 0.1, 'HOLD', ha='center', color='#ffaa00', fontsize=12, fontweight='bold')
+    ax_meter.text(meter_x + 7, 0.1, 'BUY', ha='center', color='#00ff88', fontsize=12, fontweight='bold')
+    ax_meter.text(5, 0.95, 'Recommendation Meter', ha='center', color='#ffffff', fontsize=14, fontweight='300')
+    
+    fig.tight_layout()
+    return fig
+
+
+def plot_candlestick_chart(ticker, period='3mo', interval='1d'):
+    """Create candlestick chart"""
+    data = get_history(ticker, period, interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    
+    fig, ax = subplots(figsize=(14, 7))
+    fig.patch.set_facecolor('#0a0a0a')
+    ax.set_facecolor('#0a0a0a')
+    
+    # Create candlestick chart
+    draw_candlesticks(ax, data)
+    
+    # Formatting
+    ax.set_title(f"{ticker} - Candlestick Chart", color='#ffffff', fontsize=16, fontweight='300', pad=20)
+    ax.set_ylabel("Price", color='#666666', fontsize=10)
+    ax.tick_params(colors='#666666', labelsize=8)
+    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
+    
+    # Set x-axis labels
+    step = max(len(data) // 10, 1)
+    ax.set_xticks(range(0, len(data), step))
+    ax.set_xticklabels(_tick_labels(data.index, range(0, len(data), step), interval), rotation=45)
+    
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#1a1a1a')
+    ax.spines['bottom'].set_color('#1a1a1a')
+    
+    fig.tight_layout()
+    return fig, None
+
+
+def plot_line_chart(ticker, period='1y', interval='1d'):
+    """Create line chart"""
+    data = get_history(ticker, period, interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    
+    fig, ax = subplots(figsize=(14, 7))
+    fig.patch.set_facecolor('#0a0a0a')
+    ax.set_facecolor('#0a0a0a')
+    
+    # Plot closing price line
+    ax.plot(data.index, data.Close, color='#00ff88', linewidth=2, alpha=0.9, label='Close Price')
+    
+    # Add moving averages
+    ma20 = data.Close.rolling(window=20).mean()
+    ma50 = data.Close.rolling(window=50).mean()
+    ax.plot(data.index, ma20, color='#ffaa00', linewidth=1.5, alpha=0.7, label='MA(20)', linestyle='--')
+    ax.plot(data.index, ma50, color='#ff6b6b', linewidth=1.5, alpha=0.7, label='MA(50)', linestyle='--')
+    
+    ax.set_title(f"{ticker} - Line Chart with Moving Averages", color='#ffffff', fontsize=16, fontweight='300', pad=20)
+    ax.set_ylabel("Price", color='#666666', fontsize=10)
+    ax.legend(loc='upper left', framealpha=0.2, fontsize=9)
+    ax.tick_params(colors='#666666', labelsize=8)
+    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
+    
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#1a1a1a')
+    ax.spines['bottom'].set_color('#1a1a1a')
+    
+    fig.tight_layout()
+    return fig, None
+
+
+def plot_bar_chart(ticker, period='3mo', interval='1d'):
+    """Create volume bar chart with price overlay"""
+    data = get_history(ticker, period, interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    
+    fig, (ax1, ax2) = subplots(2, 1, figsize=(14, 8), height_ratios=[3, 1], sharex=True)
+    fig.patch.set_facecolor('#0a0a0a')
+    
+    # Price bars (top)
+    ax1.set_facecolor('#0a0a0a')
+    colors = ['#00ff88' if close >= open_ else '#ff4444' 
+              for close, open_ in zip(data.Close, data.Open)]
+    
+    ax1.bar(range(len(data)), data.Close, color=colors, alpha=0.7, width=0.8)
+    ax1.set_title(f"{ticker} - Bar Chart (Price & Volume)", color='#ffffff', fontsize=16, fontweight='300', pad=20)
+    ax1.set_ylabel("Price", color='#666666', fontsize=10)
+    ax1.tick_params(colors='#666666', labelsize=8)
+    ax1.grid(True, alpha=0.1, color='#2a2a2a', axis='y')
+    
+    # Volume bars (bottom)
+    ax2.set_facecolor('#0a0a0a')
+    ax2.bar(range(len(data)), data.Volume, color=colors, alpha=0.5, width=0.8)
+    ax2.set_ylabel("Volume", color='#666666', fontsize=10)
+    ax2.tick_params(colors='#666666', labelsize=8)
+    ax2.grid(True, alpha=0.1, color='#2a2a2a', axis='y')
+    
+    # Set x-axis labels
+    step = max(len(data) // 10, 1)
+    ax2.set_xticks(range(0, len(data), step))
+    ax2.set_xticklabels(_tick_labels(data.index, range(0, len(data), step), interval), rotation=45)
+    
+    for ax in [ax1, ax2]:
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color('#1a1a1a')
+        ax.spines['bottom'].set_color('#1a1a1a')
+    
+    fig.tight_layout()
+    return fig, None
+
+
+def plot_ohlc_chart(ticker, period='3mo', interval='1d'):
+    """Create OHLC (Open-High-Low-Close) chart"""
+    data = get_history(ticker, period, interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    
+    fig, ax = subplots(figsize=(14, 7))
+    fig.patch.set_facecolor('#0a0a0a')
+    ax.set_facecolor('#0a0a0a')
+    
+    # Create OHLC chart
+    draw_ohlc_bars(ax, data)
+    
+    ax.set_title(f"{ticker} - OHLC Chart", color='#ffffff', fontsize=16, fontweight='300', pad=20)
+    ax.set_ylabel("Price", color='#666666', fontsize=10)
+    ax.tick_params(colors='#666666', labelsize=8)
+    ax.grid(True, alpha=0.1, color='#2a2a2a', linestyle='-', linewidth=0.5)
+    
+    # Set x-axis labels
+    step = max(len(data) // 10, 1)
+    ax.set_xticks(range(0, len(data), step))
+    ax.set_xticklabels(_tick_labels(data.index, range(0, len(data), step), interval), rotation=45)
+    
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#1a1a1a')
+    ax.spines['bottom'].set_color('#1a1a1a')
+    
+    fig.tight_layout()
+    return fig, None
+
+
+# Chart type label -> (figure cache key, plot function)
+PRICE_CHARTS = {
+    'Candlestick': ('candlestick', plot_candlestick_chart),
+    'Line Chart': ('line', plot_line_chart),
+    'Bar Chart': ('bar', plot_bar_chart),
+    'OHLC': ('ohlc', plot_ohlc_chart),
+}
@@ -0,0 +1,60 @@
+"""Per-page cost of Streamlit reruns.
+
+Every rerun records its wall time and the CPU time of the script thread
+(time.thread_time). Time spent blocked on downloads, the chat API, worker
+threads or disk does not use the thread's CPU, so the CPU figure is the
+page's own cost outside I/O. Pages whose typical CPU time is over their
+budget are flagged in the Diagnostics panel.
+"""
+import threading
+from collections import defaultdict, deque
+
+# Reruns kept per page
+SAMPLES_PER_PAGE = 200
+# CPU milliseconds a rerun of each page should stay under
+DEFAULT_BUDGET_MS = 50
+PAGE_BUDGETS_MS = {
+    'Login': 20,
+    'Home': 50,
+    'Price Lookup': 100,
+    'Technical Indicators': 150,
+    'Price Charts': 200,
+    'Recommendation': 150,
+    'Ticker Lookup': 30,
+}
+
+_samples = defaultdict(lambda: deque(maxlen=SAMPLES_PER_PAGE))
+_lock = threading.Lock()
+
+
+def record_rerun(page, wall_seconds, cpu_seconds):
+    with _lock:
+        _samples[page].append((wall_seconds * 1000, cpu_seconds * 1000))
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def page_timings():
+    """{page: runs, wall/CPU p50 and p95 in ms, CPU budget and whether p50 exceeds it}"""
+    with _lock:
+        samples = {page: list(runs) for page, runs in _samples.items()}
+
+    timings = {}
+    for page, runs in samples.items():
+        wall = [w for w, _ in runs]
+        cpu = [c for _, c in runs]
+        budget = PAGE_BUDGETS_MS.get(page, DEFAULT_BUDGET_MS)
+        cpu_p50 = _percentile(cpu, 0.50)
+        timings[page] = {
+            "runs": len(runs),
+            "wall_p50_ms": round(_percentile(wall, 0.50), 1),
+            "wall_p95_ms": round(_percentile(wall, 0.95), 1),
+            "cpu_p50_ms": round(cpu_p50, 1),
+            "cpu_p95_ms": round(_percentile(cpu, 0.95), 1),
+            "budget_ms": budget,
+            "over_budget": cpu_p50 > budget,
+        }
+    return timings
@@ -0,0 +1,134 @@
+"""Cache of chatbot answers for repeated questions.
+
+Questions are normalized to (ticker, intent, parameters), e.g. "Should I buy
+AAPL?" and "is AAPL a buy right now" both become ('AAPL', 'recommendation',
+()), while "Show a 5y candlestick chart of AAPL" keeps its period and chart
+type and so never matches "chart AAPL". The key also carries the market-data
+version of the ticker, so a cached answer is served only while the
+underlying bars are unchanged and is bypassed once new bars arrive.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from chat_query import is_open_ended, parse_params
+from symbols import resolve_ticker
+
+DEFAULT_TTL = 900
+DEFAULT_MAX_ENTRIES = 512
+
+INTENT_KEYWORDS = {
+    'recommendation': ('buy', 'sell', 'hold', 'recommend', 'recommendation', 'signal', 'signals', 'rating',
+                       'invest', 'worth', 'should i', 'good stock'),
+    'chart': ('chart', 'plot', 'graph', 'trend', 'performance', 'history'),
+    'price': ('price', 'quote', 'trading at', 'cost', 'worth now'),
+    'indicator': ('sma', 'ema', 'rsi', 'macd', 'moving average', 'relative strength', 'indicator'),
+}
+
+
+def detect_intent(text):
+    """Intent with the longest keyword found in `text` as whole words, or None.
+
+    The longest match wins so that "worth now" (price) beats "worth"
+    (recommendation); ties go to the intent listed first.
+    """
+    lowered = text.lower()
+    best, best_length = None, 0
+    for intent, keywords in INTENT_KEYWORDS.items():
+        for keyword in keywords:
+            if len(keyword) > best_length and re.search(r'\b' + re.escape(keyword) + r'\b', lowered):
+                best, best_length = intent, len(keyword)
+    return best
+
+
+def normalize_query(text):
+    """(ticker, intent, parameters) for an unambiguous question, else None.
+
+    Open-ended questions ("why", "compare") are never normalized: their
+    answers depend on more than what the key can hold.
+    """
+    if is_open_ended(text):
+        return None
+    ticker = resolve_ticker(text)
+    intent = detect_intent(text)
+    if ticker is None or intent is None:
+        return None
+    return ticker, intent, tuple(sorted(parse_params(text).items()))
+
+
+class ResponseCache:
+    """TTL + LRU cache of final answers and tool outputs"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            # Answers built on older bars for the same question are dead weight
+            for stale in [k for k in self._entries if k[:3] == key[:3] and k != key]:
+                del self._entries[stale]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, ticker):
+        """Drop every cached answer about `ticker`"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == ticker]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = ResponseCache()
+
+
+def cache_key(text, version_of):
+    """Key for a question, or None if it cannot be cached.
+
+    `version_of(ticker)` returns the current market-data version for the
+    ticker, or None when there is no data for it.
+    """
+    normalized = normalize_query(text)
+    if normalized is None:
+        return None
+    version = version_of(normalized[0])
+    if version is None:
+        return None
+    return normalized + (version,)
+
+
+def get(key):
+    return _cache.get(key)
+
+
+def put(key, value):
+    _cache.put(key, value)
+
+
+def invalidate(ticker):
+    _cache.invalidate(ticker)
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,171 @@
+"""Batch BUY/SELL/HOLD screener for whole ticker universes.
+
+Downloads closes and volumes for many tickers with batched multi-symbol
+requests, computes indicators over the (date x ticker) matrix and applies the
+same scoring rules as get_stock_recommendation to every ticker at once. No
+figures are built unless a `figure_builder` is passed.
+
+The downloaded matrix has a row for every day any ticker traded, so in a
+mixed US/NSE universe each exchange's holidays would show up as gaps in the
+other's columns. Indicators are therefore computed per trading calendar: the
+tickers that traded on the same days are evaluated together, over those days
+only, which gives the same values as a single-ticker history.
+
+Usage:
+    python screener.py AAPL MSFT TSLA RELIANCE.NS
+    python screener.py --file nifty50.txt --period 1y
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from indicators import compute_indicators
+
+# Symbols per yf.download request
+BATCH_SIZE = 100
+
+
+def download_universe(tickers, period='1y', batch_size=BATCH_SIZE):
+    """Close and Volume matrices (date x ticker) for all tickers, in batches"""
+    closes, volumes = [], []
+    for start in range(0, len(tickers), batch_size):
+        batch = tickers[start:start + batch_size]
+        data = yf.download(batch, period=period, interval='1d', group_by='column',
+                           auto_adjust=True, threads=True, progress=False)
+        if data.empty:
+            continue
+        if not isinstance(data.columns, pd.MultiIndex):
+            data.columns = pd.MultiIndex.from_product([data.columns, batch])
+        closes.append(data['Close'])
+        volumes.append(data['Volume'])
+
+    if not closes:
+        return pd.DataFrame(), pd.DataFrame()
+    close = pd.concat(closes, axis=1).sort_index()
+    volume = pd.concat(volumes, axis=1).sort_index()
+    # Drop tickers Yahoo returned no bars for
+    close = close.loc[:, close.notna().any()]
+    return close, volume[close.columns]
+
+
+def _calendars(close):
+    """Groups of tickers that traded on the same days"""
+    groups = {}
+    traded = close.notna()
+    for ticker in close.columns:
+        groups.setdefault(traded[ticker].to_numpy().tobytes(), []).append(ticker)
+    return list(groups.values())
+
+
+def latest_indicators(close, volume, sma_windows=(50, 200)):
+    """{name: last value per ticker} of compute_indicators, each ticker over its own trading days"""
+    latest = {}
+    for tickers in _calendars(close):
+        group = close[tickers].dropna(how='all')
+        indicators = compute_indicators(group, volume.loc[group.index, tickers], sma_windows=sma_windows)
+        for name, frame in indicators.items():
+            latest.setdefault(name, []).append(frame.iloc[-1])
+    return {name: pd.concat(parts)[close.columns] for name, parts in latest.items()}
+
+
+def score_latest(price, sma_50, sma_200, rsi, macd, signal):
+    """Buy/sell signal counts per ticker, same rules as get_stock_recommendation"""
+    price, sma_50, sma_200 = np.asarray(price), np.asarray(sma_50), np.asarray(sma_200)
+    rsi, macd, signal = np.asarray(rsi), np.asarray(macd), np.asarray(signal)
+
+    uptrend = (price > sma_50) & (sma_50 > sma_200)
+    downtrend = (price < sma_50) & (sma_50 < sma_200)
+    above_50 = price > sma_50
+    trend_buy = np.select([uptrend, downtrend, above_50], [2, 0, 1], 0)
+    trend_sell = np.select([uptrend, downtrend, above_50], [0, 2, 0], 1)
+
+    rsi_buy = np.select([rsi < 30, rsi > 70, rsi < 45], [2, 0, 1], 0)
+    rsi_sell = np.select([rsi < 30, rsi > 70, rsi < 45, rsi > 55], [0, 2, 0, 1], 0)
+
+    macd_bullish = macd > signal
+    buy = trend_buy + rsi_buy + macd_bullish
+    sell = trend_sell + rsi_sell + ~macd_bullish
+    return buy, sell
+
+
+def rate(buy, sell):
+    """Recommendation and confidence labels from signal counts"""
+    recommendation = np.select([buy > sell + 1, sell > buy + 1], ['BUY', 'SELL'], 'HOLD')
+    confidence = np.select(
+        [buy > sell + 1, sell > buy + 1],
+        [np.where(buy >= 4, 'High', 'Moderate'), np.where(sell >= 4, 'High', 'Moderate')],
+        'Neutral',
+    )
+    return recommendation, confidence
+
+
+def screen(tickers, period='1y', batch_size=BATCH_SIZE, figure_builder=None):
+    """Rank tickers by BUY/SELL/HOLD signal strength.
+
+    Returns (table, figures). `table` is indexed by ticker and sorted from the
+    strongest buy to the strongest sell; `figures` maps ticker to whatever
+    `figure_builder(row)` returns, and is empty when no builder is given.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    close, volume = download_universe(tickers, period, batch_size)
+    if close.empty:
+        return pd.DataFrame(), {}
+
+    latest = latest_indicators(close, volume)
+    price = close.ffill().iloc[-1]
+
+    buy, sell = score_latest(price, latest['SMA_50'], latest['SMA_200'], latest['RSI'],
+                             latest['MACD'], latest['MACD_signal'])
+    recommendation, confidence = rate(buy, sell)
+
+    table = pd.DataFrame({
+        'recommendation': recommendation,
+        'confidence': confidence,
+        'buy_signals': buy,
+        'sell_signals': sell,
+        'current_price': price.round(2),
+        'rsi': latest['RSI'].round(2),
+        'macd': latest['MACD'].round(4),
+        'macd_signal': latest['MACD_signal'].round(4),
+        'sma_50': latest['SMA_50'].round(2),
+        'sma_200': latest['SMA_200'].round(2),
+        'volume_ratio': latest['VOLUME_RATIO'].round(2),
+    }, index=close.columns)
+    table.index.name = 'ticker'
+    table['score'] = table.buy_signals - table.sell_signals
+    table = table.sort_values(['score', 'buy_signals'], ascending=False)
+
+    figures = {}
+    if figure_builder is not None:
+        for ticker, row in table.iterrows():
+            figures[ticker] = figure_builder(row)
+    return table, figures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen tickers for BUY/SELL/HOLD signals")
+    parser.add_argument('tickers', nargs='*', help="Ticker symbols, e.g. AAPL RELIANCE.NS")
+    parser.add_argument('--file', help="Text file with one ticker per line")
+    parser.add_argument('--period', default='1y')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--csv', help="Write the ranked table to this CSV file")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file, 'r') as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not tickers:
+        parser.error("no tickers given")
+
+    table, _ = screen(tickers, args.period, args.batch_size)
+    if args.csv:
+        table.to_csv(args.csv)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Prices, indicators and buy/sell/hold scoring for a single ticker."""
+from figure_cache import get_or_render
+from indicator_snapshot import snapshot_indicators
+from indicator_state import incremental_indicators
+from indicators import compute_indicators
+from market_data import analysis_period, get_history
+from plots import plot_recommendation_visual
+
+# Series the recommendation score reads
+SCORE_INPUTS = ('Close', 'SMA_50', 'SMA_200', 'RSI', 'MACD', 'MACD_signal', 'VOLUME_RATIO')
+
+
+def indicators_for(ticker, data, sma_windows=(50, 200), ema_windows=()):
+    """compute_indicators() output for `data`, with EMA, RSI and MACD advanced incrementally.
+
+    The recursive indicators continue from the previous call for this ticker
+    instead of being recomputed over the whole year.
+    """
+    indicators = compute_indicators(data.Close, data.Volume, sma_windows=sma_windows,
+                                    rsi_period=None, macd_spans=None)
+    indicators.update(incremental_indicators(ticker, data.Close, ema_windows=ema_windows))
+    return indicators
+
+
+def get_stock_price(ticker):
+    data = get_history(ticker, '1y')
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    return data.iloc[-1].Close, None
+
+
+def _snapshot(ticker, interval, names, data):
+    """Series from the daily snapshot (which holds daily bars only) if it is
+    up to date with the live history `data`, else None"""
+    return snapshot_indicators(ticker, names, current=data) if interval == '1d' else None
+
+
+def calculate_SMA(ticker, window, interval='1d'):
+    data = get_history(ticker, analysis_period(interval), interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    snapshot = _snapshot(ticker, interval, (f'SMA_{window}',), data)
+    if snapshot is not None:
+        return snapshot[f'SMA_{window}'], None
+    indicators = compute_indicators(data.Close, sma_windows=(window,), rsi_period=None, macd_spans=None)
+    return indicators[f'SMA_{window}'], None
+
+
+def calculate_EMA(ticker, window, interval='1d'):
+    data = get_history(ticker, analysis_period(interval), interval)
+    if data.empty:
+        return None, "Error: No data found for this ticker."
+    snapshot = _snapshot(ticker, interval, (f'EMA_{window}',), data)
+    if snapshot is not None:
+        return snapshot[f'EMA_{window}'], None
+    return incremental_indicators(ticker, data.Close, interval, ema_windows=(window,))[f'EMA_{window}'], None
+
+
+def calculate_RSI(ticker, interval='1d'):
+    data = get_history(ticker, analysis_period(interval), interval)
+    if data.empty:
+        return None, None, "Error: No data found for this ticker."
+
+    snapshot = _snapshot(ticker, interval, ('RSI',), data)
+    if snapshot is not None:
+        rsi_values = snapshot['RSI']
+    else:
+        rsi_values = incremental_indicators(ticker, data.Close, interval)['RSI']
+    return rsi_values.iloc[-1], rsi_values, None
+
+
+def calculate_MACD(ticker, interval='1d'):
+    data = get_history(ticker, analysis_period(interval), interval)
+    if data.empty:
+        return None, None, None, None, "Error: No data found for this ticker."
+    indicators = _snapshot(ticker, interval, ('MACD', 'MACD_signal', 'MACD_hist'), data)
+    if indicators is None:
+        indicators = incremental_indicators(ticker, data.Close, interval)
+
+    MACD = indicators['MACD']
+    signal = indicators['MACD_signal']
+    histogram = indicators['MACD_hist']
+
+    return MACD.iloc[-1], signal.iloc[-1], histogram.iloc[-1], (MACD, signal, histogram, MACD.index), None
+
+
+def get_stock_recommendation(ticker, indicators=None):
+    """Analyzes stock and returns recommendation data.
+
+    `indicators` may be an indicators_for() result for the 1y history
+    (with SMA_50, SMA_200 and VOLUME_RATIO) to avoid computing it again.
+    Otherwise the daily snapshot is used when it ends on the live last bar.
+    The current price always comes from the live history.
+    """
+    try:
+        data = get_history(ticker, '1y')
+        if data.empty:
+            return None, "Error: No data found for this ticker."
+
+        # Calculate indicators
+        if indicators is None:
+            indicators = snapshot_indicators(ticker, SCORE_INPUTS, current=data)
+        if indicators is None:
+            indicators = indicators_for(ticker, data)
+        current_price = data.Close.iloc[-1]
+        sma_50 = indicators['SMA_50'].iloc[-1]
+        sma_200 = indicators['SMA_200'].iloc[-1]
+        rsi = indicators['RSI'].iloc[-1]
+        macd = indicators['MACD'].iloc[-1]
+        signal = indicators['MACD_signal'].iloc[-1]
+        
+        # Scoring
+        buy_signals = 0
+        sell_signals = 0
+        reasons = []
+        
+        if current_price > sma_50 > sma_200:
+            buy_signals += 2
+            reasons.append("Strong uptrend: Price above 50-day and 200-day SMA")
+        elif current_price < sma_50 < sma_200:
+            sell_signals += 2
+            reasons.append("Strong downtrend: Price below 50-day and 200-day SMA")
+        elif current_price > sma_50:
+            buy_signals += 1
+            reasons.append("Price above 50-day SMA")
+        else:
+            sell_signals += 1
+            reasons.append("Price below 50-day SMA")
+        
+        if rsi < 30:
+            buy_signals += 2
+            reasons.append(f"RSI indicates oversold ({rsi:.2f})")
+        elif rsi > 70:
+            sell_signals += 2
+            reasons.append(f"RSI indicates overbought ({rsi:.2f})")
+        elif rsi < 45:
+            buy_signals += 1
+            reasons.append(f"RSI moderately low ({rsi:.2f})")
+        elif rsi > 55:
+            sell_signals += 1
+            reasons.append(f"RSI moderately high ({rsi:.2f})")
+        
+        if macd > signal:
+            buy_signals += 1
+            reasons.append("MACD above signal line (bullish)")
+        else:
+            sell_signals += 1
+            reasons.append("MACD below signal line (bearish)")
+        
+        if indicators['VOLUME_RATIO'].iloc[-1] > 1.2:
+            reasons.append("Above average volume detected")
+        
+        if buy_signals > sell_signals + 1:
+            recommendation = "BUY"
+            confidence = "High" if buy_signals >= 4 else "Moderate"
+        elif sell_signals > buy_signals + 1:
+            recommendation = "SELL"
+            confidence = "High" if sell_signals >= 4 else "Moderate"
+        else:
+            recommendation = "HOLD"
+            confidence = "Neutral"
+        
+        # The visual depends only on these values, so they make a complete cache key
+        chart, _ = get_or_render(
+            ('recommendation', ticker.upper(), recommendation, confidence, buy_signals, sell_signals,
+             round(rsi, 2), round(current_price, 2)),
+            lambda: (plot_recommendation_visual(ticker, recommendation, confidence, buy_signals, sell_signals, rsi, current_price), None)
+        )
+        
+        result = {
+            "ticker": ticker,
+            "recommendation": recommendation,
+            "confidence": confidence,
+            "current_price": round(current_price, 2),
+            "rsi": round(rsi, 2),
+            "buy_signals": buy_signals,
+            "sell_signals": sell_signals,
+            "reasons": reasons,
+            "chart": chart
+        }
+        
+        return result, None
+        
+    except Exception as e:
+        return None, f"Error analyzing stock: {str(e)}"
@@ -0,0 +1,182 @@
+"""CSS for the dark minimalist theme, injected with st.markdown(..., unsafe_allow_html=True)."""
+
+# Whole app
+APP_CSS = """
+<style>
+    /* Dark minimalist background */
+    .stApp {
+        background: #0a0a0a;
+        background-attachment: fixed;
+    }
+    
+    /* Title styling - bold minimal */
+    h1 {
+        color: #ffffff !important;
+        font-weight: 300 !important;
+        padding: 3rem 0 1rem 0;
+        font-size: 3rem !important;
+        letter-spacing: -1px;
+        border-bottom: 1px solid #1a1a1a;
+        margin-bottom: 2rem;
+    }
+    
+    h2, h3 {
+        color: #ffffff !important;
+        font-weight: 300 !important;
+    }
+    
+    /* Input field styling - dark minimal */
+    .stTextInput > div > div > input, .stNumberInput > div > div > input {
+        background: #1a1a1a !important;
+        border: 1px solid #2a2a2a !important;
+        color: #ffffff !important;
+        border-radius: 2px !important;
+        padding: 14px 18px !important;
+        font-size: 0.95rem !important;
+        transition: border-color 0.2s ease !important;
+        box-shadow: none !important;
+    }
+    
+    .stTextInput > div > div > input::placeholder {
+        color: #666666 !important;
+    }
+    
+    .stTextInput > div > div > input:focus, .stNumberInput > div > div > input:focus {
+        border: 1px solid #404040 !important;
+        box-shadow: none !important;
+        outline: none !important;
+        background: #151515 !important;
+    }
+    
+    /* Label styling - minimal uppercase */
+    .stTextInput > label, .stNumberInput > label, .stSelectbox > label {
+        color: #999999 !important;
+        font-weight: 400 !important;
+        font-size: 0.75rem !important;
+        margin-bottom: 0.5rem;
+        text-transform: uppercase;
+        letter-spacing: 1.5px;
+    }
+    
+    /* Text styling */
+    p {
+        color: #cccccc !important;
+        line-height: 1.8;
+        font-size: 0.95rem;
+    }
+    
+    /* Error message styling */
+    .stAlert {
+        background: #1a0a0a !important;
+        border: 1px solid #4a2020 !important;
+        border-radius: 2px !important;
+        color: #ff6b6b !important;
+        padding: 1rem;
+    }
+    
+    /* Image container - dark card */
+    .stImage {
+        border-radius: 2px;
+        overflow: hidden;
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.5);
+        border: 1px solid #1a1a1a;
+        background: #0f0f0f;
+        padding: 1.5rem;
+        margin: 2rem 0;
+    }
+    
+    /* Code blocks */
+    code {
+        background: #1a1a1a !important;
+        color: #ffffff !important;
+        padding: 3px 8px;
+        border-radius: 2px;
+        border: 1px solid #2a2a2a;
+        font-size: 0.9em;
+    }
+    
+    /* Accent color for emphasis */
+    strong {
+        color: #b8860b !important;
+    }
+    
+    /* Container spacing */
+    .block-container {
+        padding-top: 2rem;
+        padding-bottom: 3rem;
+        max-width: 900px;
+    }
+    
+    /* Button styling */
+    .stButton > button {
+        background: #1a1a1a !important;
+        color: #ffffff !important;
+        border: 1px solid #2a2a2a !important;
+        border-radius: 2px !important;
+        padding: 0.5rem 2rem !important;
+        transition: all 0.2s ease !important;
+    }
+    
+    .stButton > button:hover {
+        background: #2a2a2a !important;
+        border-color: #404040 !important;
+    }
+    
+    /* Radio button styling */
+    .stRadio > div {
+        background: #0a0a0a;
+        padding: 0.5rem;
+        border-radius: 2px;
+    }
+    
+    /* Selectbox styling */
+    .stSelectbox > div > div {
+        background: #1a1a1a !important;
+        border: 1px solid #2a2a2a !important;
+        border-radius: 2px !important;
+    }
+    
+    /* Metric card styling */
+    [data-testid="stMetricValue"] {
+        color: #00ff88 !important;
+        font-size: 2rem !important;
+    }
+    
+    [data-testid="stMetricLabel"] {
+        color: #999999 !important;
+    }
+</style>
+"""
+
+# Login / register screen
+AUTH_CSS = """
+<style>
+    .auth-container {
+        max-width: 450px;
+        margin: 0 auto;
+        padding: 3rem 2rem;
+        background: #1a1a1a;
+        border-radius: 4px;
+        border: 1px solid #2a2a2a;
+        margin-top: 3rem;
+    }
+    .auth-title {
+        text-align: center;
+        margin-bottom: 2rem;
+        font-size: 2rem !important;
+    }
+    .tab-container {
+        display: flex;
+        margin-bottom: 2rem;
+        border-bottom: 1px solid #2a2a2a;
+    }
+    .success-message {
+        background: #0a3a0a !important;
+        border: 1px solid #2a6a2a !important;
+        color: #66ff66 !important;
+        padding: 0.75rem;
+        border-radius: 2px;
+        margin: 1rem 0;
+    }
+</style>
+"""
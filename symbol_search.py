@@ -0,0 +1,191 @@
+"""Local company-name search over the symbol master.
+
+The master is POPULAR_COMPANIES plus, if present, a CSV of extra listings
+(SYMBOL_MASTER_PATH, columns `symbol,name`). It is indexed once per process
+into:
+
+- a sorted list of names for prefix matches ("tata mo" -> Tata Motors)
+- an inverted index of name tokens ("motors" -> Tata Motors, ...)
+- an inverted index of character trigrams for typo-tolerant matches
+  ("infosis" -> Infosys)
+
+search() ranks candidates from all three and never touches the network.
+"""
+import bisect
+import csv
+import os
+import re
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from symbols import POPULAR_COMPANIES, is_indian
+
+SYMBOL_MASTER_PATH = os.environ.get('SYMBOL_MASTER_PATH', 'symbol_master.csv')
+MIN_FUZZY_SIMILARITY = 0.35
+DEFAULT_LIMIT = 5
+
+# Words that do not help tell companies apart
+STOPWORDS = {'ltd', 'limited', 'inc', 'corp', 'corporation', 'company', 'co', 'plc', 'the', 'group',
+             'industries', 'holdings', 'stock', 'share', 'shares'}
+
+SearchResult = namedtuple('SearchResult', 'symbol name exchange score match')
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9&.\- ]+")
+
+
+def normalize(text):
+    return ' '.join(_NON_WORD_RE.sub(' ', text.lower()).split())
+
+
+def tokens(text):
+    return [t for t in re.split(r'[\s\-]+', normalize(text)) if t and t not in STOPWORDS]
+
+
+def trigrams(text):
+    padded = f"  {' '.join(tokens(text)) or normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def exchange_of(symbol):
+    if symbol.endswith('.NS'):
+        return 'NSE'
+    if symbol.endswith('.BO'):
+        return 'BSE'
+    return 'US'
+
+
+# Short single-word aliases are acronyms (TCS, HDFC, ONGC) and stay upper case in names
+_ACRONYMS = {alias for alias in POPULAR_COMPANIES if len(alias) <= 4 and ' ' not in alias}
+
+
+def _display_name(alias):
+    return ' '.join(word.upper() if word in _ACRONYMS else word.title() for word in alias.split())
+
+
+class SymbolIndex:
+    """Prefix, token and trigram indexes over (alias, symbol) pairs"""
+
+    def __init__(self, entries):
+        # entries: iterable of (alias, symbol, display name)
+        self.aliases = []
+        self.names = {}
+        for alias, symbol, name in entries:
+            alias = normalize(alias)
+            if alias:
+                self.aliases.append((alias, symbol))
+                if name and (symbol not in self.names or len(name) > len(self.names[symbol])):
+                    self.names[symbol] = name
+
+        self.sorted_aliases = sorted((alias, i) for i, (alias, _) in enumerate(self.aliases))
+        self.by_token = defaultdict(set)
+        self.by_trigram = defaultdict(set)
+        self.alias_tokens = []
+        self.alias_trigrams = []
+        for i, (alias, _) in enumerate(self.aliases):
+            alias_tokens = set(tokens(alias))
+            self.alias_tokens.append(alias_tokens)
+            for token in alias_tokens or [alias]:
+                self.by_token[token].add(i)
+            grams = trigrams(alias)
+            self.alias_trigrams.append(grams)
+            for gram in grams:
+                self.by_trigram[gram].add(i)
+
+    def _prefix_matches(self, query):
+        start = bisect.bisect_left(self.sorted_aliases, (query,))
+        for alias, i in self.sorted_aliases[start:]:
+            if not alias.startswith(query):
+                break
+            yield i
+
+    def _score(self, query, query_tokens, query_grams, i):
+        alias, symbol = self.aliases[i]
+        alias_tokens = self.alias_tokens[i]
+        if (query == alias or query == symbol.lower() or query == symbol.lower().split('.')[0]
+                or query_tokens and query_tokens == alias_tokens):
+            return 1.0, 'exact'
+        if alias.startswith(query):
+            return 0.9 - 0.1 * (1 - len(query) / len(alias)), 'prefix'
+
+        best = (0.0, None)
+        if query_tokens and alias_tokens:
+            matched = len(query_tokens & alias_tokens)
+            if matched:
+                coverage = matched / len(query_tokens) * matched / len(alias_tokens)
+                best = (0.5 + 0.3 * coverage, 'token')
+
+        grams = self.alias_trigrams[i]
+        similarity = len(query_grams & grams) / len(query_grams | grams)
+        if similarity >= MIN_FUZZY_SIMILARITY and 0.7 * similarity > best[0]:
+            best = (0.7 * similarity, 'fuzzy')
+        return best
+
+    def search(self, query, market='Both', limit=DEFAULT_LIMIT):
+        """Best matches for `query`, one per symbol, highest score first"""
+        query = normalize(query)
+        if not query:
+            return []
+        query_tokens = set(tokens(query))
+        query_grams = trigrams(query)
+
+        candidates = set(self._prefix_matches(query))
+        for token in query_tokens:
+            candidates |= self.by_token.get(token, set())
+        for gram in query_grams:
+            candidates |= self.by_trigram.get(gram, set())
+
+        best = {}
+        for i in candidates:
+            symbol = self.aliases[i][1]
+            if market == 'US' and is_indian(symbol) or market == 'India' and not is_indian(symbol):
+                continue
+            score, match = self._score(query, query_tokens, query_grams, i)
+            if match and score > best.get(symbol, (0,))[0]:
+                best[symbol] = (score, match)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [SearchResult(symbol, self.names.get(symbol, symbol), exchange_of(symbol), round(score, 3), match)
+                for symbol, (score, match) in ranked]
+
+
+def _master_entries(path=SYMBOL_MASTER_PATH):
+    for alias, symbol in POPULAR_COMPANIES.items():
+        yield alias, symbol, _display_name(alias)
+        yield symbol, symbol, None
+        yield symbol.split('.')[0], symbol, None
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                symbol, name = row.get('symbol', '').strip().upper(), row.get('name', '').strip()
+                if symbol:
+                    yield name or symbol, symbol, name or None
+                    yield symbol, symbol, None
+
+
+_index = None
+_index_lock = threading.Lock()
+build_seconds = None
+
+
+def get_index():
+    """Process-wide index, built on first use"""
+    global _index, build_seconds
+    with _index_lock:
+        if _index is None:
+            start = time.perf_counter()
+            _index = SymbolIndex(_master_entries())
+            build_seconds = time.perf_counter() - start
+        return _index
+
+
+def search_companies(query, market='Both', limit=DEFAULT_LIMIT):
+    return get_index().search(query, market, limit)
+
+
+_SYMBOL_RE = re.compile(r'[A-Za-z][A-Za-z0-9&\-]{0,9}(?:\.[A-Za-z]{1,2})?')
+
+
+def looks_like_symbol(text):
+    """Whether `text` could be a ticker symbol (one short word, optional exchange suffix)"""
+    return bool(_SYMBOL_RE.fullmatch(text.strip()))
@@ -0,0 +1,177 @@
+"""Company-name to ticker mapping and ticker extraction from free text.
+
+Shared by the ticker lookup page and the chatbot's response cache and router.
+"""
+import re
+
+# Manual mapping for popular companies (US + India)
+POPULAR_COMPANIES = {
+    # US Stocks
+    'apple': 'AAPL',
+    'microsoft': 'MSFT',
+    'google': 'GOOGL',
+    'alphabet': 'GOOGL',
+    'amazon': 'AMZN',
+    'tesla': 'TSLA',
+    'meta': 'META',
+    'facebook': 'META',
+    'netflix': 'NFLX',
+    'nvidia': 'NVDA',
+    'intel': 'INTC',
+    'amd': 'AMD',
+    'coca cola': 'KO',
+    'pepsi': 'PEP',
+    'walmart': 'WMT',
+    'disney': 'DIS',
+    'nike': 'NKE',
+    'mcdonalds': 'MCD',
+    'starbucks': 'SBUX',
+    'boeing': 'BA',
+    'ibm': 'IBM',
+    'oracle': 'ORCL',
+    'salesforce': 'CRM',
+    'visa': 'V',
+    'mastercard': 'MA',
+    'paypal': 'PYPL',
+    'uber': 'UBER',
+    'spotify': 'SPOT',
+    'twitter': 'X',
+    'jpmorgan': 'JPM',
+    'bank of america': 'BAC',
+    'wells fargo': 'WFC',
+    'goldman sachs': 'GS',
+    'exxon': 'XOM',
+    'chevron': 'CVX',
+    'pfizer': 'PFE',
+    'johnson': 'JNJ',
+    'procter': 'PG',
+    'ford': 'F',
+    'gm': 'GM',
+    'general motors': 'GM',
+    'att': 'T',
+    'verizon': 'VZ',
+    'comcast': 'CMCSA',
+    'adobe': 'ADBE',
+    'cisco': 'CSCO',
+    'qualcomm': 'QCOM',
+    # Indian Stocks (NSE)
+    'reliance': 'RELIANCE.NS',
+    'tcs': 'TCS.NS',
+    'tata consultancy': 'TCS.NS',
+    'infosys': 'INFY.NS',
+    'hdfc bank': 'HDFCBANK.NS',
+    'hdfc': 'HDFCBANK.NS',
+    'icici bank': 'ICICIBANK.NS',
+    'icici': 'ICICIBANK.NS',
+    'state bank': 'SBIN.NS',
+    'sbi': 'SBIN.NS',
+    'bharti airtel': 'BHARTIARTL.NS',
+    'airtel': 'BHARTIARTL.NS',
+    'itc': 'ITC.NS',
+    'wipro': 'WIPRO.NS',
+    'axis bank': 'AXISBANK.NS',
+    'axis': 'AXISBANK.NS',
+    'kotak': 'KOTAKBANK.NS',
+    'kotak mahindra': 'KOTAKBANK.NS',
+    'maruti': 'MARUTI.NS',
+    'maruti suzuki': 'MARUTI.NS',
+    'tata motors': 'TATAMOTORS.NS',
+    'mahindra': 'M&M.NS',
+    'm&m': 'M&M.NS',
+    'asian paints': 'ASIANPAINT.NS',
+    'bajaj finance': 'BAJFINANCE.NS',
+    'bajaj': 'BAJFINANCE.NS',
+    'titan': 'TITAN.NS',
+    'ultratech': 'ULTRACEMCO.NS',
+    'ultratech cement': 'ULTRACEMCO.NS',
+    'nestle': 'NESTLEIND.NS',
+    'nestle india': 'NESTLEIND.NS',
+    'hul': 'HINDUNILVR.NS',
+    'hindustan unilever': 'HINDUNILVR.NS',
+    'adani': 'ADANIPORTS.NS',
+    'adani ports': 'ADANIPORTS.NS',
+    'tata steel': 'TATASTEEL.NS',
+    'sun pharma': 'SUNPHARMA.NS',
+    'dr reddy': 'DRREDDY.NS',
+    'tech mahindra': 'TECHM.NS',
+    'ongc': 'ONGC.NS',
+    'ntpc': 'NTPC.NS',
+    'power grid': 'POWERGRID.NS',
+    'larsen': 'LT.NS',
+    'l&t': 'LT.NS',
+    'grasim': 'GRASIM.NS',
+    'jsw steel': 'JSWSTEEL.NS',
+    'hindalco': 'HINDALCO.NS',
+    'britannia': 'BRITANNIA.NS',
+    'coal india': 'COALINDIA.NS',
+    'bpcl': 'BPCL.NS',
+    'bharat petroleum': 'BPCL.NS',
+    'ioc': 'IOC.NS',
+    'indian oil': 'IOC.NS',
+    'eicher': 'EICHERMOT.NS',
+    'eicher motors': 'EICHERMOT.NS',
+    'divi': 'DIVISLAB.NS',
+    'divis lab': 'DIVISLAB.NS',
+    'cipla': 'CIPLA.NS',
+    'bajaj auto': 'BAJAJ-AUTO.NS',
+    'hero motocorp': 'HEROMOTOCO.NS',
+    'hero': 'HEROMOTOCO.NS',
+    'shree cement': 'SHREECEM.NS',
+    'indusind': 'INDUSINDBK.NS',
+    'indusind bank': 'INDUSINDBK.NS',
+    'vedanta': 'VEDL.NS',
+    'tata consumer': 'TATACONSUM.NS',
+    'godrej consumer': 'GODREJCP.NS',
+    'sbi life': 'SBILIFE.NS',
+    'hdfc life': 'HDFCLIFE.NS',
+    'icici prudential': 'ICICIPRULI.NS',
+    'pidilite': 'PIDILITIND.NS',
+    'berger paints': 'BERGEPAINT.NS',
+    'dabur': 'DABUR.NS',
+    'marico': 'MARICO.NS',
+    'colgate': 'COLPAL.NS',
+    'colgate palmolive': 'COLPAL.NS'
+}
+
+
+def is_indian(ticker):
+    return '.NS' in ticker or '.BO' in ticker
+
+
+# Longest names first, so "tata motors" wins over a bare "tata"
+_NAME_RE = re.compile(
+    r'(?<![\w&])(' + '|'.join(re.escape(name) for name in sorted(POPULAR_COMPANIES, key=len, reverse=True))
+    + r')(?![\w&])'
+)
+
+
+def find_companies(text):
+    """Tickers of every company named in `text` as whole words"""
+    return {POPULAR_COMPANIES[name] for name in _NAME_RE.findall(text.lower())}
+
+
+# Upper-case words that look like tickers but usually are not
+_NOT_TICKERS = {
+    'I', 'A', 'AN', 'THE', 'AND', 'OR', 'IS', 'IT', 'ME', 'MY', 'OK', 'AI', 'US', 'USA', 'USD', 'INR',
+    'BUY', 'SELL', 'HOLD', 'RSI', 'MACD', 'SMA', 'EMA', 'OHLC', 'YTD', 'NSE', 'BSE', 'ETF', 'IPO', 'CEO',
+}
+_TICKER_RE = re.compile(r'\b([A-Z][A-Z0-9&-]{0,9}(?:\.[A-Z]{1,2})?)\b')
+
+
+def normalize_ticker(token):
+    """Upper-case ticker for a token, mapping bare company keys such as 'TCS' to 'TCS.NS'"""
+    return POPULAR_COMPANIES.get(token.lower(), token.upper())
+
+
+def find_tickers(text):
+    """Tickers written in upper case in `text`"""
+    return {normalize_ticker(t) for t in _TICKER_RE.findall(text) if t not in _NOT_TICKERS}
+
+
+def resolve_ticker(text):
+    """The one ticker `text` is about, or None if it names none or several.
+
+    Explicit tickers take precedence over company names.
+    """
+    tickers = find_tickers(text) or find_companies(text)
+    return next(iter(tickers)) if len(tickers) == 1 else None
@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import history_store
+from history_store import HistoryStore, period_start, slice_period
+
+TZ = 'America/New_York'
+
+
+def make_bars(days):
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz=TZ)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=days))
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.arange(days, dtype=float) + 1000}, index=index)
+
+
+class FakeExchange:
+    """Downloader serving slices of `bars` and recording every request"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, ticker, interval, period=None, start=None, end=None):
+        self.calls.append({'period': period, 'start': start, 'end': end})
+        if start is None:
+            return slice_period(self.bars, period)
+        data = self.bars[self.bars.index >= pd.Timestamp(start).tz_localize(TZ)]
+        if end is not None:
+            end = end if end.tzinfo is not None else pd.Timestamp(end).tz_localize(TZ)
+            data = data[data.index < end]
+        return data
+
+
+@pytest.fixture
+def exchange():
+    return FakeExchange(make_bars(800))
+
+
+@pytest.fixture
+def store(tmp_path, exchange):
+    return HistoryStore(root=str(tmp_path), downloader=exchange)
+
+
+def segments(tmp_path, ticker='AAPL'):
+    folder = os.path.join(tmp_path, ticker, '1d')
+    return [name for name in os.listdir(folder) if name.endswith('.parquet')]
+
+
+def test_first_load_downloads_period_and_round_trips(store, exchange, tmp_path):
+    data = store.load('aapl', '1y')
+    assert exchange.calls == [{'period': '1y', 'start': None, 'end': None}]
+    pd.testing.assert_frame_equal(data, slice_period(exchange.bars, '1y'), check_freq=False)
+    pd.testing.assert_frame_equal(store.read('AAPL'), data, check_freq=False)
+    assert len(segments(tmp_path)) == 1
+
+
+def test_repeat_load_refetches_only_from_last_closed_bar(store, exchange, tmp_path):
+    store.load('AAPL', '1y')
+    exchange.calls.clear()
+    store.load('AAPL', '1y')
+    closed = exchange.bars.index[-2].tz_localize(None).normalize()
+    assert exchange.calls == [{'period': None, 'start': closed, 'end': None}]
+    # Nothing changed, so nothing is written
+    assert len(segments(tmp_path)) == 1
+
+
+def test_revised_last_bar_replaces_stored_one(store, exchange):
+    store.load('AAPL', '1y')
+    exchange.bars.iloc[-1, exchange.bars.columns.get_loc('Close')] += 5
+    data = store.load('AAPL', '1y')
+    assert data.Close.iloc[-1] == exchange.bars.Close.iloc[-1]
+    assert store.read('AAPL').Close.iloc[-1] == exchange.bars.Close.iloc[-1]
+
+
+def test_readjusted_history_is_downloaded_again(store, exchange, tmp_path):
+    held = exchange.bars
+    exchange.bars = held.iloc[:-1]
+    store.load('AAPL', '2y')
+    store.load('AAPL', '2y')
+    # A 10:1 split on the newest day: Yahoo divides every earlier bar by 10
+    split = held.copy()
+    split.iloc[:-1, :4] /= 10
+    exchange.bars = split
+    exchange.calls.clear()
+
+    data = store.load('AAPL', '1y')
+    assert exchange.calls[-1]['start'] == slice_period(held, '2y').index[0].tz_localize(None)
+    pd.testing.assert_frame_equal(data, slice_period(split, '1y'), check_freq=False)
+    pd.testing.assert_frame_equal(store.read('AAPL'), slice_period(split, '2y'), check_freq=False)
+    assert len(segments(tmp_path)) == 1
+
+
+def test_new_bars_are_appended(store, exchange):
+    held = exchange.bars
+    exchange.bars = held.iloc[:-3]
+    store.load('AAPL', '1y')
+    exchange.bars = held
+    data = store.load('AAPL', '1y')
+    assert data.index[-1] == held.index[-1]
+    assert not data.index.duplicated().any()
+
+
+def test_longer_period_backfills_only_the_gap(store, exchange):
+    short = store.load('AAPL', '6mo')
+    exchange.calls.clear()
+    data = store.load('AAPL', '2y')
+
+    backfill = exchange.calls[0]
+    assert backfill['start'] == period_start('2y')
+    assert backfill['end'] == short.index[0]
+    pd.testing.assert_frame_equal(data, slice_period(exchange.bars, '2y'), check_freq=False)
+
+    # Covered now: a shorter period does not backfill again
+    exchange.calls.clear()
+    store.load('AAPL', '1y')
+    assert len(exchange.calls) == 1 and exchange.calls[0]['end'] is None
+
+
+def test_failed_refetch_serves_stored_bars(store, exchange):
+    stored = store.load('AAPL', '1y')
+
+    def offline(*args, **kwargs):
+        raise ConnectionError
+    store._download = offline
+    pd.testing.assert_frame_equal(store.load('AAPL', '1y'), stored, check_freq=False)
+
+
+def test_segments_are_compacted(store, exchange, tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, 'MAX_SEGMENTS', 3)
+    held = exchange.bars
+    exchange.bars = held.iloc[:-5]
+    store.load('AAPL', '1y')
+    for end in range(4, -1, -1):
+        exchange.bars = held.iloc[:len(held) - end]
+        store.load('AAPL', '1y')
+    assert len(segments(tmp_path)) <= 3
+    pd.testing.assert_frame_equal(store.read('AAPL'), slice_period(held, '1y'), check_freq=False)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_snapshot
+import indicator_state
+from indicator_snapshot import IndicatorSnapshot, build_snapshot
+
+pytest.importorskip('streamlit')
+import stock_analysis
+
+
+def make_bars(days, start='2024-01-02'):
+    index = pd.bdate_range(start, periods=days, tz='America/New_York')
+    close = 100 + np.cumsum(np.random.default_rng(3).normal(size=days))
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.full(days, 1e6)}, index=index)
+
+
+class FakeStore:
+    def __init__(self, bars):
+        self.bars = bars
+
+    def read(self, ticker):
+        return self.bars
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    bars = make_bars(300)
+    path = str(tmp_path / 'snapshot.npz')
+    build_snapshot(['AAPL'], path, store=FakeStore(bars), period='max')
+    snapshot = IndicatorSnapshot(path)
+    monkeypatch.setattr(indicator_snapshot, '_snapshot', snapshot)
+    monkeypatch.setattr(indicator_state, 'HISTORY_STORE_DIR', str(tmp_path / 'state'))
+    indicator_state.forget()
+    return bars, snapshot
+
+
+def test_hit_when_live_history_ends_on_the_same_bar(built):
+    bars, snapshot = built
+    series = snapshot.lookup('AAPL', ('Close', 'SMA_50'), current=bars)
+    assert series['Close'].index[-1] == bars.index[-1]
+    assert snapshot.hits == 1
+
+
+def test_newer_or_revised_live_bar_is_a_miss(built):
+    bars, snapshot = built
+    newer = make_bars(301)
+    revised = bars.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] += 1
+    assert snapshot.lookup('AAPL', ('SMA_50',), current=newer) is None
+    assert snapshot.lookup('AAPL', ('SMA_50',), current=revised) is None
+    assert snapshot.misses == 2
+
+
+def test_recommendation_uses_live_price_once_snapshot_is_behind(built, monkeypatch):
+    bars, snapshot = built
+    live = make_bars(301)
+    live.iloc[-1, live.columns.get_loc('Close')] = 250.0
+    monkeypatch.setattr(stock_analysis, 'get_history', lambda ticker, period='1y', interval='1d': live)
+
+    result, error = stock_analysis.get_stock_recommendation('AAPL')
+    assert error is None
+    assert result['current_price'] == 250.0
+    assert snapshot.hits == 0
+
+
+def test_indicator_page_serves_up_to_date_snapshot(built, monkeypatch):
+    bars, snapshot = built
+    monkeypatch.setattr(stock_analysis, 'get_history', lambda ticker, period='1y', interval='1d': bars)
+    sma, error = stock_analysis.calculate_SMA('AAPL', 50)
+    assert error is None and snapshot.hits == 1
+    # The snapshot stores its index in nanoseconds, so compare values rather than dtypes
+    assert (sma.index == bars.index).all()
+    np.testing.assert_allclose(sma.to_numpy(), bars.Close.rolling(50).mean().to_numpy(), rtol=1e-12)
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_state
+from indicator_state import EMAState, IndicatorTracker, RSIState, incremental_indicators
+from indicators import compute_indicators
+
+NAMES = ('EMA_20', 'RSI', 'MACD', 'MACD_signal', 'MACD_hist')
+
+
+@pytest.fixture
+def close():
+    index = pd.bdate_range('2020-01-01', periods=400, tz='America/New_York')
+    return pd.Series(100 + np.cumsum(np.random.default_rng(4).normal(size=len(index))), index=index)
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(indicator_state, 'HISTORY_STORE_DIR', str(tmp_path))
+    indicator_state.forget()
+    yield tmp_path
+    indicator_state.forget()
+
+
+def assert_matches_recompute(result, close):
+    expected = compute_indicators(close, ema_windows=(20,))
+    for name in NAMES:
+        np.testing.assert_allclose(result[name].to_numpy(), expected[name].to_numpy(), rtol=1e-10, atol=1e-10,
+                                   err_msg=name)
+        assert result[name].index.equals(close.index)
+
+
+def test_states_follow_pandas_recursions(close):
+    ema, rsi = EMAState(20), RSIState()
+    emas = [ema.push(x) for x in close]
+    rsis = [rsi.push(x) for x in close]
+    np.testing.assert_allclose(emas, close.ewm(span=20, adjust=False).mean(), rtol=1e-12)
+    np.testing.assert_allclose(rsis, compute_indicators(close)['RSI'], rtol=1e-10)
+
+
+def test_bar_by_bar_equals_full_recompute(close):
+    for end in range(250, len(close) + 1):
+        result = incremental_indicators('AAPL', close.iloc[:end], ema_windows=(20,))
+    assert_matches_recompute(result, close)
+
+
+def test_pending_bar_revisions_are_replayed(close):
+    incremental_indicators('AAPL', close.iloc[:300], ema_windows=(20,))
+    for bump in (1.0, -2.5, 0.5):
+        revised = close.iloc[:301].copy()
+        revised.iloc[-1] += bump
+        assert_matches_recompute(incremental_indicators('AAPL', revised, ema_windows=(20,)), revised)
+    assert_matches_recompute(incremental_indicators('AAPL', close.iloc[:302], ema_windows=(20,)), close.iloc[:302])
+
+
+def test_revised_committed_history_rebuilds(close):
+    incremental_indicators('AAPL', close.iloc[:300], ema_windows=(20,))
+    adjusted = close.iloc[:301] * 0.5  # e.g. a split re-adjusts every stored close
+    assert_matches_recompute(incremental_indicators('AAPL', adjusted, ema_windows=(20,)), adjusted)
+
+
+def test_new_ema_window_rebuilds(close):
+    incremental_indicators('AAPL', close.iloc[:300])
+    result = incremental_indicators('AAPL', close.iloc[:300], ema_windows=(20,))
+    assert_matches_recompute(result, close.iloc[:300])
+
+
+def test_tracker_round_trips_through_dict(close):
+    tracker = IndicatorTracker((20,))
+    tracker.advance(close.iloc[:300])
+    restored = IndicatorTracker.from_dict(tracker.to_dict())
+    assert restored.advance(close.iloc[299:]) == tracker.advance(close.iloc[299:])
+
+
+@pytest.mark.skipif(not indicator_state.PARQUET_AVAILABLE, reason="state is only saved with the history store")
+def test_state_is_saved_on_new_bars_and_resumed(close, state_dir, monkeypatch):
+    incremental_indicators('AAPL', close.iloc[:300], ema_windows=(20,))
+    path = os.path.join(state_dir, 'AAPL', '1d', indicator_state.STATE_FILE)
+    assert os.path.exists(path)
+
+    # A restart: the tracker comes back from disk and only advances over the new bar
+    indicator_state.forget()
+    advanced = []
+    real_advance = IndicatorTracker.advance
+
+    def recording_advance(self, series):
+        timestamps, rows = real_advance(self, series)
+        advanced.extend(timestamps)
+        return timestamps, rows
+    monkeypatch.setattr(IndicatorTracker, 'advance', recording_advance)
+
+    result = incremental_indicators('AAPL', close.iloc[:301], ema_windows=(20,))
+    assert advanced == list(close.index[299:301])
+    assert_matches_recompute(result, close.iloc[:301])
+
+
+def test_window_starting_after_the_last_seen_bar_rebuilds(close):
+    # An idle session or a restart: the next window no longer overlaps the bars already tracked
+    incremental_indicators('AAPL', close.iloc[:200], ema_windows=(20,))
+    later = close.iloc[220:]
+    assert_matches_recompute(incremental_indicators('AAPL', later, ema_windows=(20,)), later)
+
+
+def test_trackers_are_bounded_least_recently_used_first(close, monkeypatch):
+    monkeypatch.setattr(indicator_state, 'MAX_TRACKED', 2)
+    for ticker in ('AAPL', 'MSFT', 'AAPL', 'TSLA'):
+        incremental_indicators(ticker, close.iloc[:300])
+    assert list(indicator_state._tracked) == [('AAPL', '1d'), ('TSLA', '1d')]
+    # An evicted tracker resumes from its state file (or a rebuild) with the same outputs
+    assert_matches_recompute(incremental_indicators('MSFT', close.iloc[:301], ema_windows=(20,)), close.iloc[:301])
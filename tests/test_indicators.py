@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import compute_indicators
+
+
+@pytest.fixture
+def close():
+    index = pd.bdate_range('2010-01-01', periods=3000)
+    return pd.Series(100 + np.cumsum(np.random.default_rng(1).normal(size=len(index))), index=index)
+
+
+@pytest.fixture
+def volume(close):
+    return pd.Series(np.random.default_rng(2).uniform(1e5, 1e6, size=len(close)), index=close.index)
+
+
+def reference_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def assert_close(actual, expected):
+    pd.testing.assert_series_equal(actual, expected, check_names=False, check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+def test_sma_and_ema_match_pandas(close):
+    # Long spans exercise the closed-form EMA across many blocks
+    result = compute_indicators(close, sma_windows=(5, 50, 200), ema_windows=(5, 50, 200))
+    for window in (5, 50, 200):
+        assert_close(result[f'SMA_{window}'], close.rolling(window).mean())
+        assert_close(result[f'EMA_{window}'], close.ewm(span=window, adjust=False).mean())
+
+
+def test_rsi_and_macd_match_pandas(close):
+    result = compute_indicators(close)
+    assert_close(result['RSI'], reference_rsi(close))
+
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    assert_close(result['MACD'], macd)
+    assert_close(result['MACD_signal'], signal)
+    assert_close(result['MACD_hist'], macd - signal)
+
+
+def test_volume_ratio_matches_pandas(close, volume):
+    result = compute_indicators(close, volume)
+    assert_close(result['VOLUME_RATIO'], volume.rolling(5).mean() / volume.expanding().mean())
+
+
+def test_leading_gaps_start_each_column_at_its_first_bar(close):
+    late = close.copy()
+    late.iloc[:100] = np.nan
+    frame = pd.DataFrame({'EARLY': close, 'LATE': late})
+    result = compute_indicators(frame, sma_windows=(20,), ema_windows=(20,))
+
+    assert_close(result['EMA_20']['EARLY'], close.ewm(span=20, adjust=False).mean())
+    assert result['EMA_20']['LATE'].iloc[:100].isna().all()
+    assert_close(result['EMA_20']['LATE'].iloc[100:], close.iloc[100:].ewm(span=20, adjust=False).mean())
+    assert_close(result['SMA_20']['LATE'].iloc[100:], close.iloc[100:].rolling(20).mean())
+    assert_close(result['RSI']['LATE'].iloc[100:], reference_rsi(close.iloc[100:]))
+
+
+def test_empty_series_gives_empty_results():
+    empty = pd.Series([], dtype=float, index=pd.DatetimeIndex([]))
+    result = compute_indicators(empty, empty, sma_windows=(50,), ema_windows=(20,))
+    assert set(result) == {'SMA_50', 'EMA_20', 'RSI', 'MACD', 'MACD_signal', 'MACD_hist', 'VOLUME_RATIO'}
+    assert all(series.empty for series in result.values())
+
+    frame = compute_indicators(pd.DataFrame(columns=['A', 'B'], dtype=float), sma_windows=(50,))
+    assert list(frame['SMA_50'].columns) == ['A', 'B'] and frame['SMA_50'].empty
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import intraday
+from intraday import COLUMNS, BarRing, IntradayBars
+
+TZ = 'America/New_York'
+
+
+def make_bars(start, periods, freq='1min', close=100.0):
+    index = pd.date_range(start, periods=periods, freq=freq, tz=TZ, unit='ns')
+    values = close + np.arange(periods, dtype=float)
+    return pd.DataFrame({'Open': values, 'High': values + 1, 'Low': values - 1, 'Close': values,
+                         'Volume': np.full(periods, 10.0)}, index=index)
+
+
+def recent(periods, freq='1min'):
+    return make_bars(pd.Timestamp.now(tz=TZ).floor('h') - pd.Timedelta(hours=2), periods, freq)
+
+
+class FakeExchange:
+    """Downloader serving slices of `bars`; `incremental` overrides the reply to start= requests"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+        self.incremental = None
+
+    def __call__(self, ticker, interval, period=None, start=None):
+        self.calls.append('start' if start is not None else 'window')
+        if start is None:
+            return self.bars
+        if isinstance(self.incremental, Exception):
+            raise self.incremental
+        if self.incremental is not None:
+            return self.incremental
+        return self.bars[self.bars.index >= start]
+
+
+def test_ring_wraps_around_keeping_newest_bars():
+    ring = BarRing(5)
+    bars = make_bars('2024-01-02 09:30', 8)
+    ring.upsert(bars.iloc[:3])
+    ring.upsert(bars.iloc[3:])
+    assert len(ring) == 5 and ring.start == 3
+    pd.testing.assert_frame_equal(ring.frame(), bars.iloc[3:][list(COLUMNS)], check_freq=False)
+    assert ring.last_time() == bars.index[-1]
+
+
+def test_ring_replaces_the_in_progress_bar():
+    ring = BarRing(5)
+    bars = make_bars('2024-01-02 09:30', 4)
+    ring.upsert(bars.iloc[:3])
+    revised = bars.iloc[2:].copy()
+    revised.iloc[0, revised.columns.get_loc('Close')] = 50.0
+    ring.upsert(revised)
+    frame = ring.frame()
+    assert len(frame) == 4 and frame.Close.iloc[2] == 50.0
+    # Bars older than the newest held are ignored
+    ring.upsert(bars.iloc[:1].assign(Close=0.0))
+    assert len(ring) == 4 and ring.frame().Close.iloc[0] == bars.Close.iloc[0]
+
+
+def test_get_downloads_the_window_then_only_new_bars(monkeypatch):
+    exchange = FakeExchange(recent(30))
+    source = IntradayBars(downloader=exchange)
+    held = exchange.bars
+    exchange.bars = held.iloc[:20]
+    assert len(source.get('aapl', '1m')) == 20
+
+    exchange.bars = held
+    monkeypatch.setitem(intraday.REFRESH_SECONDS, '1m', 0)
+    data = source.get('AAPL', '1m')
+    assert exchange.calls == ['window', 'start']
+    pd.testing.assert_frame_equal(data, held[list(COLUMNS)], check_freq=False)
+    assert source.stats()['downloads'] == 2
+
+
+def test_get_slices_to_period():
+    exchange = FakeExchange(make_bars(pd.Timestamp.now(tz=TZ).normalize() - pd.Timedelta(days=1), 48, freq='1h'))
+    data = IntradayBars(downloader=exchange).get('AAPL', '1h', period='1d')
+    assert len(data) and data.index.normalize().nunique() == 1
+    assert data.index[-1] == exchange.bars.index[-1]
+
+
+@pytest.mark.parametrize('incremental', [ConnectionError(), pd.DataFrame()])
+def test_failed_incremental_download_falls_back_to_window(monkeypatch, incremental):
+    exchange = FakeExchange(recent(20))
+    source = IntradayBars(downloader=exchange)
+    source.get('AAPL', '1m')
+    monkeypatch.setitem(intraday.REFRESH_SECONDS, '1m', 0)
+
+    exchange.bars = recent(25)
+    exchange.incremental = incremental
+    data = source.get('AAPL', '1m')
+    assert exchange.calls[-2:] == ['start', 'window']
+    assert len(data) == 25
+
+
+def test_stale_buffer_is_downloaded_again(monkeypatch):
+    old = make_bars(pd.Timestamp.now(tz=TZ) - pd.Timedelta(days=10), 5)
+    exchange = FakeExchange(old)
+    source = IntradayBars(downloader=exchange)
+    source.get('AAPL', '1m')
+    monkeypatch.setitem(intraday.REFRESH_SECONDS, '1m', 0)
+
+    exchange.bars = recent(10)
+    data = source.get('AAPL', '1m')
+    # The last bar is past the window, so no incremental start is requested and old bars are dropped
+    assert exchange.calls == ['window', 'window']
+    pd.testing.assert_frame_equal(data, exchange.bars[list(COLUMNS)], check_freq=False)
+
+
+def test_failed_refresh_is_retried_and_not_counted(monkeypatch):
+    exchange = FakeExchange(recent(20))
+    source = IntradayBars(downloader=exchange)
+    source.get('AAPL', '1m')
+    refreshed_at = source._buffers[('AAPL', '1m')][1]
+
+    def offline(*args, **kwargs):
+        raise ConnectionError
+    source._download = offline
+    monkeypatch.setitem(intraday.REFRESH_SECONDS, '1m', 0)
+    assert len(source.get('AAPL', '1m')) == 20
+    assert source.stats()['downloads'] == 1
+    assert source._buffers[('AAPL', '1m')][1] == refreshed_at
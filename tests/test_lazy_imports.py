@@ -0,0 +1,31 @@
+import sys
+import threading
+
+from lazy_imports import import_profile, lazy_function, lazy_import, set_page
+
+
+def profiled(module):
+    return {name: page for name, _, page in import_profile()}.get(module, 'missing')
+
+
+def test_deferred_import_is_recorded_under_the_page():
+    sys.modules.pop('colorsys', None)
+    set_page('Price Charts')
+    try:
+        colorsys = lazy_import('colorsys')
+        assert 'colorsys' not in sys.modules
+        assert colorsys.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    finally:
+        set_page(None)
+    assert profiled('colorsys') == 'Price Charts'
+
+
+def test_import_on_another_thread_has_no_page():
+    sys.modules.pop('quopri', None)
+    set_page('Home')
+    encode = lazy_function('quopri', 'encodestring')
+    worker = threading.Thread(target=encode, args=(b'x',))
+    worker.start()
+    worker.join()
+    set_page(None)
+    assert profiled('quopri') is None
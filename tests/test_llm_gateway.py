@@ -0,0 +1,60 @@
+import time
+
+from llm_gateway import LLMGateway, StubBackend, TokenBucket
+
+REQUEST = {'model': 'test', 'messages': [{'role': 'user', 'content': 'hi'}], 'stream': True}
+
+
+def gateway(**kwargs):
+    backend = StubBackend(latency=0, reply="one two three four")
+    return LLMGateway(backend, limiter=TokenBucket(rate=1000, capacity=1000), **kwargs), backend
+
+
+def text(stream):
+    return ''.join(chunk.choices[0].delta.content for chunk in stream)
+
+
+def test_identical_streams_share_one_call():
+    gw, backend = gateway()
+    first = gw.chat(**REQUEST)
+    second = gw.chat(**REQUEST)
+    assert text(first) == text(second) == "one two three four "
+    assert backend.calls == 1
+    assert gw.stats()['in_flight'] == 0
+
+
+def test_abandoned_stream_is_released():
+    gw, backend = gateway()
+    stream = iter(gw.chat(**REQUEST))
+    next(stream)
+    stream.close()  # what a rerun does to the reader's generator
+    assert gw.stats()['in_flight'] == 0
+
+    assert text(gw.chat(**REQUEST)) == "one two three four "
+    assert backend.calls == 2
+
+
+def test_follower_finishes_a_stream_the_leader_abandoned():
+    gw, backend = gateway()
+    leader = gw.chat(**REQUEST)
+    follower = gw.chat(**REQUEST)
+    reader = iter(leader)
+    next(reader)
+    reader.close()
+    assert text(follower) == "one two three four "
+    assert backend.calls == 1
+
+
+def test_closed_stream_is_released():
+    gw, _ = gateway()
+    gw.chat(**REQUEST).close()
+    assert gw.stats()['in_flight'] == 0
+
+
+def test_unread_stream_expires_at_its_deadline():
+    gw, backend = gateway(deadline=0.05)
+    gw.chat(**REQUEST)  # never read
+    assert gw.stats()['in_flight'] == 1
+    time.sleep(0.06)
+    assert text(gw.chat(**REQUEST)) == "one two three four "
+    assert backend.calls == 2
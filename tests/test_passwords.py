@@ -0,0 +1,107 @@
+import hashlib
+import threading
+
+import pytest
+
+import auth
+import passwords
+from passwords import hash_password, verify_password
+from user_store import SqliteUserStore
+
+
+def legacy(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def test_hash_round_trip_is_salted():
+    first, second = hash_password('secret1'), hash_password('secret1')
+    assert first != second
+    assert verify_password('secret1', first) == (True, False)
+    assert verify_password('secret2', first) == (False, False)
+
+
+def test_legacy_hash_verifies_and_asks_for_rehash():
+    assert verify_password('demo123', legacy('demo123')) == (True, True)
+    assert verify_password('wrong123', legacy('demo123')) == (False, False)
+
+
+@pytest.mark.skipif(not passwords.SCRYPT_AVAILABLE, reason="needs scrypt")
+def test_weaker_parameters_ask_for_rehash(monkeypatch):
+    monkeypatch.setattr(passwords, 'SCRYPT_N', 2 ** 10)
+    weak = hash_password('secret1')
+    monkeypatch.undo()
+    assert verify_password('secret1', weak) == (True, True)
+
+
+@pytest.mark.parametrize('stored', [
+    'scrypt$16384$8$1$AAAA',                       # truncated
+    'scrypt$abc',
+    'scrypt$16384$8$1$!!!$AAAA',                   # bad base64
+    'scrypt$3$8$1$AAAA$AAAA',                      # n not a power of two
+    'scrypt$99999999999999999999$8$1$AAAA$AAAA',
+    'pbkdf2_sha256$many$AAAA$AAAA',
+    'md5$AAAA',
+])
+def test_malformed_hash_does_not_match(stored):
+    assert verify_password('secret1', stored) == (False, False)
+
+
+def test_unknown_user_pays_for_a_full_check(monkeypatch):
+    checked = []
+    real_verify = passwords._verify
+
+    def recording_verify(password, stored):
+        checked.append(stored)
+        return real_verify(password, stored)
+    monkeypatch.setattr(passwords, '_verify', recording_verify)
+
+    assert verify_password('secret1', None) == (False, False)
+    assert checked == [passwords._dummy()]
+    assert checked[0].startswith(('scrypt$', 'pbkdf2_sha256$'))
+
+
+@pytest.fixture
+def users(tmp_path, monkeypatch):
+    store = SqliteUserStore(str(tmp_path / 'users.db'))
+    monkeypatch.setattr(auth, 'load_users', lambda: store)
+    return store
+
+
+def test_legacy_login_rehashes_the_stored_password(users):
+    users.add_user('demo', legacy('demo123'))
+
+    assert not auth.verify_login('demo', 'wrong123')
+    assert users.get_hash('demo') == legacy('demo123')
+
+    assert auth.verify_login('demo', 'demo123')
+    upgraded = users.get_hash('demo')
+    assert upgraded != legacy('demo123')
+    assert verify_password('demo123', upgraded) == (True, False)
+    assert auth.verify_login('demo', 'demo123')
+
+
+def test_unknown_and_corrupted_users_cannot_log_in(users):
+    users.add_user('broken', 'scrypt$16384$8$1$AAAA')
+    assert not auth.verify_login('nobody', 'demo123')
+    assert not auth.verify_login('broken', 'demo123')
+
+
+def test_concurrent_registration_creates_one_account(users):
+    start = threading.Barrier(4)
+    results = {}
+
+    def register(password):
+        start.wait()
+        results[password] = auth.register_user('alice', password)
+
+    passwords_tried = [f'secret{i}' for i in range(4)]
+    threads = [threading.Thread(target=register, args=(password,)) for password in passwords_tried]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [password for password, (ok, _) in results.items() if ok]
+    assert len(winners) == 1
+    assert all(message == "Username already exists" for ok, message in results.values() if not ok)
+    assert auth.verify_login('alice', winners[0])
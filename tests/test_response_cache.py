@@ -0,0 +1,71 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, cache_key, detect_intent, normalize_query
+from tool_router import TOOL_KEYWORDS
+
+
+def key(text):
+    return cache_key(text, lambda ticker: 'v1')
+
+
+@pytest.mark.parametrize('text', [
+    "What is the MACD trend for AAPL?",
+    "AAPL RSI history",
+    "Show a 5y candlestick chart of AAPL",
+    "AAPL chart since 2020",
+])
+def test_questions_with_parameters_do_not_share_the_chart_key(text):
+    assert key(text) != key("chart AAPL")
+
+
+def test_parameters_tell_questions_apart():
+    keys = [key(text) for text in ("Show a 5y candlestick chart of AAPL", "Show a 1y candlestick chart of AAPL",
+                                   "Show a 5y OHLC chart of AAPL", "AAPL 50-day SMA", "AAPL 200-day SMA",
+                                   "What is the MACD trend for AAPL?", "AAPL RSI history")]
+    assert len(set(keys)) == len(keys)
+
+
+def test_paraphrases_share_a_key():
+    assert key("Should I buy AAPL?") == key("is AAPL a buy right now")
+    assert key("chart AAPL") == key("plot AAPL")
+    assert key("Show a 5y candlestick chart of AAPL") == key("AAPL candlestick chart, 5 years")
+
+
+def test_worth_now_is_a_price_question():
+    assert detect_intent("What is AAPL worth now?") == 'price'
+    assert detect_intent("Is AAPL worth buying?") == 'recommendation'
+
+
+@pytest.mark.parametrize('keyword', sorted({k for keywords in TOOL_KEYWORDS.values() for k in keywords}))
+def test_router_commands_are_cached(keyword):
+    # Every "<keyword> <ticker>" command the router answers locally also has a cache key
+    assert normalize_query(f"{keyword} RELIANCE.NS") is not None
+
+
+def test_open_ended_and_ambiguous_questions_are_not_cached():
+    assert key("Why should I buy AAPL?") is None
+    assert key("Compare AAPL and MSFT charts") is None
+    assert key("chart AAPL MSFT") is None
+    assert cache_key("chart AAPL", lambda ticker: None) is None
+
+
+def test_new_version_replaces_the_old_answer():
+    cache = ResponseCache()
+    old, new = key("chart AAPL"), cache_key("chart AAPL", lambda ticker: 'v2')
+    other = key("Show a 5y candlestick chart of AAPL")
+    cache.put(old, 'old')
+    cache.put(other, 'other')
+    cache.put(new, 'new')
+    assert cache.get(old) is None
+    assert cache.get(new) == 'new'
+    assert cache.get(other) == 'other'
+
+
+def test_invalidate_drops_every_answer_for_the_ticker(monkeypatch):
+    monkeypatch.setattr(response_cache, '_cache', ResponseCache())
+    response_cache.put(key("chart AAPL"), 'a')
+    response_cache.put(key("Should I buy AAPL?"), 'b')
+    response_cache.invalidate('AAPL')
+    assert response_cache.get(key("chart AAPL")) is None
+    assert response_cache.get(key("Should I buy AAPL?")) is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_state
+import screener
+
+pytest.importorskip('streamlit')
+import stock_analysis
+
+DAYS = pd.bdate_range('2024-01-02', periods=260)
+# Each exchange closes on days the other trades, so the downloaded matrix has gaps in both
+CALENDARS = {'US': DAYS[np.arange(len(DAYS)) % 13 != 5], 'NSE': DAYS[np.arange(len(DAYS)) % 9 != 3]}
+UNIVERSE = {'AAPL': 'US', 'MSFT': 'US', 'TSLA': 'US', 'RELIANCE.NS': 'NSE', 'TCS.NS': 'NSE'}
+
+
+def make_history(seed, index):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005 * (seed - 2), 0.02, size=len(index))))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                         'Volume': rng.integers(1_000, 5_000, size=len(index)).astype(float)}, index=index)
+
+
+@pytest.fixture
+def histories(tmp_path, monkeypatch):
+    histories = {ticker: make_history(seed, CALENDARS[exchange])
+                 for seed, (ticker, exchange) in enumerate(UNIVERSE.items())}
+
+    def download(batch, **kwargs):
+        return pd.concat({field: pd.DataFrame({t: histories[t][field] for t in batch}) for field in ('Close', 'Volume')},
+                         axis=1)
+    monkeypatch.setattr(screener.yf, 'download', download)
+    monkeypatch.setattr(stock_analysis, 'get_history', lambda ticker, period='1y', interval='1d': histories[ticker])
+    monkeypatch.setattr(stock_analysis, 'snapshot_indicators', lambda *args, **kwargs: None)
+    monkeypatch.setattr(indicator_state, 'HISTORY_STORE_DIR', str(tmp_path))
+    indicator_state.forget()
+    yield histories
+    indicator_state.forget()
+
+
+def test_mixed_exchange_ratings_match_single_stock_page(histories):
+    table, figures = screener.screen(list(UNIVERSE))
+    assert figures == {}
+    assert sorted(table.index) == sorted(UNIVERSE)
+    for ticker in UNIVERSE:
+        result, error = stock_analysis.get_stock_recommendation(ticker)
+        assert error is None
+        row = table.loc[ticker]
+        assert (row.recommendation, row.confidence) == (result['recommendation'], result['confidence'])
+        assert (row.buy_signals, row.sell_signals) == (result['buy_signals'], result['sell_signals'])
+        assert row.rsi == pytest.approx(result['rsi'], abs=0.01)
+        assert row.current_price == result['current_price']
+
+
+def test_indicators_skip_other_exchanges_days(histories):
+    close, volume = screener.download_universe(list(UNIVERSE))
+    latest = screener.latest_indicators(close, volume)
+    for ticker, history in histories.items():
+        assert latest['SMA_50'][ticker] == pytest.approx(history.Close.iloc[-50:].mean())
+
+
+def test_rate_labels_signal_counts():
+    recommendation, confidence = screener.rate(np.array([5, 3, 1, 2]), np.array([0, 1, 4, 2]))
+    assert list(recommendation) == ['BUY', 'BUY', 'SELL', 'HOLD']
+    assert list(confidence) == ['High', 'Moderate', 'High', 'Neutral']
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+import ticker_info
+from ticker_info import TickerInfoCache
+
+STATIC = {'longName': 'Apple Inc.', 'shortName': 'Apple', 'sector': 'Technology', 'industry': 'Consumer Electronics',
+          'exchange': 'NMS', 'currency': 'USD'}
+
+
+@pytest.fixture
+def network(monkeypatch):
+    calls = []
+    prices = iter(range(100, 200))
+
+    def fetch_static(ticker):
+        calls.append(('static', ticker))
+        return dict(STATIC), {'currentPrice': 99.0, 'previousClose': 98.0}
+
+    def fetch_price(ticker):
+        calls.append(('price', ticker))
+        return {'currentPrice': float(next(prices)), 'previousClose': 98.0}
+
+    monkeypatch.setattr(ticker_info, '_fetch_static', fetch_static)
+    monkeypatch.setattr(ticker_info, '_fetch_price', fetch_price)
+    return calls
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_repeat_lookup_is_served_from_cache(tmp_path, network):
+    cache = TickerInfoCache(str(tmp_path / 'info.json'))
+    assert cache.get('aapl')['sector'] == 'Technology'
+    assert cache.get('AAPL')['currentPrice'] == 99.0
+    assert network == [('static', 'AAPL')]
+
+
+def test_stale_price_is_served_and_refreshed_in_background(tmp_path, network):
+    cache = TickerInfoCache(str(tmp_path / 'info.json'), price_ttl=0)
+    cache.get('AAPL')
+    network.clear()
+
+    assert cache.get('AAPL')['currentPrice'] == 99.0  # no wait for the network
+    wait_for(lambda: network == [('price', 'AAPL')] and cache.fetches == 2)
+    assert cache.get('AAPL', with_price=False) == STATIC
+    assert cache._entries['AAPL']['price']['currentPrice'] == 100.0
+
+
+def test_cache_survives_a_restart(tmp_path, network):
+    TickerInfoCache(str(tmp_path / 'info.json')).get('AAPL')
+    network.clear()
+    assert TickerInfoCache(str(tmp_path / 'info.json')).get('AAPL')['longName'] == 'Apple Inc.'
+    assert network == []
+
+
+def test_failed_price_refresh_keeps_the_cached_price(tmp_path, network, monkeypatch):
+    cache = TickerInfoCache(str(tmp_path / 'info.json'), price_ttl=0)
+    cache.get('AAPL')
+
+    def offline(ticker):
+        raise ConnectionError
+    monkeypatch.setattr(ticker_info, '_fetch_price', offline)
+    assert cache.get('AAPL')['currentPrice'] == 99.0
+    wait_for(lambda: not cache._refreshing)
+    assert cache.get('AAPL')['currentPrice'] == 99.0
+    wait_for(lambda: not cache._refreshing)
+
+
+def test_unknown_symbol_is_cached_without_price_lookups(tmp_path, network, monkeypatch):
+    def fetch_unknown(ticker):
+        network.append(('static', ticker))
+        return {field: None for field in STATIC}, {'currentPrice': None, 'previousClose': None}
+    monkeypatch.setattr(ticker_info, '_fetch_static', fetch_unknown)
+    cache = TickerInfoCache(str(tmp_path / 'info.json'), price_ttl=0)
+
+    assert cache.get('NOSUCH')['currentPrice'] is None
+    assert cache.get('NOSUCH')['longName'] is None
+    assert cache.prefetch(['NOSUCH']) == 0
+    assert network == [('static', 'NOSUCH')]
+    assert not cache._refreshing
+
+    # Retried once the negative entry expires
+    monkeypatch.setattr(ticker_info, 'NEGATIVE_TTL', -1)
+    cache.get('NOSUCH')
+    assert network == [('static', 'NOSUCH')] * 2
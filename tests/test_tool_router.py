@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+pytest.importorskip('streamlit')
+
+from chatbot import functions
+from tool_router import local_answer, route, tool_call
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("chart TSLA", ('plot_stock_price_chatbot', {'ticker': 'TSLA'})),
+    ("recommendation RELIANCE.NS", ('get_stock_recommendation_chatbot', {'ticker': 'RELIANCE.NS'})),
+    ("AAPL price history", ('plot_stock_price_chatbot', {'ticker': 'AAPL'})),
+    ("Show a 5y candlestick chart of AAPL",
+     ('plot_price_chart_chatbot', {'ticker': 'AAPL', 'chart_type': 'Candlestick', 'period': '5y'})),
+    ("Show an OHLC chart of MSFT", ('plot_price_chart_chatbot', {'ticker': 'MSFT', 'chart_type': 'OHLC', 'period': '1y'})),
+    ("AAPL chart for 6 months",
+     ('plot_price_chart_chatbot', {'ticker': 'AAPL', 'chart_type': 'Line Chart', 'period': '6mo'})),
+    ("AAPL 200-day SMA", ('calculate_SMA_chatbot', {'ticker': 'AAPL', 'window': 200})),
+    ("EMA AAPL", ('calculate_EMA_chatbot', {'ticker': 'AAPL', 'window': 50})),
+    ("What is the MACD trend for AAPL?", ('calculate_MACD_chatbot', {'ticker': 'AAPL'})),
+    ("AAPL RSI history", ('calculate_RSI_chatbot', {'ticker': 'AAPL'})),
+    ("price of NVDA", ('get_stock_price_chatbot', {'ticker': 'NVDA'})),
+])
+def test_routes_commands_with_their_parameters(text, expected):
+    assert route(text, functions) == expected
+
+
+@pytest.mark.parametrize('text', [
+    "Show a 10y candlestick chart of AAPL",  # period the chart tool does not offer
+    "AAPL chart since 2020",                 # number the rules cannot place
+    "AAPL 50 day moving average",            # SMA or EMA?
+    "AAPL RSI chart",                        # two tools
+    "AAPL price chart vs MSFT",
+    "Why is the RSI of AAPL so high?",
+    "recommendation",
+])
+def test_leaves_everything_else_to_the_model(text):
+    assert route(text, functions) is None
+
+
+def test_unavailable_tools_are_not_routed():
+    names = ('plot_stock_price_chatbot', 'get_stock_recommendation_chatbot')
+    basic = [f for f in functions if f['name'] in names]
+    assert route("chart AAPL", basic) == ('plot_stock_price_chatbot', {'ticker': 'AAPL'})
+    assert route("Show a 5y candlestick chart of AAPL", basic) is None
+    assert route("AAPL 200-day SMA", basic) is None
+
+
+def test_local_answer_shows_confidence_as_a_word():
+    result = json.dumps({'ticker': 'AAPL', 'recommendation': 'BUY', 'confidence': 'High', 'current_price': 190.1,
+                         'rsi': 55.2, 'buy_signals': 4, 'sell_signals': 1, 'reasons': ['Price above SMA 50']})
+    answer = local_answer([tool_call('get_stock_recommendation_chatbot', {'ticker': 'AAPL'})], [result])
+    assert "(High confidence)" in answer
+    assert "%" not in answer
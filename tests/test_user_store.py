@@ -0,0 +1,92 @@
+import json
+import threading
+
+import pytest
+
+from user_store import JsonUserStore, SqliteUserStore, UserStore, migrate_json
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return SqliteUserStore(str(tmp_path / 'users.db'))
+    return JsonUserStore(str(tmp_path / 'users_db.json'))
+
+
+def test_round_trip(store):
+    assert store.get_hash('alice') is None
+    assert store.add_user('alice', 'hash-1')
+    assert store.get_hash('alice') == 'hash-1'
+    store.set_hash('alice', 'hash-2')
+    assert store.get_hash('alice') == 'hash-2'
+    assert store.count() == 1
+
+
+def test_taken_username_is_rejected(store):
+    assert store.add_user('alice', 'first')
+    assert not store.add_user('alice', 'second')
+    assert store.get_hash('alice') == 'first'
+
+
+def test_import_adds_only_new_users(store):
+    store.add_user('alice', 'kept')
+    assert store.import_users({'alice': 'ignored', 'bob': 'b', 'carol': 'c'}) == 2
+    assert store.get_hash('alice') == 'kept'
+    assert store.count() == 3
+
+
+def test_sqlite_store_uses_wal_and_persists(tmp_path):
+    path = str(tmp_path / 'users.db')
+    SqliteUserStore(path).add_user('alice', 'hash')
+    reopened = SqliteUserStore(path)
+    assert reopened._connect().execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert reopened.get_hash('alice') == 'hash'
+
+
+def test_concurrent_registrations_of_one_name_create_one_user(tmp_path):
+    path = str(tmp_path / 'users.db')
+    stores = [SqliteUserStore(path) for _ in range(2)]  # as if from two processes
+    start = threading.Barrier(16)
+    results = []
+
+    def register(i):
+        start.wait()
+        results.append((stores[i % 2].add_user('alice', f'hash-{i}'), i))
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [i for added, i in results if added]
+    assert len(winners) == 1
+    assert stores[0].get_hash('alice') == f'hash-{winners[0]}'
+    assert stores[0].count() == 1
+
+
+def test_json_file_is_migrated_once(tmp_path):
+    legacy = tmp_path / 'users_db.json'
+    legacy.write_text(json.dumps({'alice': 'a', 'bob': 'b'}))
+    store = SqliteUserStore(str(tmp_path / 'users.db'))
+
+    assert migrate_json(store, str(legacy)) == 2
+    assert not legacy.exists()
+    assert (tmp_path / 'users_db.json.migrated').exists()
+    assert migrate_json(store, str(legacy)) == 0
+    assert store.get_hash('bob') == 'b'
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoCount(UserStore):
+        def get_hash(self, username):
+            return None
+
+        def add_user(self, username, password_hash):
+            return True
+
+        def set_hash(self, username, password_hash):
+            pass
+
+    with pytest.raises(TypeError):
+        NoCount()
@@ -0,0 +1,281 @@
+"""Persistent cache of Ticker.info metadata.
+
+Ticker.info is one of the slowest yfinance calls, and most of what the app
+shows from it (name, sector, industry, exchange, currency) changes rarely.
+Entries are kept per ticker with two timestamps:
+
+- static fields, refreshed from Ticker.info after STATIC_TTL
+- price fields, refreshed after PRICE_TTL from Ticker.fast_info, or for a
+  whole watchlist from one batched yf.download request
+
+Once a ticker is cached, reads never wait for a price: a stale price is
+returned at once and refreshed on the shared download pool, so only a
+ticker's first lookup (or one a week later) touches the network.
+
+The cache lives in memory for the whole server process and is written to
+TICKER_INFO_PATH after every refresh, so a restart starts warm.
+
+Usage:
+    python ticker_info.py AAPL MSFT RELIANCE.NS
+    python ticker_info.py --file watchlist.txt
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from concurrency import run_as_completed, submit
+from lazy_imports import lazy_import
+
+yf = lazy_import('yfinance')
+
+TICKER_INFO_PATH = os.environ.get('TICKER_INFO_PATH', 'ticker_info.json')
+STATIC_FIELDS = ('longName', 'shortName', 'sector', 'industry', 'exchange', 'currency')
+PRICE_FIELDS = ('currentPrice', 'previousClose')
+# Seconds before each group of fields is fetched again
+STATIC_TTL = 7 * 24 * 3600
+PRICE_TTL = 60
+# Unknown symbols (no name in the response) are retried sooner
+NEGATIVE_TTL = 3600
+# Symbols per yf.download request when prefetching prices
+PRICE_BATCH_SIZE = 100
+
+
+def _fetch_static(ticker):
+    info = yf.Ticker(ticker).info or {}
+    static = {field: info.get(field) for field in STATIC_FIELDS}
+    price = {'currentPrice': info.get('currentPrice', info.get('regularMarketPrice')),
+             'previousClose': info.get('previousClose', info.get('regularMarketPreviousClose'))}
+    return static, price
+
+
+def _try_fetch_static(ticker):
+    """_fetch_static, or None if it fails, so one bad symbol does not stop a prefetch"""
+    try:
+        return _fetch_static(ticker)
+    except Exception:
+        return None
+
+
+def _fetch_price(ticker):
+    fast = yf.Ticker(ticker).fast_info
+    return {'currentPrice': fast['lastPrice'], 'previousClose': fast['previousClose']}
+
+
+def _fetch_prices(tickers):
+    """{ticker: price fields} for many tickers from batched daily-bar downloads"""
+    prices = {}
+    for start in range(0, len(tickers), PRICE_BATCH_SIZE):
+        batch = tickers[start:start + PRICE_BATCH_SIZE]
+        data = yf.download(batch, period='5d', interval='1d', group_by='column',
+                           auto_adjust=False, threads=True, progress=False)
+        if data.empty:
+            continue
+        for ticker in batch:
+            closes = data['Close'][ticker].dropna() if ticker in data['Close'] else []
+            if len(closes):
+                prices[ticker] = {'currentPrice': float(closes.iloc[-1]),
+                                  'previousClose': float(closes.iloc[-2]) if len(closes) > 1 else None}
+    return prices
+
+
+class TickerInfoCache:
+    """Ticker metadata with separate TTLs for static and price fields, saved to a JSON file"""
+
+    def __init__(self, path=TICKER_INFO_PATH, static_ttl=STATIC_TTL, price_ttl=PRICE_TTL):
+        self.path = path
+        self.static_ttl = static_ttl
+        self.price_ttl = price_ttl
+        self._lock = threading.Lock()
+        self._entries = None  # ticker -> {"static", "static_at", "price", "price_at"}
+        self._refreshing = set()  # tickers with a background price refresh queued
+        self.hits = 0
+        self.fetches = 0
+
+    def _load(self):
+        """Read the file on first use (lock held)"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._entries = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        """Write all entries atomically (lock held)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+
+    def _stale(self, entry, with_price):
+        """(static stale, price stale) for an entry (lock held)"""
+        now = time.time()
+        if entry is None:
+            return True, with_price
+        known = entry['static'].get('longName') or entry['static'].get('shortName')
+        static_stale = now - entry['static_at'] > (self.static_ttl if known else NEGATIVE_TTL)
+        # An unknown symbol has no price to refresh until its static fields are retried
+        price_stale = with_price and bool(known) and now - entry.get('price_at', 0) > self.price_ttl
+        return static_stale, price_stale
+
+    def _store(self, ticker, static=None, price=None):
+        """Record fetched fields (lock held); the caller saves"""
+        now = time.time()
+        entry = self._entries.setdefault(ticker, {'static': {}, 'static_at': 0, 'price': {}, 'price_at': 0})
+        if static is not None:
+            entry['static'], entry['static_at'] = static, now
+        if price is not None:
+            entry['price'], entry['price_at'] = price, now
+
+    def _refresh(self, ticker, static_stale, price_stale):
+        """Fetch whatever is stale for one ticker; returns (static, price), either may be None"""
+        if static_stale:
+            return _fetch_static(ticker)
+        if price_stale:
+            return None, _fetch_price(ticker)
+        return None, None
+
+    def _refresh_price(self, ticker):
+        """Background price refresh; on failure the cached price stays and is retried on the next read"""
+        try:
+            price = _fetch_price(ticker)
+        except Exception:
+            price = None
+        with self._lock:
+            self._refreshing.discard(ticker)
+            if price is not None:
+                self.fetches += 1
+                self._store(ticker, price=price)
+                self._save()
+
+    def get(self, ticker, with_price=True):
+        """Metadata dict for `ticker` (STATIC_FIELDS, plus PRICE_FIELDS if `with_price`).
+
+        Only the stale group of fields is fetched; an entry whose fields are
+        all fresh is served without touching the network. A stale cached
+        price is served as is and refreshed in the background. If a refresh
+        fails, a stale entry is returned rather than the error.
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            entry = self._load().get(ticker)
+            static_stale, price_stale = self._stale(entry, with_price)
+            serve_stale_price = price_stale and not static_stale and entry['price'].get('currentPrice') is not None
+            if not static_stale and (not price_stale or serve_stale_price):
+                self.hits += 1
+                if serve_stale_price and ticker not in self._refreshing:
+                    # Only queued here; the worker waits for this lock
+                    self._refreshing.add(ticker)
+                    submit(self._refresh_price, ticker)
+                return self._merge(entry, with_price)
+
+        try:
+            static, price = self._refresh(ticker, static_stale, price_stale)
+        except Exception:
+            if entry is None:
+                raise
+            return self._merge(entry, with_price)
+        with self._lock:
+            self.fetches += 1
+            self._store(ticker, static, price)
+            self._save()
+            return self._merge(self._entries[ticker], with_price)
+
+    @staticmethod
+    def _merge(entry, with_price):
+        info = dict(entry['static'])
+        if with_price:
+            info.update(entry['price'])
+        return info
+
+    def prefetch(self, tickers, with_price=True):
+        """Bring a watchlist up to date with as few requests as possible.
+
+        Stale static fields are fetched in parallel on the shared download
+        pool; stale prices for the rest come from one batched download.
+        Returns the number of tickers that needed fetching.
+        """
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        with self._lock:
+            entries = self._load()
+            stale = {t: self._stale(entries.get(t), with_price) for t in tickers}
+        need_static = [t for t, (static_stale, _) in stale.items() if static_stale]
+        need_price = [t for t, (static_stale, price_stale) in stale.items() if price_stale and not static_stale]
+
+        fetched = {}
+        for position, result in run_as_completed(_try_fetch_static, [(t,) for t in need_static]):
+            if result is not None:
+                fetched[need_static[position]] = result
+        prices = _fetch_prices(need_price) if need_price else {}
+
+        with self._lock:
+            self._load()
+            for ticker, (static, price) in fetched.items():
+                self._store(ticker, static, price)
+            for ticker, price in prices.items():
+                self._store(ticker, price=price)
+            self.fetches += len(fetched) + len(prices)
+            if fetched or prices:
+                self._save()
+        return len(fetched) + len(prices)
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            entries = self._load()
+            if ticker is None:
+                entries.clear()
+            else:
+                entries.pop(ticker.upper(), None)
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._load()), "hits": self.hits, "fetches": self.fetches}
+
+
+_cache = TickerInfoCache()
+
+
+def get_ticker_info(ticker, with_price=True):
+    """Cached equivalent of the metadata fields of yf.Ticker(ticker).info"""
+    return _cache.get(ticker, with_price)
+
+
+def prefetch(tickers, with_price=True):
+    return _cache.prefetch(tickers, with_price)
+
+
+def invalidate(ticker=None):
+    _cache.invalidate(ticker)
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch ticker metadata into the local cache")
+    parser.add_argument('tickers', nargs='*')
+    parser.add_argument('--file', help="file with one ticker per line")
+    parser.add_argument('--no-price', action='store_true', help="only refresh static fields")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not tickers:
+        parser.error("no tickers given")
+
+    start = time.perf_counter()
+    fetched = prefetch(tickers, with_price=not args.no_price)
+    print(f"{fetched} of {len(tickers)} tickers fetched in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
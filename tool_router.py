@@ -0,0 +1,143 @@
+"""Local routing of unambiguous chatbot commands straight to a tool.
+
+Messages such as "chart TSLA", "recommendation RELIANCE.NS" or "Show a 5y
+candlestick chart of AAPL" name one tool, one ticker and only parameters that
+tool takes, so the model's first completion (which would only pick the tool)
+can be skipped. Anything the rules are not sure about returns None and goes
+to the model as before.
+"""
+import json
+import re
+import uuid
+
+from chat_query import is_open_ended, parse_params
+from symbols import find_tickers, resolve_ticker
+
+# Keywords that select each tool; a message must match exactly one tool
+TOOL_KEYWORDS = {
+    'plot_stock_price_chatbot': ('chart', 'plot', 'graph', 'price history', 'price chart'),
+    'get_stock_recommendation_chatbot': ('recommendation', 'recommend', 'should i buy', 'should i sell',
+                                         'buy or sell', 'buy/sell', 'signal'),
+    'get_stock_price_chatbot': ('price', 'quote', 'trading at'),
+    'calculate_SMA_chatbot': ('sma', 'simple moving average'),
+    'calculate_EMA_chatbot': ('ema', 'exponential moving average'),
+    'calculate_RSI_chatbot': ('rsi', 'relative strength'),
+    'calculate_MACD_chatbot': ('macd',),
+}
+# A chart request with a period or chart type goes to the configurable chart tool
+CHART_TOOL = 'plot_price_chart_chatbot'
+CHART_DEFAULTS = {'chart_type': 'Line Chart', 'period': '1y'}
+# The tool each parsed indicator belongs to
+INDICATOR_TOOLS = {'SMA': 'calculate_SMA_chatbot', 'EMA': 'calculate_EMA_chatbot',
+                   'RSI': 'calculate_RSI_chatbot', 'MACD': 'calculate_MACD_chatbot'}
+
+# "<keyword> <ticker>", matched case-insensitively
+_COMMAND_RE = re.compile(r'^\s*(\w+)\s+([\w&.-]+)\s*\??\s*$')
+
+
+def _matching_tools(text, tool_names):
+    """Tools whose keywords appear in `text`; longer keywords are matched first and
+    consume their words, so "price history" does not also count as "price"."""
+    lowered = text.lower()
+    keywords = sorted(((keyword, name) for name in tool_names for keyword in TOOL_KEYWORDS.get(name, ())),
+                      key=lambda item: len(item[0]), reverse=True)
+    tools = []
+    for keyword, name in keywords:
+        pattern = r'\b' + re.escape(keyword) + r'\b'
+        if re.search(pattern, lowered):
+            lowered = re.sub(pattern, ' ', lowered)
+            if name not in tools:
+                tools.append(name)
+    return tools
+
+
+def _accepts(schema, name, value):
+    prop = schema['parameters']['properties'].get(name)
+    return prop is not None and value in prop.get('enum', [value])
+
+
+def _arguments(function_name, params, schemas):
+    """(function_name, args without ticker) for the parsed parameters, or None if the
+    tool cannot take all of them"""
+    if 'numbers' in params:
+        return None
+    if 'indicator' in params and INDICATOR_TOOLS.get(params['indicator']) != function_name:
+        return None
+
+    args = {name: params[name] for name in ('window', 'period', 'chart_type') if name in params}
+    if function_name == 'plot_stock_price_chatbot' and args:
+        if CHART_TOOL not in schemas:
+            return None
+        function_name, args = CHART_TOOL, dict(CHART_DEFAULTS, **args)
+
+    schema = schemas[function_name]
+    if not all(_accepts(schema, name, value) for name, value in args.items()):
+        return None
+    for name, prop in schema['parameters']['properties'].items():
+        if name in schema['parameters'].get('required', ()) and 'default' in prop:
+            args.setdefault(name, prop['default'])
+    return function_name, args
+
+
+def route(text, functions):
+    """(function_name, args) for a message that clearly asks for one tool, else None.
+
+    `functions` are the tool schemas the model would be offered. A message is
+    only routed when the chosen tool takes every parameter it states (e.g. a
+    chart with a period the tool offers); anything else goes to the model.
+    """
+    if is_open_ended(text):
+        return None
+
+    schemas = {f['name']: f for f in functions}
+    tools = _matching_tools(text, schemas)
+    if len(tools) != 1:
+        return None
+
+    command = _COMMAND_RE.match(text)
+    if command and _matching_tools(command.group(1), schemas):
+        tickers = find_tickers(command.group(2).upper())
+        ticker = tickers.pop() if len(tickers) == 1 else None
+    else:
+        ticker = resolve_ticker(text)
+    if ticker is None:
+        return None
+
+    routed = _arguments(tools[0], parse_params(text), schemas)
+    if routed is None:
+        return None
+    function_name, args = routed
+    return function_name, dict(args, ticker=ticker)
+
+
+def tool_call(function_name, args):
+    """Tool call in the shape the chat API returns, for the message history"""
+    return {
+        "id": f"call_{uuid.uuid4().hex[:24]}",
+        "type": "function",
+        "function": {"name": function_name, "arguments": json.dumps(args)},
+    }
+
+
+def local_answer(tool_calls, results):
+    """Short reply built from tool results, used when the model is skipped"""
+    lines = []
+    for call, result in zip(tool_calls, results):
+        try:
+            data = json.loads(result)
+        except (TypeError, ValueError):
+            data = None
+
+        if isinstance(data, dict) and 'recommendation' in data:
+            lines.append(f"**{data['ticker']}: {data['recommendation']}** ({data['confidence']} confidence) "
+                         f"at ${data['current_price']}, RSI {data['rsi']}, "
+                         f"{data['buy_signals']} buy / {data['sell_signals']} sell signals.")
+            lines.extend(f"- {reason}" for reason in data.get('reasons', []))
+        elif isinstance(data, dict) and 'ticker' in data:
+            lines.append(f"**{data['ticker']}**: " + ", ".join(f"{k} {v}" for k, v in data.items() if k != 'ticker'))
+        elif result == "Chart displayed":
+            ticker = json.loads(call["function"]["arguments"]).get('ticker')
+            lines.append(f"Here is the last year of {ticker} prices.")
+        else:
+            lines.append(str(result))
+    return "\n".join(lines)
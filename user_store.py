@@ -0,0 +1,197 @@
+"""Storage for user accounts (username -> password hash).
+
+UserStore is the small interface the login page needs. SqliteUserStore is
+the default: an indexed table in WAL mode, so a lookup is one primary-key
+read however many users there are, and concurrent registrations are
+serialized by SQLite instead of overwriting each other. JsonUserStore keeps
+the original users_db.json format for setups that want a plain file.
+
+On first use the SQLite store imports an existing users_db.json.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import tempfile
+import threading
+import time
+
+USER_STORE_BACKEND = os.environ.get('USER_STORE', 'sqlite')
+USER_DB_PATH = os.environ.get('USER_DB_PATH', 'users.db')
+LEGACY_JSON_PATH = 'users_db.json'
+# How long a writer waits for another writer's lock before failing
+BUSY_TIMEOUT_MS = 5000
+
+
+class UserStore(ABC):
+    """Interface every backend implements"""
+
+    @abstractmethod
+    def get_hash(self, username):
+        """Stored password hash, or None for an unknown user"""
+
+    @abstractmethod
+    def add_user(self, username, password_hash):
+        """Create a user; False if the username is taken"""
+
+    @abstractmethod
+    def set_hash(self, username, password_hash):
+        """Replace an existing user's password hash"""
+
+    @abstractmethod
+    def count(self):
+        """Number of users"""
+
+    def import_users(self, users):
+        """Add every (username, hash) pair not already present; returns how many were added"""
+        return sum(self.add_user(username, password_hash) for username, password_hash in users.items())
+
+
+class JsonUserStore(UserStore):
+    """The users_db.json format, cached in memory and rewritten atomically.
+
+    Safe across threads of one process; the file is re-read when another
+    process changes it, but writes from several processes can still race.
+    """
+
+    def __init__(self, path=LEGACY_JSON_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._users = {}
+        self._mtime = None
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            with open(self.path, 'r') as f:
+                self._users = json.load(f)
+            self._mtime = mtime
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._users, f)
+        os.replace(tmp, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def get_hash(self, username):
+        with self._lock:
+            self._refresh()
+            return self._users.get(username)
+
+    def add_user(self, username, password_hash):
+        with self._lock:
+            self._refresh()
+            if username in self._users:
+                return False
+            self._users[username] = password_hash
+            self._save()
+            return True
+
+    def set_hash(self, username, password_hash):
+        with self._lock:
+            self._refresh()
+            self._users[username] = password_hash
+            self._save()
+
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    def import_users(self, users):
+        with self._lock:
+            self._refresh()
+            added = {k: v for k, v in users.items() if k not in self._users}
+            if added:
+                self._users.update(added)
+                self._save()
+            return len(added)
+
+
+class SqliteUserStore(UserStore):
+    """SQLite table in WAL mode with one connection per thread"""
+
+    def __init__(self, path=USER_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS users (
+                              username TEXT PRIMARY KEY,
+                              password_hash TEXT NOT NULL,
+                              created_at REAL NOT NULL)""")
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get_hash(self, username):
+        row = self._connect().execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def add_user(self, username, password_hash):
+        with self._connect() as db:
+            cursor = db.execute("INSERT OR IGNORE INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                                (username, password_hash, time.time()))
+            return cursor.rowcount == 1
+
+    def set_hash(self, username, password_hash):
+        with self._connect() as db:
+            db.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def import_users(self, users):
+        now = time.time()
+        with self._connect() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                           [(username, password_hash, now) for username, password_hash in users.items()])
+            return db.total_changes - before
+
+
+def migrate_json(store, json_path=LEGACY_JSON_PATH):
+    """Copy users from a users_db.json file into `store`, then rename the file.
+
+    The file is kept as <path>.migrated so the migration runs only once.
+    Returns the number of users added.
+    """
+    if isinstance(store, JsonUserStore) or not os.path.exists(json_path):
+        return 0
+    with open(json_path, 'r') as f:
+        added = store.import_users(json.load(f))
+    os.replace(json_path, json_path + '.migrated')
+    return added
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store(default_users=None):
+    """Process-wide store, created (and migrated or seeded) on first call.
+
+    `default_users` ({username: hash}) are added when the store starts empty.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if USER_STORE_BACKEND == 'json':
+                store = JsonUserStore(LEGACY_JSON_PATH)
+            else:
+                store = SqliteUserStore(USER_DB_PATH)
+                migrate_json(store, LEGACY_JSON_PATH)
+            if default_users and store.count() == 0:
+                store.import_users(default_users)
+            _store = store
+        return _store